@@ -1,12 +1,10 @@
-import subprocess
+import sys
+from pathlib import Path
 
-# Phase 1: Data generation
-subprocess.run(["python", "src/generate_data.py"])
+# Stages run in this process (see src/pipeline.py); unchanged stages are skipped
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
-# Phase 2: Run data quality checks
-subprocess.run(["python", "src/run_data_quality_checks.py"])
+from pipeline import main
 
-# Phase 4: Historical logging
-subprocess.run(["python", "src/run_data_quality_historical.py"])
-
-print("All phases executed successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+-- ============================================
+-- Run Registry
+-- ============================================
+CREATE TABLE IF NOT EXISTS dq_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_mode TEXT,
+    run_timestamp TEXT
+);
+
+-- ============================================
+-- Audit Log (one row per check per run)
+-- ============================================
+CREATE TABLE IF NOT EXISTS dq_audit_log (
+    check_name TEXT,
+    failed_rows INTEGER,
+    check_timestamp TEXT,
+    run_id INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_dq_audit_log_run
+    ON dq_audit_log (run_id, check_name);
+
+-- ============================================
+-- SLA Evaluation (one row per SLA-governed check per run)
+-- ============================================
+CREATE TABLE IF NOT EXISTS dq_sla_evaluation (
+    run_id INTEGER,
+    check_name TEXT,
+    failed_rows INTEGER,
+    max_failed_rows INTEGER,
+    severity TEXT,
+    sla_status TEXT,
+    check_timestamp TEXT,
+    PRIMARY KEY (run_id, check_name)
+);
+
+-- ============================================
+-- Latest Findings (maintained per check, replaces re-sorting history)
+-- ============================================
+CREATE TABLE IF NOT EXISTS dq_latest_findings (
+    check_name TEXT PRIMARY KEY,
+    run_id INTEGER,
+    failed_rows INTEGER,
+    max_failed_rows INTEGER,
+    severity TEXT,
+    sla_status TEXT,
+    check_timestamp TEXT
+);
+
+-- ============================================
+-- Failure Records (row-level failures per run, for drill-down)
+-- ============================================
+-- The primary key doubles as the keyset index: one run and check, ordered by record_id
+CREATE TABLE IF NOT EXISTS dq_failure_records (
+    run_id INTEGER,
+    check_name TEXT,
+    record_id INTEGER,
+    PRIMARY KEY (run_id, check_name, record_id)
+) WITHOUT ROWID;
+
+-- ============================================
+-- Partition Results (one row per partition per check per run)
+-- ============================================
+-- Written by partitioned runs (run_workforce_dq.py --partition-by); the
+-- partitions of a run add up to its dq_audit_log counts
+CREATE TABLE IF NOT EXISTS dq_partition_results (
+    run_id INTEGER,
+    partition_key TEXT,
+    partition_value TEXT,
+    check_name TEXT,
+    failed_rows INTEGER,
+    PRIMARY KEY (run_id, partition_value, check_name)
+);
+
+CREATE TABLE IF NOT EXISTS dq_partition_sla_evaluation (
+    run_id INTEGER,
+    partition_key TEXT,
+    partition_value TEXT,
+    check_name TEXT,
+    failed_rows INTEGER,
+    max_failed_rows INTEGER,
+    severity TEXT,
+    sla_status TEXT,
+    PRIMARY KEY (run_id, partition_value, check_name)
+);
+
+-- ============================================
+-- Micro-batches (watch mode: one row per ingested drop file)
+-- ============================================
+-- Written by src/watch_drops.py; latency_seconds runs from the file being
+-- picked up to its batch's SLA verdicts being committed
+CREATE TABLE IF NOT EXISTS dq_batch_files (
+    run_id INTEGER,
+    source_file TEXT,
+    row_count INTEGER,
+    detected_at TEXT,
+    completed_at TEXT,
+    latency_seconds REAL,
+    PRIMARY KEY (run_id, source_file)
+);
+
+-- Failures found in the batch's own rows (dq_audit_log holds the table totals)
+CREATE TABLE IF NOT EXISTS dq_batch_results (
+    run_id INTEGER,
+    check_name TEXT,
+    failed_rows INTEGER,
+    PRIMARY KEY (run_id, check_name)
+);
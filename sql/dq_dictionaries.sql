@@ -0,0 +1,12 @@
+-- ============================================
+-- Category Dictionaries (one row per distinct value per column)
+-- ============================================
+-- Codes are handed out in order and never reassigned, so a value keeps the
+-- same pandas categorical code across runs and extracts
+CREATE TABLE IF NOT EXISTS dq_dictionaries (
+    column_name TEXT,
+    code INTEGER,
+    value TEXT,
+    PRIMARY KEY (column_name, code),
+    UNIQUE (column_name, value)
+);
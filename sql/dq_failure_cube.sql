@@ -0,0 +1,33 @@
+-- ============================================
+-- Failure Cube (failures per check and workforce cell, latest run)
+-- ============================================
+-- NULL dimension values are stored as '' so every cell has a unique key
+CREATE TABLE IF NOT EXISTS dq_failure_cube (
+    check_name TEXT NOT NULL,
+    parent_department TEXT NOT NULL,
+    organisation TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    office_region TEXT NOT NULL,
+    failed_rows INTEGER NOT NULL,
+    PRIMARY KEY (check_name, parent_department, organisation, grade, office_region)
+) WITHOUT ROWID;
+
+-- The cell each counted failure was added to, so an incremental run can take
+-- a failure back out after the row's department or grade has changed
+CREATE TABLE IF NOT EXISTS dq_failure_cube_members (
+    record_id INTEGER NOT NULL,
+    check_name TEXT NOT NULL,
+    parent_department TEXT NOT NULL,
+    organisation TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    office_region TEXT NOT NULL,
+    PRIMARY KEY (record_id, check_name)
+) WITHOUT ROWID;
+
+-- Run the cube currently reflects
+CREATE TABLE IF NOT EXISTS dq_failure_cube_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    run_id INTEGER,
+    update_mode TEXT,
+    updated_at TEXT
+);
@@ -0,0 +1,34 @@
+-- ============================================
+-- Profile Snapshots (one per profiled table per run)
+-- ============================================
+CREATE TABLE IF NOT EXISTS dq_profile_runs (
+    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    table_name TEXT,
+    row_count INTEGER,
+    profiled_at TEXT
+);
+
+-- ============================================
+-- Column Profiles (one row per column per snapshot)
+-- ============================================
+-- top_values and quantiles are JSON; hll_registers keeps the distinct-count
+-- sketch so snapshots can be merged or re-estimated without re-reading data
+CREATE TABLE IF NOT EXISTS dq_column_profiles (
+    profile_id INTEGER,
+    column_name TEXT,
+    position INTEGER,
+    row_count INTEGER,
+    null_count INTEGER,
+    blank_count INTEGER,
+    approx_distinct INTEGER,
+    min_value TEXT,
+    max_value TEXT,
+    top_values TEXT,
+    quantiles TEXT,
+    hll_registers BLOB,
+    PRIMARY KEY (profile_id, column_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dq_profile_runs_table
+    ON dq_profile_runs (table_name, profile_id);
@@ -5,9 +5,8 @@ CREATE TABLE IF NOT EXISTS dq_sla_rules (
     severity TEXT
 );
 
-DELETE FROM dq_sla_rules;
-
-INSERT INTO dq_sla_rules VALUES
+-- Seeded once (dq_runs.ensure_sla_rules); limits edited in the database are kept
+INSERT OR IGNORE INTO dq_sla_rules VALUES
 ('missing_parent_department', 0, 'CRITICAL'),
 ('missing_organisation', 0, 'CRITICAL'),
 ('missing_grade', 0, 'HIGH'),
@@ -18,3 +17,19 @@ INSERT INTO dq_sla_rules VALUES
 ('payscale_min_greater_than_max', 0, 'CRITICAL'),
 ('missing_payscale', 10, 'HIGH'),
 ('senior_role_low_pay', 2, 'MEDIUM');
+
+-- Per-partition SLA thresholds for partitioned runs. partition_key is the
+-- column the run was partitioned by; partitions without an override are held
+-- to the global max_failed_rows above
+CREATE TABLE IF NOT EXISTS dq_partition_sla_rules (
+    partition_key TEXT,
+    partition_value TEXT,
+    check_name TEXT,
+    max_failed_rows INTEGER,
+    severity TEXT,
+    PRIMARY KEY (partition_key, partition_value, check_name)
+);
+
+-- Seeded once; overrides added later are kept across runs
+INSERT OR IGNORE INTO dq_partition_sla_rules VALUES
+('Parent Department', 'Department for Education', 'invalid_fte_unrealistic', 10, 'HIGH');
@@ -0,0 +1,16 @@
+-- ============================================
+-- Check Telemetry (one row per check per run)
+-- ============================================
+-- run_id is dq_runs.run_id in workforce.db; customers.db has no run registry,
+-- so its runs are numbered here and run_timestamp matches dq_audit_log.check_timestamp
+CREATE TABLE IF NOT EXISTS dq_check_telemetry (
+    run_id INTEGER,
+    check_name TEXT,
+    run_timestamp TEXT,
+    wall_ms REAL,
+    vm_steps INTEGER,
+    memory_delta_kb INTEGER,
+    used_index INTEGER,
+    query_plan TEXT,
+    PRIMARY KEY (run_id, check_name)
+);
@@ -30,3 +30,25 @@ FROM workforce
 WHERE payscale_min > payscale_max
 GROUP BY organisation
 ORDER BY invalid_pay_rows DESC;
+
+-- The same questions for the latest run, answered from the failure cube
+-- (dq_failure_cube.sql) instead of rescanning workforce
+
+-- 4. Departments contributing most to unrealistic FTE values
+SELECT
+    parent_department,
+    SUM(failed_rows) AS invalid_fte_rows
+FROM dq_failure_cube
+WHERE check_name = 'invalid_fte_unrealistic'
+GROUP BY parent_department
+ORDER BY invalid_fte_rows DESC;
+
+-- 5. Pay scale inversions by organisation and grade
+SELECT
+    organisation,
+    grade,
+    SUM(failed_rows) AS invalid_pay_rows
+FROM dq_failure_cube
+WHERE check_name = 'payscale_min_greater_than_max'
+GROUP BY organisation, grade
+ORDER BY invalid_pay_rows DESC;
@@ -1,110 +1,121 @@
-import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
-# --- Setup ---
-# Connect to SQLite in memory
-conn = sqlite3.connect(':memory:')
+import charts
+from categorical_frames import CUSTOMER_CATEGORIES, encode_columns
+from columnar_store import write_dataset
+from customer_store import inactive_cutoff, refresh_customer_store
+from db_connections import connect
+from render_cache import render_charts
 
-# Load CSV into SQLite
-df = pd.read_csv('../data/raw/customers_raw.csv')
-df.to_sql('customers', conn, index=False, if_exists='replace')
-
-# Ensure output folders exist
-os.makedirs('../data/processed', exist_ok=True)
-os.makedirs('../outputs/dashboard_plots', exist_ok=True)
-
-# --- 1. Missing Values Percentage ---
-missing_pct_query = """
+# --- Analytics queries ---
+# Read from the analytics store in customers.db (customer_store.py): the
+# aggregates are maintained on load, and the row-level queries use its indexes
+ANALYTICS_QUERIES = {
+    # 1. Missing Values Percentage
+    "missing_values_pct": """
 SELECT
-    ROUND(100.0 * SUM(CASE WHEN email IS NULL THEN 1 ELSE 0 END) / COUNT(*),2) AS email_missing_pct,
-    ROUND(100.0 * SUM(CASE WHEN phone_number IS NULL THEN 1 ELSE 0 END) / COUNT(*),2) AS phone_missing_pct
-FROM customers;
-"""
-missing_pct = pd.read_sql_query(missing_pct_query, conn)
-missing_pct.to_csv('../data/processed/missing_values_pct.csv', index=False)
-print("Missing values percentage:\n", missing_pct)
-
-# --- 2. Duplicate Emails ---
-duplicate_query = """
-SELECT email, COUNT(*) AS freq
-FROM customers
-WHERE email IS NOT NULL
-GROUP BY email
-HAVING freq > 1
-ORDER BY freq DESC;
-"""
-duplicates = pd.read_sql_query(duplicate_query, conn)
-duplicates.to_csv('../data/processed/duplicate_emails.csv', index=False)
-print("\nDuplicate emails (top 5):\n", duplicates.head())
-
-# --- 3. Inactive Customers (>1 year) ---
-inactive_query = """
+    ROUND(100.0 * MAX(CASE WHEN column_name = 'email' THEN null_count END) / MAX(row_count),2) AS email_missing_pct,
+    ROUND(100.0 * MAX(CASE WHEN column_name = 'phone_number' THEN null_count END) / MAX(row_count),2) AS phone_missing_pct
+FROM customer_null_counts;
+""",
+    # 2. Duplicate Emails (partial index on freq > 1)
+    "duplicate_emails": """
+SELECT email, freq
+FROM customer_email_counts
+WHERE freq > 1
+ORDER BY freq DESC, email;
+""",
+    # 3. Inactive Customers (>1 year): a cutoff on last_active instead of
+    # computing julianday() for every customer
+    "inactive_customers": """
 SELECT customer_id, name, country, last_active,
        ROUND(julianday('now') - julianday(last_active)) AS days_inactive
 FROM customers
-WHERE ROUND(julianday('now') - julianday(last_active)) > 365
-ORDER BY days_inactive DESC;
-"""
-inactive = pd.read_sql_query(inactive_query, conn)
-inactive.to_csv('../data/processed/inactive_customers.csv', index=False)
-print("\nInactive customers (top 5):\n", inactive.head())
-
-# --- 4. Cohort Analysis by Signup Month & Country ---
-cohort_query = """
-SELECT strftime('%Y-%m', signup_date) AS signup_month,
-       country,
-       COUNT(*) AS total_customers
-FROM customers
-GROUP BY signup_month, country
+WHERE last_active <= datetime('now', :inactive_cutoff)
+ORDER BY last_active, customer_id;
+""",
+    # 4. Cohort Analysis by Signup Month & Country
+    "cohort_analysis": """
+SELECT signup_month, country, total_customers
+FROM customer_cohorts
 ORDER BY signup_month, country;
-"""
-cohort = pd.read_sql_query(cohort_query, conn)
-cohort.to_csv('../data/processed/cohort_analysis.csv', index=False)
-print("\nCohort analysis (top 5 rows):\n", cohort.head())
-
-# --- 5. Recency Ranking using Window Function ---
-window_query = """
+""",
+    # 5. Recency Ranking using Window Function (rows come pre-sorted from
+    # idx_customers_country_last_active)
+    "recency_ranking": """
 SELECT customer_id, name, country, last_active,
        RANK() OVER(PARTITION BY country ORDER BY last_active DESC) AS rank_recent
 FROM customers;
-"""
-recency_rank = pd.read_sql_query(window_query, conn)
-recency_rank.to_csv('../data/processed/recency_ranking.csv', index=False)
-print("\nRecency ranking (top 5 rows):\n", recency_rank.head())
-
-# --- 6. Visualizations ---
-sns.set(style="whitegrid")
-
-# Missing values bar chart
-plt.figure(figsize=(6,4))
-sns.barplot(x=missing_pct.columns, y=missing_pct.iloc[0].values)
-plt.ylabel('% Missing')
-plt.title('Missing Values Percentage')
-plt.savefig('../outputs/dashboard_plots/missing_values_pct.png')
-plt.close()
-
-# Duplicate emails frequency plot
-plt.figure(figsize=(6,4))
-sns.histplot(duplicates['freq'], bins=range(2, duplicates['freq'].max()+2), discrete=True)
-plt.title('Duplicate Email Frequencies')
-plt.xlabel('Frequency')
-plt.ylabel('Number of Emails')
-plt.savefig('../outputs/dashboard_plots/duplicate_email_freq.png')
-plt.close()
-
-# Average inactivity by country
-inactive_avg = inactive.groupby('country')['days_inactive'].mean().reset_index()
-plt.figure(figsize=(6,4))
-sns.barplot(x='country', y='days_inactive', data=inactive_avg)
-plt.title('Average Days Inactive by Country')
-plt.ylabel('Days')
-plt.savefig('../outputs/dashboard_plots/avg_days_inactive.png')
-plt.close()
-
-print("\nAdvanced SQL profiling and visualizations complete! Outputs saved in data/processed and outputs/dashboard_plots.")
-
-# Close connection
-conn.close()
+""",
+}
+
+
+def run_analytics(conn):
+    # Named parameters a query does not use are ignored
+    params = {"inactive_cutoff": inactive_cutoff()}
+    results = {name: pd.read_sql_query(query, conn, params=params) for name, query in ANALYTICS_QUERIES.items()}
+    # country comes back once per customer in the row-level results; held as
+    # the store's dictionary codes, and the per-country group-bys use them
+    dictionaries = {}
+    for df in results.values():
+        encode_columns(df, conn, CUSTOMER_CATEGORIES, dictionaries)
+    conn.commit()
+    return results
+
+
+def main():
+    # --- Setup ---
+    # Ensure output folders exist
+    os.makedirs('../data/processed', exist_ok=True)
+    os.makedirs('../outputs/dashboard_plots', exist_ok=True)
+
+    # Persistent store; only customers added since the last run are loaded
+    conn = connect('../data/processed/customers.db')
+    refresh_mode, added = refresh_customer_store(conn, '../data/raw/customers_raw.csv')
+    print(f"Customer store refreshed ({refresh_mode}, {added} customers added)")
+
+    results = run_analytics(conn)
+
+    # --- 1. Missing Values Percentage ---
+    missing_pct = results["missing_values_pct"]
+    write_dataset(missing_pct, '../data/processed/missing_values_pct.csv')
+    print("Missing values percentage:\n", missing_pct)
+
+    # --- 2. Duplicate Emails ---
+    duplicates = results["duplicate_emails"]
+    write_dataset(duplicates, '../data/processed/duplicate_emails.csv')
+    print("\nDuplicate emails (top 5):\n", duplicates.head())
+
+    # --- 3. Inactive Customers (>1 year) ---
+    inactive = results["inactive_customers"]
+    write_dataset(inactive, '../data/processed/inactive_customers.csv')
+    print("\nInactive customers (top 5):\n", inactive.head())
+
+    # --- 4. Cohort Analysis by Signup Month & Country ---
+    cohort = results["cohort_analysis"]
+    write_dataset(cohort, '../data/processed/cohort_analysis.csv')
+    print("\nCohort analysis (top 5 rows):\n", cohort.head())
+
+    # --- 5. Recency Ranking using Window Function ---
+    recency_rank = results["recency_ranking"]
+    write_dataset(recency_rank, '../data/processed/recency_ranking.csv')
+    print("\nRecency ranking (top 5 rows):\n", recency_rank.head())
+
+    # --- 6. Visualizations ---
+    # Unchanged charts are skipped; the rest render in parallel (Agg backend)
+    inactive_avg = inactive.groupby('country')['days_inactive'].mean().reset_index()
+    render_charts([
+        ('../outputs/dashboard_plots/missing_values_pct.png', charts.missing_values_pct, {"missing_pct": missing_pct}),
+        ('../outputs/dashboard_plots/duplicate_email_freq.png', charts.duplicate_email_freq, {"duplicates": duplicates}),
+        ('../outputs/dashboard_plots/avg_days_inactive.png', charts.avg_days_inactive, {"inactive_avg": inactive_avg}),
+    ])
+
+    print("\nAdvanced SQL profiling and visualizations complete! Outputs saved in data/processed and outputs/dashboard_plots.")
+
+    # Close connection
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
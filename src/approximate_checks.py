@@ -0,0 +1,263 @@
+import argparse
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from db_connections import connect
+from dq_runs import ensure_sla_rules
+from dq_thresholds import DQ_THRESHOLDS
+from fused_checks import load_rules
+from parallel_checks import load_checks
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+SQL_DIR = BASE_DIR / "sql"
+
+# Table, stratum column and check source per dataset
+DATASETS = {
+    "workforce": {
+        "db": PROCESSED_DIR / "workforce.db",
+        "table": "workforce",
+        "stratum": "Parent Department",
+    },
+    "customers": {
+        "db": PROCESSED_DIR / "customers.db",
+        "table": "customers",
+        "stratum": "country",
+    },
+}
+
+# Two-sided confidence level of the interval used for PASS/FAIL decisions
+CONFIDENCE = 0.99
+
+# Rows drawn per sampling round; sampling stops once every check is decided
+ROUND_ROWS = 5_000
+MAX_SAMPLE_ROWS = 200_000
+
+SEED = 42
+
+# Up to this many rowids, draws come from the remaining rowids directly instead
+# of by rejection, so small tables do not stall on repeats
+DIRECT_DRAW_ROWIDS = 2_000_000
+
+# Row-level customer checks: SELECT '<name>' AS check_name, COUNT(*) AS failed_rows
+# FROM customers WHERE <predicate>. Anything else (duplicate_email) is run exactly.
+CUSTOMER_RULE_PATTERN = re.compile(
+    r"SELECT\s+'(?P<check_name>\w+)'\s+AS\s+check_name\s*,\s*COUNT\(\*\)\s+AS\s+failed_rows\s+"
+    r"FROM\s+customers\s+WHERE\s+(?P<predicate>.+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+# --- checks and thresholds ---
+def workforce_checks(conn):
+    # SLA limits are row counts; checks without an SLA rule are not evaluated
+    ensure_sla_rules(conn)
+    limits = dict(conn.execute("SELECT check_name, max_failed_rows FROM dq_sla_rules"))
+    rules = [(name, predicate) for name, predicate in load_rules(SQL_DIR / "dq_workforce_checks.sql") if name in limits]
+    return rules, [], lambda name, rows: limits[name] / rows if rows else 0
+
+
+def customer_checks(conn):
+    # DQ_THRESHOLDS are failure rates; unlisted checks allow none (as classify_sla)
+    rules = []
+    exact_only = []
+    for query in load_checks(BASE_DIR / "src" / "data_quality_checks.sql"):
+        match = CUSTOMER_RULE_PATTERN.search(re.sub(r"--[^\n]*", "", query).strip())
+        if match:
+            rules.append((match.group("check_name"), match.group("predicate").strip()))
+        else:
+            exact_only.append(query)
+    return rules, exact_only, lambda name, rows: DQ_THRESHOLDS.get(name, 0)
+
+
+# --- strata ---
+def stratum_sizes(conn, table, column):
+    # One GROUP BY per evaluation; the per-stratum sample is what stays small
+    sizes = conn.execute(
+        f"SELECT COALESCE({_quote(column)}, ''), COUNT(*) FROM {table} GROUP BY 1"
+    ).fetchall()
+    return {stratum: count for stratum, count in sizes}
+
+
+# --- interval ---
+def wilson_interval(p, n, z):
+    if n <= 0:
+        return 0.0, 1.0
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    # Exact bounds at the extremes; the formula leaves rounding residue there
+    low = 0.0 if p <= 0 else max(0.0, centre - margin)
+    high = 1.0 if p >= 1 else min(1.0, centre + margin)
+    return low, high
+
+
+def stratified_estimate(sampled, hits, weights, z):
+    # sampled[h]: rows drawn from stratum h, hits[h]: failing rows among them.
+    # Strata with no rows drawn yet take the pooled rate. The stratified
+    # variance is turned into an effective sample size for a Wilson interval.
+    n = sampled.sum()
+    pooled = hits.sum() / n if n else 0.0
+    seen = sampled > 0
+    rates = np.where(seen, hits / np.maximum(sampled, 1), pooled)
+    p = float((weights * rates).sum())
+    variance = float((weights[seen] ** 2 * rates[seen] * (1 - rates[seen]) / sampled[seen]).sum())
+    n_eff = p * (1 - p) / variance if variance > 0 else n
+    return p, wilson_interval(p, min(n_eff, n) if variance > 0 else n, z)
+
+
+# --- sampling ---
+def _draw_rowids(rng, max_rowid, size, seen):
+    # Uniform rowids without replacement across rounds; rowids left by
+    # deleted rows simply return nothing
+    if max_rowid <= DIRECT_DRAW_ROWIDS:
+        remaining = np.setdiff1d(np.arange(1, max_rowid + 1), seen, assume_unique=True)
+        return np.sort(rng.choice(remaining, size=min(size, len(remaining)), replace=False))
+    return np.setdiff1d(np.unique(rng.integers(1, max_rowid + 1, size=size)), seen, assume_unique=True)
+
+
+def sample_round(conn, table, column, rules, rowids):
+    flags = ", ".join(f"CASE WHEN {predicate} THEN 1 ELSE 0 END" for _, predicate in rules)
+    conn.execute("DELETE FROM temp.dq_sample_ids")
+    conn.executemany("INSERT INTO temp.dq_sample_ids VALUES (?)", ((int(i),) for i in rowids))
+    return conn.execute(f"""
+    SELECT COALESCE({_quote(column)}, ''), {flags}
+    FROM temp.dq_sample_ids s
+    JOIN {table} ON {table}.rowid = s.record_id
+    """).fetchall()
+
+
+def exact_counts(conn, table, rules):
+    # One scan for every check the sample could not decide
+    if not rules:
+        return {}
+    sums = ", ".join(f"SUM(CASE WHEN {predicate} THEN 1 ELSE 0 END)" for _, predicate in rules)
+    row = conn.execute(f"SELECT {sums} FROM {table}").fetchone()
+    return {name: int(count or 0) for (name, _), count in zip(rules, row)}
+
+
+# --- evaluation ---
+def evaluate(conn, dataset, confidence=CONFIDENCE, round_rows=ROUND_ROWS,
+             max_sample_rows=MAX_SAMPLE_ROWS, seed=SEED):
+    config = DATASETS[dataset]
+    table, column = config["table"], config["stratum"]
+    rules, exact_only, threshold = (workforce_checks if dataset == "workforce" else customer_checks)(conn)
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+    sizes = stratum_sizes(conn, table, column)
+    strata = {stratum: i for i, stratum in enumerate(sizes)}
+    total_rows = sum(sizes.values())
+    weights = np.array(list(sizes.values()), dtype=float) / max(total_rows, 1)
+    limits = {name: threshold(name, total_rows) for name, _ in rules}
+
+    sampled = np.zeros(len(strata))
+    hits = np.zeros((len(rules), len(strata)))
+    results = {}
+    max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+    rng = np.random.default_rng(seed)
+    seen = np.array([], dtype=np.int64)
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS dq_sample_ids (record_id INTEGER PRIMARY KEY)")
+    # A check whose limit is below the upper bound of a failure-free full-size
+    # sample can only be failed by sampling, never passed; after the first
+    # round it goes straight to the exact count instead of using up the budget
+    _, clean_high = wilson_interval(0.0, min(max_sample_rows, total_rows), z)
+    provable = {name for name, limit in limits.items() if limit >= clean_high}
+
+    undecided = list(range(len(rules)))
+    borderline = []
+    while undecided and len(seen) < min(max_sample_rows, max_rowid):
+        rowids = _draw_rowids(rng, max_rowid, min(round_rows, max_sample_rows - len(seen)), seen)
+        seen = np.union1d(seen, rowids)
+        rows = sample_round(conn, table, column, rules, rowids)
+        if not rows:
+            continue
+        index = np.array([strata.get(row[0], -1) for row in rows])
+        flags = np.array([row[1:] for row in rows], dtype=float)
+        known = index >= 0
+        sampled += np.bincount(index[known], minlength=len(strata))
+        for r in range(len(rules)):
+            hits[r] += np.bincount(index[known], weights=flags[known, r], minlength=len(strata))
+
+        # Early exit per check: decided once the interval clears the limit
+        still_open = []
+        for r in undecided:
+            name = rules[r][0]
+            p, (low, high) = stratified_estimate(sampled, hits[r], weights, z)
+            if high <= limits[name]:
+                status = "PASS"
+            elif low > limits[name]:
+                status = "FAIL"
+            else:
+                if name in provable:
+                    still_open.append(r)
+                continue
+            results[name] = {
+                "method": "sampled", "sample_rows": int(sampled.sum()), "pct_failed": p,
+                "ci_low": low, "ci_high": high, "failed_rows": round(p * total_rows), "sla_status": status,
+            }
+        borderline += [r for r in undecided if r not in still_open and rules[r][0] not in results]
+        undecided = still_open
+    conn.execute("DROP TABLE temp.dq_sample_ids")
+
+    # Borderline checks (and zero-tolerance checks with no sampled failures,
+    # which a sample can never prove clean) fall back to an exact count
+    borderline = [rules[r] for r in sorted(borderline + undecided)]
+    for name, failed in exact_counts(conn, table, borderline).items():
+        pct = failed / total_rows if total_rows else 0.0
+        results[name] = {
+            "method": "exact", "sample_rows": int(sampled.sum()), "pct_failed": pct, "ci_low": pct,
+            "ci_high": pct, "failed_rows": failed, "sla_status": "PASS" if pct <= limits[name] else "FAIL",
+        }
+    for query in exact_only:
+        name, failed = conn.execute(query).fetchone()
+        pct = failed / total_rows if total_rows else 0.0
+        results[name] = {
+            "method": "exact", "sample_rows": 0, "pct_failed": pct, "ci_low": pct, "ci_high": pct,
+            "failed_rows": failed, "sla_status": "PASS" if pct <= threshold(name, total_rows) else "FAIL",
+        }
+
+    order = [name for name, _ in rules] + [name for name in results if name not in limits]
+    estimates = pd.DataFrame([{"check_name": name, **results[name]} for name in order])
+    estimates.insert(0, "evaluated_at", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    return estimates, total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate SLA status from a stratified sample")
+    parser.add_argument("--dataset", choices=list(DATASETS), default="workforce")
+    parser.add_argument("--db", type=Path, help="Database (default: the dataset's processed database)")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE)
+    parser.add_argument("--round-rows", type=int, default=ROUND_ROWS)
+    parser.add_argument("--max-sample-rows", type=int, default=MAX_SAMPLE_ROWS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", type=Path, help="CSV path (default: data/processed/dq_sla_estimates_<dataset>.csv)")
+    args = parser.parse_args()
+
+    conn = connect(args.db or DATASETS[args.dataset]["db"])
+    estimates, total_rows = evaluate(
+        conn, args.dataset, args.confidence, args.round_rows, args.max_sample_rows, args.seed
+    )
+    conn.close()
+
+    output = args.output or PROCESSED_DIR / f"dq_sla_estimates_{args.dataset}.csv"
+    estimates.to_csv(output, index=False)
+
+    sampled = (estimates["method"] == "sampled").sum()
+    print(estimates.drop(columns="evaluated_at").to_string(index=False))
+    print(f"\n{total_rows} rows: {sampled} checks decided from the sample, "
+          f"{len(estimates) - sampled} evaluated exactly. Written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Empty
+
+from db_connections import connect
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / "src"
+RESULTS_DIR = BASE_DIR / "outputs" / "benchmarks"
+RESULTS_PATH = RESULTS_DIR / "benchmark_results.json"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+
+SCALES = [10_000, 100_000, 1_000_000, 10_000_000]
+SEED = 7
+
+# Relative slowdown (wall time or peak RSS) that counts as a regression
+TOLERANCE = 0.20
+
+# Stages that render every audit row are capped; larger scales are skipped
+STAGE_MAX_ROWS = {
+    "portfolio_charts": 1_000_000,
+}
+
+
+# --- measurement ---
+def _max_rss_mb():
+    # ru_maxrss survives exec on Linux, so a spawned child would report the
+    # parent's peak; VmHWM belongs to the current address space only
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage_worker(stage, stage_dir, rows, queue):
+    # Runs in a fresh interpreter, so peak RSS belongs to this stage alone
+    run = STAGES[stage][1]
+    rss_before = _max_rss_mb()
+    start = time.perf_counter()
+    run(Path(stage_dir), rows)
+    wall = time.perf_counter() - start
+    queue.put({"wall_s": wall, "peak_rss_mb": _max_rss_mb(), "rss_before_mb": rss_before})
+
+
+def measure(stage, stage_dir, rows):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_stage_worker, args=(stage, str(stage_dir), rows, queue))
+    process.start()
+
+    # Read the result before joining: a child that has put data on a Queue
+    # does not exit until that data is flushed. Stages can run for minutes, so
+    # the timeout only lets a child that died without a result be noticed.
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1)
+        except Empty:
+            if not process.is_alive():
+                # It may have put its result just before exiting
+                try:
+                    result = queue.get(timeout=1)
+                except Empty:
+                    break
+    process.join()
+    if process.exitcode != 0 or result is None:
+        raise RuntimeError(f"stage {stage} failed at {rows} rows (exit code {process.exitcode})")
+
+    result["rows_per_s"] = rows / result["wall_s"] if result["wall_s"] > 0 else None
+    return result
+
+
+# --- shared inputs per scale (built once, not timed) ---
+def prepare_scale(workdir, rows):
+    from generate_data import generate_customers, generate_workforce, write_csv, write_sqlite
+    from load_workforce_to_db import apply_full_load, create_tracking_tables, load_workforce
+
+    scale_dir = Path(workdir) / f"rows_{rows}"
+    marker = scale_dir / ".ready"
+    if marker.exists():
+        return scale_dir
+    scale_dir.mkdir(parents=True, exist_ok=True)
+
+    write_csv(generate_customers(rows, SEED), scale_dir / "customers.csv")
+    write_sqlite(generate_customers(rows, SEED), scale_dir / "customers.db", "customers")
+    write_csv(generate_workforce(rows, SEED), scale_dir / "workforce.csv")
+
+    conn = connect(scale_dir / "workforce.db")
+    create_tracking_tables(conn)
+    load_workforce(conn, scale_dir / "workforce.csv")
+    apply_full_load(conn)
+    conn.close()
+
+    marker.touch()
+    return scale_dir
+
+
+def _seed_history(db_path, rows, with_audit_log=False):
+    from historical_store import ensure_historical_store
+
+    checks = ["missing_email", "missing_phone", "duplicate_email", "invalid_email_format", "last_active_before_signup"]
+    conn = connect(db_path)
+    ensure_historical_store(conn)
+
+    # One run of all checks every 15 minutes, going back as far as needed
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    batch = []
+    for i in range(rows):
+        run = i // len(checks)
+        timestamp = datetime.fromtimestamp(start + run * 900, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        failed = (i * 37) % 500
+        batch.append((checks[i % len(checks)], failed, 5000, failed / 5000, timestamp, timestamp[:10]))
+        if len(batch) == 100_000 or i == rows - 1:
+            conn.executemany(
+                """
+                INSERT INTO dq_audit_log_historical
+                    (check_name, failed_rows, total_rows, pct_failed, check_timestamp, partition_day)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                batch,
+            )
+            if with_audit_log:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS dq_audit_log "
+                    "(check_name TEXT, failed_rows INTEGER, check_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+                )
+                conn.executemany(
+                    "INSERT INTO dq_audit_log (check_name, failed_rows, check_timestamp) VALUES (?, ?, ?)",
+                    [(b[0], b[1], b[4]) for b in batch],
+                )
+            batch = []
+    conn.commit()
+    conn.close()
+
+
+# --- stage setup (parent, untimed) and run (child, timed) ---
+def setup_copy(*names):
+    def setup(scale_dir, stage_dir, rows):
+        for name in names:
+            shutil.copy(scale_dir / name, stage_dir / name)
+    return setup
+
+
+def setup_sla(scale_dir, stage_dir, rows):
+    from fused_checks import load_rules, run_fused_checks
+
+    shutil.copy(scale_dir / "workforce.db", stage_dir / "workforce.db")
+    conn = connect(stage_dir / "workforce.db")
+    run_fused_checks(conn, load_rules())
+    conn.close()
+
+
+def setup_customer_store(scale_dir, stage_dir, rows):
+    from customer_store import full_load
+
+    shutil.copy(scale_dir / "customers.csv", stage_dir / "customers.csv")
+    conn = connect(stage_dir / "customers.db")
+    full_load(conn, stage_dir / "customers.csv")
+    conn.close()
+
+
+def setup_history(scale_dir, stage_dir, rows):
+    _seed_history(stage_dir / "customers.db", rows)
+
+
+def setup_portfolio(scale_dir, stage_dir, rows):
+    (stage_dir / "data" / "processed").mkdir(parents=True)
+    _seed_history(stage_dir / "data" / "processed" / "customers.db", rows, with_audit_log=True)
+
+
+def run_ingestion(stage_dir, rows):
+    from load_workforce_to_db import apply_full_load, create_tracking_tables, load_workforce
+
+    conn = connect(stage_dir / "ingested.db")
+    create_tracking_tables(conn)
+    load_workforce(conn, stage_dir / "workforce.csv")
+    apply_full_load(conn)
+    conn.close()
+
+
+def run_customer_checks(stage_dir, rows):
+    from parallel_checks import load_checks, run_checks_parallel
+
+    run_checks_parallel(stage_dir / "customers.db", load_checks())
+
+
+def run_workforce_checks(stage_dir, rows):
+    from fused_checks import load_rules, run_fused_checks
+
+    conn = connect(stage_dir / "workforce.db")
+    run_fused_checks(conn, load_rules())
+    conn.close()
+
+
+def run_sla_evaluation(stage_dir, rows):
+    from dq_runs import ensure_audit_tables, ensure_sla_rules, evaluate_sla, log_run_results, start_run
+    from fused_checks import load_rules
+
+    conn = connect(stage_dir / "workforce.db")
+    ensure_audit_tables(conn)
+    run_id, timestamp = start_run(conn, "benchmark")
+    log_run_results(conn, run_id, timestamp, [name for name, _ in load_rules()])
+    ensure_sla_rules(conn)
+    evaluate_sla(conn, run_id)
+    conn.close()
+
+
+def run_historical_export(stage_dir, rows):
+    from historical_store import export_new_runs, refresh_rollups
+
+    conn = connect(stage_dir / "customers.db")
+    refresh_rollups(conn)
+    export_new_runs(conn, stage_dir / "dq_audit_log_historical.csv")
+    conn.close()
+
+
+def run_dashboard_queries(stage_dir, rows):
+    from advanced_sql_dashboard import run_analytics
+    from customer_store import refresh_customer_store
+
+    # Same flow as advanced_sql_dashboard.py: refresh the persistent store, then query it
+    conn = connect(stage_dir / "customers.db")
+    refresh_customer_store(conn, stage_dir / "customers.csv")
+    run_analytics(conn)
+    conn.close()
+
+
+def run_portfolio_charts(stage_dir, rows):
+    import matplotlib
+    from generate_portfolio_outputs import main as generate_portfolio_outputs
+
+    matplotlib.use("Agg")
+    generate_portfolio_outputs(stage_dir / "data" / "processed" / "customers.db", stage_dir / "outputs")
+
+
+STAGES = {
+    "ingestion": (setup_copy("workforce.csv"), run_ingestion),
+    "customer_checks": (setup_copy("customers.db"), run_customer_checks),
+    "workforce_checks": (setup_copy("workforce.db"), run_workforce_checks),
+    "sla_evaluation": (setup_sla, run_sla_evaluation),
+    "historical_export": (setup_history, run_historical_export),
+    "dashboard_queries": (setup_customer_store, run_dashboard_queries),
+    "portfolio_charts": (setup_portfolio, run_portfolio_charts),
+}
+
+
+# --- suite ---
+def run_suite(scales, stages, workdir):
+    results = []
+    for rows in scales:
+        scale_dir = prepare_scale(workdir, rows)
+        for stage in stages:
+            if rows > STAGE_MAX_ROWS.get(stage, rows):
+                print(f"{stage:>18} @ {rows:>10,}: skipped (above {STAGE_MAX_ROWS[stage]:,} rows)")
+                results.append({"stage": stage, "rows": rows, "skipped": True})
+                continue
+
+            stage_dir = scale_dir / "stages" / stage
+            shutil.rmtree(stage_dir, ignore_errors=True)
+            stage_dir.mkdir(parents=True)
+            STAGES[stage][0](scale_dir, stage_dir, rows)
+
+            result = {"stage": stage, "rows": rows, **measure(stage, stage_dir, rows)}
+            results.append(result)
+            shutil.rmtree(stage_dir, ignore_errors=True)
+            print(f"{stage:>18} @ {rows:>10,}: {result['wall_s']:8.3f}s  "
+                  f"{result['peak_rss_mb']:8.1f} MB  {result['rows_per_s']:>14,.0f} rows/s")
+    return results
+
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+# --- baseline comparison ---
+def compare(results, baseline, tolerance=TOLERANCE):
+    reference = {
+        (r["stage"], r["rows"]): r for r in baseline["results"] if not r.get("skipped")
+    }
+    regressions = []
+    for result in results:
+        base = reference.get((result["stage"], result["rows"]))
+        if result.get("skipped") or base is None:
+            continue
+        for metric in ("wall_s", "peak_rss_mb"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append({
+                    "stage": result["stage"],
+                    "rows": result["rows"],
+                    "metric": metric,
+                    "baseline": base[metric],
+                    "current": result[metric],
+                    "change_pct": 100 * (result[metric] / base[metric] - 1),
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage at several scales")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--workdir", type=Path, help="Reuse generated inputs between invocations")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write results to {BASELINE_PATH.name}")
+    parser.add_argument("--compare", type=Path, nargs="?", const=BASELINE_PATH, help="Flag regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="dq_bench_"))
+    results = run_suite(args.scales, args.stages, workdir)
+    report = {"environment": environment(), "results": results}
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} @ {r['rows']:,} rows: {r['metric']} "
+                  f"{r['baseline']:.3f} -> {r['current']:.3f} ({r['change_pct']:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQL_DICTIONARIES = BASE_DIR / "sql" / "dq_dictionaries.sql"
+
+# Low-cardinality text columns held as dictionary codes in pandas
+WORKFORCE_CATEGORIES = [
+    "Parent Department",
+    "Organisation",
+    "Grade",
+    "Office Region",
+    "Professional/Occupational Group",
+]
+CUSTOMER_CATEGORIES = ["country"]
+CATEGORICAL_COLUMNS = WORKFORCE_CATEGORIES + CUSTOMER_CATEGORIES
+
+
+# --- persisted dictionaries ---
+def ensure_dictionary_table(conn, sql_path=SQL_DICTIONARIES):
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+def load_dictionary(conn, column):
+    # Values in code order: position i holds the value with code i
+    return [
+        row[0] for row in conn.execute(
+            "SELECT value FROM dq_dictionaries WHERE column_name = ? ORDER BY code", (column,)
+        )
+    ]
+
+
+def extend_dictionary(conn, column, values, known=None):
+    # Unseen values get the next free codes; existing codes never move.
+    # The caller commits.
+    known = load_dictionary(conn, column) if known is None else known
+    seen = set(known)
+    new = sorted({value for value in values if value not in seen})
+    conn.executemany(
+        "INSERT INTO dq_dictionaries (column_name, code, value) VALUES (?, ?, ?)",
+        [(column, len(known) + position, value) for position, value in enumerate(new)],
+    )
+    return known + new
+
+
+# --- encoding ---
+def encode_column(series, categories):
+    # One hash pass over the rows (factorize); the distinct values are then
+    # mapped to their dictionary codes, which are few
+    codes, uniques = pd.factorize(series)
+    if len(uniques):
+        position = {value: code for code, value in enumerate(categories)}
+        remap = np.array([position[value] for value in uniques], dtype=np.int32)
+        codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+
+
+def _as_values(series):
+    return series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series
+
+
+def refresh_dictionaries(df, conn, columns=CATEGORICAL_COLUMNS, dictionaries=None):
+    # Adds the values of df's text columns to conn's dq_dictionaries without
+    # encoding df, for loaders that only write the rows on. Pass the same
+    # `dictionaries` dict for every chunk of a load to skip re-reading them.
+    dictionaries = {} if dictionaries is None else dictionaries
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = _as_values(df[column]).dropna().unique()
+        known = dictionaries.get(column)
+        if known is None or not set(values) <= set(known):
+            dictionaries[column] = extend_dictionary(conn, column, values, known)
+    return dictionaries
+
+
+def encode_columns(df, conn, columns=CATEGORICAL_COLUMNS, dictionaries=None):
+    # Replaces the text columns present in df with categoricals whose codes
+    # are the ones stored in conn's dq_dictionaries
+    dictionaries = refresh_dictionaries(df, conn, columns, dictionaries)
+    for column in columns:
+        if column in df.columns:
+            df[column] = encode_column(_as_values(df[column]), dictionaries[column])
+    return df
+
+
+def downcast_numeric(df):
+    # Integers shrink to the smallest type that holds them. Floats become
+    # float32 only when no value changes, so anything written back to SQLite
+    # or compared against a limit is identical.
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            narrow = series.astype(np.float32)
+            if np.array_equal(narrow.to_numpy(np.float64), series.to_numpy(np.float64), equal_nan=True):
+                df[column] = narrow
+    return df
+
+
+def compact_frame(df, conn, columns=CATEGORICAL_COLUMNS):
+    # Dictionary-encoded text columns and downcast numbers; the new dictionary
+    # entries are committed with conn
+    ensure_dictionary_table(conn)
+    encode_columns(df, conn, columns)
+    downcast_numeric(df)
+    conn.commit()
+    return df
+
+
+def frame_memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
@@ -0,0 +1,83 @@
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Chart renderers used through render_cache.render_charts. They live in an
+# importable module so worker processes can unpickle them.
+
+
+# --- portfolio outputs ---
+def audit_log_snapshot(output, audit_df):
+    # Plot audit log snapshot as a horizontal bar chart (failed_rows)
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x="failed_rows", y="check_name", data=audit_df, palette="viridis")
+    plt.title("Audit Log Snapshot - Failed Rows per Check")
+    plt.xlabel("Failed Rows")
+    plt.ylabel("Check Name")
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+
+def sla_bar_chart(output, audit_df):
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x="pct_failed", y="check_name", data=audit_df, palette="magma")
+    plt.title("SLA Violation Chart (% Failed per Check)")
+    plt.xlabel("% Failed")
+    plt.ylabel("Check Name")
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+
+def historical_trend(output, series):
+    # series: one column per check, indexed by period (see trend_series)
+    plt.figure(figsize=(10, 6))
+    for check in series.columns:
+        values = series[check].dropna()
+        plt.plot(values.index, values.to_numpy(), marker='o', label=check)
+
+    plt.title("Historical SLA Trends")
+    plt.xlabel("Timestamp")
+    plt.ylabel("% Failed")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+
+def trend_series(hist_df, value="pct_failed"):
+    # Every check's series from one pivot instead of a filter per check
+    return hist_df.pivot_table(index="period_start", columns="check_name", values=value, aggfunc="mean")
+
+
+# --- advanced SQL dashboard ---
+def missing_values_pct(output, missing_pct):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(6,4))
+    sns.barplot(x=missing_pct.columns, y=missing_pct.iloc[0].values)
+    plt.ylabel('% Missing')
+    plt.title('Missing Values Percentage')
+    plt.savefig(output)
+    plt.close()
+
+
+def duplicate_email_freq(output, duplicates):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(6,4))
+    sns.histplot(duplicates['freq'], bins=range(2, duplicates['freq'].max()+2), discrete=True)
+    plt.title('Duplicate Email Frequencies')
+    plt.xlabel('Frequency')
+    plt.ylabel('Number of Emails')
+    plt.savefig(output)
+    plt.close()
+
+
+def avg_days_inactive(output, inactive_avg):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(6,4))
+    sns.barplot(x='country', y='days_inactive', data=inactive_avg)
+    plt.title('Average Days Inactive by Country')
+    plt.ylabel('Days')
+    plt.savefig(output)
+    plt.close()
@@ -1,7 +1,7 @@
-import pandas as pd
+from columnar_store import read_dataset
 
-# Load the generated CSV
-df = pd.read_csv('../data/raw/customers_raw.csv')
+# Load the generated dataset (Parquet copy when available)
+df = read_dataset('../data/raw/customers_raw.csv')
 
 # Show first 5 rows
 print("First 5 rows of dataset:")
@@ -0,0 +1,118 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQL_TELEMETRY = BASE_DIR / "sql" / "dq_telemetry.sql"
+
+# JSONL span file written after every run when set (--telemetry-export overrides)
+DEFAULT_EXPORT = os.environ.get("DQ_TELEMETRY_EXPORT")
+
+# The progress handler fires every N VM instructions; steps are counted in these units
+PROGRESS_INTERVAL = 1000
+
+TELEMETRY_COLUMNS = ["check_name", "wall_ms", "vm_steps", "memory_delta_kb", "used_index", "query_plan"]
+
+
+# --- measurement ---
+def _rss_kb():
+    # Current resident set size; None where /proc is unavailable
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+@contextmanager
+def measure(conn):
+    # Fills the yielded dict with wall time, VM steps and RSS delta once the
+    # block exits. RSS is process-wide, so checks running concurrently on
+    # other threads show up in each other's delta.
+    stats = {}
+    ticks = [0]
+
+    def tick():
+        ticks[0] += 1
+        return 0
+
+    conn.set_progress_handler(tick, PROGRESS_INTERVAL)
+    rss_before = _rss_kb()
+    stats["started_at"] = time.time()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["wall_ms"] = (time.perf_counter() - start) * 1000
+        conn.set_progress_handler(None, 0)
+        stats["vm_steps"] = ticks[0] * PROGRESS_INTERVAL
+        rss_after = _rss_kb()
+        stats["memory_delta_kb"] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+
+def query_plan(conn, sql, params=()):
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    # Automatic indexes are built per statement and thrown away, so they do not count
+    used_index = any(
+        ("USING" in detail and "INDEX" in detail and "AUTOMATIC" not in detail)
+        or "USING INTEGER PRIMARY KEY" in detail
+        or "USING ROWID" in detail
+        for detail in details
+    )
+    return "; ".join(details), used_index
+
+
+def profile_statement(conn, check_name, sql, params=()):
+    # Runs one statement under measurement and returns (rows, telemetry record)
+    plan, used_index = query_plan(conn, sql, params)
+    with measure(conn) as stats:
+        rows = conn.execute(sql, params).fetchall()
+    return rows, {"check_name": check_name, **stats, "used_index": used_index, "query_plan": plan}
+
+
+# --- storage and export ---
+def ensure_telemetry_table(conn, sql_path=SQL_TELEMETRY):
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+def next_run_id(conn):
+    ensure_telemetry_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(run_id), 0) + 1 FROM dq_check_telemetry").fetchone()[0]
+
+
+def record_telemetry(conn, run_id, run_timestamp, records):
+    ensure_telemetry_table(conn)
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO dq_check_telemetry
+            (run_id, check_name, run_timestamp, wall_ms, vm_steps, memory_delta_kb, used_index, query_plan)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (run_id, r["check_name"], run_timestamp, r["wall_ms"], r["vm_steps"],
+             r["memory_delta_kb"], int(r["used_index"]), r["query_plan"])
+            for r in records
+        ],
+    )
+    conn.commit()
+
+
+def export_spans(path, source, run_id, records):
+    # One trace span per check, appended as JSON lines
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for r in records:
+            f.write(json.dumps({
+                "name": r["check_name"],
+                "source": source,
+                "run_id": run_id,
+                "start_time": r["started_at"],
+                "end_time": r["started_at"] + r["wall_ms"] / 1000,
+                "attributes": {column: r[column] for column in TELEMETRY_COLUMNS[1:]},
+            }) + "\n")
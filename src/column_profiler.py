@@ -0,0 +1,329 @@
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from categorical_frames import CATEGORICAL_COLUMNS, encode_columns, ensure_dictionary_table
+from columnar_store import iter_chunks
+from db_connections import connect, readonly_connection
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQL_PROFILES = BASE_DIR / "sql" / "dq_profiles.sql"
+WORKFORCE_DB = BASE_DIR / "data" / "processed" / "workforce.db"
+
+CHUNK_SIZE = 50_000
+
+# HyperLogLog precision: 2^14 one-byte registers per column, ~0.8% standard error
+HLL_PRECISION = 14
+
+# Counters kept per column for top-k; frequent values survive every trim
+TOP_K = 10
+TOPK_CAPACITY = 1000
+
+# Reservoir sample per numeric column for approximate quantiles
+RESERVOIR_SIZE = 20_000
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+
+# --- sketches ---
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = (hashes & np.uint64((1 << tail_bits) - 1)).astype(np.float64)
+        # Position of the leftmost 1-bit in the tail; tail < 2^50 is exact in float64
+        rank = (tail_bits - np.frexp(tail)[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class TopK:
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+
+    def add_counts(self, value_counts):
+        for value, count in value_counts.items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.capacity:
+            # Keep only the largest counters; a value dropped here restarts
+            # from zero if it comes back, so counts never overstate
+            kept = sorted(self.counts.items(), key=lambda item: -item[1])[:self.capacity]
+            self.counts = dict(kept)
+
+    def top(self, k=TOP_K):
+        # Exact until the first trim, lower bounds after it
+        return sorted(self.counts.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+
+class Reservoir:
+    def __init__(self, size=RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.sample = np.empty(0, dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        room = max(0, self.size - len(self.sample))
+        if room:
+            self.sample = np.concatenate([self.sample, values[:room]])
+            self.seen += min(room, len(values))
+            values = values[room:]
+        if len(values) == 0:
+            return
+
+        # Algorithm R, vectorised: item t replaces a random slot with probability size / t
+        positions = self.seen + np.arange(1, len(values) + 1)
+        keep = self.rng.random(len(values)) < self.size / positions
+        slots = self.rng.integers(0, self.size, size=int(keep.sum()))
+        self.sample[slots] = values[keep]
+        self.seen += len(values)
+
+    def quantiles(self, qs=QUANTILES):
+        if len(self.sample) == 0:
+            return {}
+        return {str(q): float(v) for q, v in zip(qs, np.quantile(self.sample, qs))}
+
+
+# --- per-column state ---
+class ColumnProfile:
+    def __init__(self, name, numeric, seed=0):
+        self.name = name
+        self.numeric = numeric
+        self.rows = 0
+        self.nulls = 0
+        self.blanks = 0
+        self.minimum = None
+        self.maximum = None
+        self.hll = HyperLogLog()
+        self.top = TopK()
+        self.reservoir = Reservoir(seed=seed) if numeric else None
+
+    def add(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self.add_categorical(series)
+        self.rows += len(series)
+        if self.numeric:
+            values = pd.to_numeric(series, errors="coerce").astype("float64")
+        else:
+            values = series.astype("object").where(series.notna())
+        present = values.dropna()
+        self.nulls += len(series) - len(present)
+        if present.empty:
+            return
+
+        if not self.numeric:
+            present = present.astype(str)
+            self.blanks += int((present.str.strip() == "").sum())
+        else:
+            self.reservoir.add(present.to_numpy())
+
+        low, high = present.min(), present.max()
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        self.hll.add_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+        self.top.add_counts(present.value_counts(sort=False))
+
+    def add_categorical(self, series):
+        # Same summary as add(), computed per distinct value: counts come
+        # from the integer codes and only the categories are hashed
+        self.rows += len(series)
+        codes = series.cat.codes.to_numpy()
+        present = codes >= 0
+        self.nulls += int(len(codes) - present.sum())
+        counts = np.bincount(codes[present], minlength=len(series.cat.categories))
+        used = counts > 0
+        if not used.any():
+            return
+
+        values = pd.Series(series.cat.categories[used].astype(str))
+        counts = counts[used]
+        self.blanks += int(counts[(values.str.strip() == "").to_numpy()].sum())
+
+        low, high = values.min(), values.max()
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        self.hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        self.top.add_counts(pd.Series(counts, index=values.to_numpy()))
+
+    def result(self):
+        def as_text(value):
+            return None if value is None else str(value)
+
+        return {
+            "column_name": self.name,
+            "row_count": self.rows,
+            "null_count": self.nulls,
+            "blank_count": self.blanks,
+            "approx_distinct": self.hll.estimate() if self.rows > self.nulls else 0,
+            "min_value": as_text(self.minimum),
+            "max_value": as_text(self.maximum),
+            "top_values": json.dumps([[v.item() if hasattr(v, "item") else v, c] for v, c in self.top.top()]),
+            "quantiles": json.dumps(self.reservoir.quantiles()) if self.numeric else None,
+            "hll_registers": self.hll.registers.tobytes(),
+        }
+
+
+# --- streaming profile ---
+def profile_chunks(chunks, conn):
+    # One pass over the chunks; memory is bounded by the sketches, not the row count.
+    # Known low-cardinality text columns are profiled on the codes stored in
+    # conn's dq_dictionaries, the same in every chunk and every run; values
+    # not seen before are added there.
+    ensure_dictionary_table(conn)
+    dictionaries = {}
+    columns = None
+    for chunk in chunks:
+        encode_columns(chunk, conn, CATEGORICAL_COLUMNS, dictionaries)
+        if columns is None:
+            columns = [
+                ColumnProfile(
+                    name,
+                    pd.api.types.is_numeric_dtype(chunk[name]) and not pd.api.types.is_bool_dtype(chunk[name]),
+                    seed=position,
+                )
+                for position, name in enumerate(chunk.columns)
+            ]
+        for column in columns:
+            column.add(chunk[column.name])
+
+    conn.commit()
+    return [column.result() for column in columns or []]
+
+
+def sqlite_chunks(conn, table, chunk_size=CHUNK_SIZE):
+    return pd.read_sql_query(f'SELECT * FROM "{table}"', conn, chunksize=chunk_size)
+
+
+# --- snapshots ---
+def ensure_profile_tables(conn, sql_path=SQL_PROFILES):
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+def save_profile(conn, source, table_name, results):
+    ensure_profile_tables(conn)
+    row_count = results[0]["row_count"] if results else 0
+    cursor = conn.execute(
+        "INSERT INTO dq_profile_runs (source, table_name, row_count, profiled_at) VALUES (?, ?, ?, ?)",
+        (source, table_name, row_count, datetime.now(timezone.utc).isoformat()),
+    )
+    profile_id = cursor.lastrowid
+    conn.executemany(
+        """
+        INSERT INTO dq_column_profiles
+            (profile_id, column_name, position, row_count, null_count, blank_count, approx_distinct,
+             min_value, max_value, top_values, quantiles, hll_registers)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (profile_id, r["column_name"], position, r["row_count"], r["null_count"], r["blank_count"],
+             r["approx_distinct"], r["min_value"], r["max_value"], r["top_values"], r["quantiles"],
+             r["hll_registers"])
+            for position, r in enumerate(results)
+        ],
+    )
+    conn.commit()
+    return profile_id
+
+
+def compare_profiles(conn, table_name, old_id=None, new_id=None):
+    # Latest two snapshots of the table unless ids are given; only the
+    # stored summaries are read, never the data
+    ensure_profile_tables(conn)
+    if old_id is None or new_id is None:
+        ids = [row[0] for row in conn.execute(
+            "SELECT profile_id FROM dq_profile_runs WHERE table_name = ? ORDER BY profile_id DESC LIMIT 2",
+            (table_name,),
+        )]
+        if len(ids) < 2:
+            return pd.DataFrame()
+        new_id, old_id = ids
+
+    diff = pd.read_sql_query("""
+    SELECT
+        n.column_name,
+        1.0 * o.null_count / NULLIF(o.row_count, 0) AS null_pct_old,
+        1.0 * n.null_count / NULLIF(n.row_count, 0) AS null_pct_new,
+        o.approx_distinct AS distinct_old,
+        n.approx_distinct AS distinct_new,
+        json_extract(o.quantiles, '$."0.5"') AS median_old,
+        json_extract(n.quantiles, '$."0.5"') AS median_new
+    FROM dq_column_profiles n
+    LEFT JOIN dq_column_profiles o
+      ON o.profile_id = ? AND o.column_name = n.column_name
+    WHERE n.profile_id = ?
+    ORDER BY n.position
+    """, conn, params=[old_id, new_id])
+    diff["null_pct_change"] = diff["null_pct_new"] - diff["null_pct_old"]
+    diff["distinct_change"] = diff["distinct_new"] - diff["distinct_old"]
+    return diff
+
+
+def print_profile(results):
+    summary = pd.DataFrame(results).drop(columns=["hll_registers"])
+    summary["null_pct"] = (100 * summary["null_count"] / summary["row_count"].where(summary["row_count"] > 0)).round(2)
+    print(summary[["column_name", "null_pct", "blank_count", "approx_distinct", "min_value", "max_value"]].to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile every column of a table in one streaming pass")
+    parser.add_argument("--db", type=Path, default=WORKFORCE_DB, help="SQLite database to profile")
+    parser.add_argument("--table", default="workforce")
+    parser.add_argument("--csv", type=Path, help="Profile a CSV (or its Parquet copy) instead of --db/--table")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--store", type=Path, help="Database for the snapshot (default: --db)")
+    parser.add_argument("--compare", action="store_true", help="Show changes against the previous snapshot")
+    args = parser.parse_args()
+
+    conn = connect(args.store or args.db)
+    if args.csv:
+        source, table_name = str(args.csv), args.csv.stem
+        results = profile_chunks(iter_chunks(args.csv, args.chunk_size, encoding=args.encoding), conn)
+    else:
+        source, table_name = str(args.db), args.table
+        reader = readonly_connection(args.db)
+        results = profile_chunks(sqlite_chunks(reader, args.table, args.chunk_size), conn)
+        reader.close()
+
+    print_profile(results)
+
+    profile_id = save_profile(conn, source, table_name, results)
+    print(f"\nProfile snapshot {profile_id} saved for {table_name}")
+
+    if args.compare:
+        diff = compare_profiles(conn, table_name)
+        print("\nChanges since the previous snapshot:" if not diff.empty else "\nNo previous snapshot to compare")
+        if not diff.empty:
+            print(diff.to_string(index=False))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # columnar storage is optional; everything falls back to CSV
+    pq = None
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+RAW_DIR = BASE_DIR / "data" / "raw"
+
+HAS_ARROW = pq is not None
+
+
+# --- locating the columnar copy ---
+def columnar_path(csv_path):
+    # customers_raw.csv -> customers_raw.parquet (a file, or a directory of parts)
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def _newest_mtime(path):
+    if path.is_dir():
+        return max((p.stat().st_mtime_ns for p in path.glob("*.parquet")), default=None)
+    return path.stat().st_mtime_ns
+
+
+def fresh_columnar_path(csv_path):
+    # The Parquet copy is used only when pyarrow is installed and it is at
+    # least as new as the CSV, so a regenerated CSV is never shadowed
+    if not HAS_ARROW:
+        return None
+    path = columnar_path(csv_path)
+    if not path.exists():
+        return None
+    parquet_mtime = _newest_mtime(path)
+    if parquet_mtime is None:
+        return None
+    csv_path = Path(csv_path)
+    if csv_path.exists() and csv_path.stat().st_mtime_ns > parquet_mtime:
+        return None
+    return path
+
+
+# --- reading ---
+def read_dataset(csv_path, columns=None, parse_dates=None, encoding="utf-8"):
+    # Reads only the requested columns: from Parquet (memory-mapped) when a
+    # fresh copy exists, otherwise from the CSV with usecols
+    path = fresh_columnar_path(csv_path)
+    if path is None:
+        return pd.read_csv(csv_path, usecols=columns, parse_dates=parse_dates, encoding=encoding)
+
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    for column in parse_dates or []:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def iter_chunks(csv_path, chunk_size=50_000, columns=None, encoding="utf-8", parse_dates=None):
+    # Streaming counterpart of read_dataset: bounded memory either way
+    path = fresh_columnar_path(csv_path)
+    if path is None:
+        yield from pd.read_csv(
+            csv_path, usecols=columns, chunksize=chunk_size, encoding=encoding, parse_dates=parse_dates
+        )
+        return
+
+    files = sorted(path.glob("*.parquet")) if path.is_dir() else [path]
+    for file in files:
+        for batch in pq.ParquetFile(file, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+            df = batch.to_pandas()
+            for column in parse_dates or []:
+                if column in df.columns:
+                    df[column] = pd.to_datetime(df[column])
+            yield df
+
+
+# --- writing ---
+def convert_csv(csv_path, encoding="utf-8"):
+    # Parsed with the same defaults as pd.read_csv, so reading the Parquet
+    # copy returns the frame the CSV would have produced
+    if not HAS_ARROW:
+        raise RuntimeError("pyarrow is not installed; columnar storage is unavailable")
+    df = pd.read_csv(csv_path, encoding=encoding)
+    path = columnar_path(csv_path)
+    df.to_parquet(path, index=False)
+    return path, len(df)
+
+
+def write_dataset(df, csv_path):
+    # CSV stays the interchange format; a Parquet copy is written next to it when possible
+    df.to_csv(csv_path, index=False)
+    if HAS_ARROW:
+        df.to_parquet(columnar_path(csv_path), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write Parquet copies of CSV datasets")
+    parser.add_argument("csv", nargs="*", type=Path, help="CSV files to convert (default: every CSV in data/raw)")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+
+    if not HAS_ARROW:
+        sys.exit("pyarrow is not installed: pip install pyarrow")
+
+    for csv_path in args.csv or sorted(RAW_DIR.glob("*.csv")):
+        path, rows = convert_csv(csv_path, encoding=args.encoding)
+        print(f"{csv_path} -> {path} ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
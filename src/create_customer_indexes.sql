@@ -0,0 +1,61 @@
+-- Indexes backing the dashboard's server-side filters and the analytics store.
+-- last_active is descending so the recency ranking (PARTITION BY country
+-- ORDER BY last_active DESC) reads rows in window order without a sort
+CREATE INDEX IF NOT EXISTS idx_customers_country_last_active
+    ON customers (country, last_active DESC);
+
+CREATE INDEX IF NOT EXISTS idx_customers_email
+    ON customers (email);
+
+CREATE INDEX IF NOT EXISTS idx_customers_signup_date
+    ON customers (signup_date);
+
+-- ============================================
+-- Analytics store (maintained by customer_store.py)
+-- ============================================
+-- Pre-aggregated cohort counts (signup month x country)
+CREATE TABLE IF NOT EXISTS customer_cohorts (
+    signup_month TEXT,
+    country TEXT,
+    total_customers INTEGER,
+    PRIMARY KEY (signup_month, country)
+);
+
+-- Customers per email; the partial index holds only the duplicated ones
+CREATE TABLE IF NOT EXISTS customer_email_counts (
+    email TEXT PRIMARY KEY,
+    freq INTEGER
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_customer_email_counts_duplicates
+    ON customer_email_counts (freq DESC, email)
+    WHERE freq > 1;
+
+-- NULLs per column of customers
+CREATE TABLE IF NOT EXISTS customer_null_counts (
+    column_name TEXT PRIMARY KEY,
+    position INTEGER,
+    null_count INTEGER,
+    row_count INTEGER
+);
+
+-- Average days since last activity per country is
+-- julianday('now') - last_active_julian_sum / active_customers
+CREATE TABLE IF NOT EXISTS customer_country_activity (
+    country TEXT,
+    total_customers INTEGER,
+    active_customers INTEGER,
+    last_active_julian_sum REAL
+);
+
+-- The extract the store last took in: mtime/size signature, and its length
+-- plus a hash of its last bytes, which tell an append from a rewrite
+CREATE TABLE IF NOT EXISTS customer_store_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    source_signature TEXT,
+    source_bytes INTEGER,
+    source_tail_hash TEXT,
+    row_count INTEGER,
+    refresh_mode TEXT,
+    refreshed_at TEXT
+);
@@ -0,0 +1,24 @@
+CREATE TABLE IF NOT EXISTS dq_duplicate_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_timestamp TEXT,
+    rows_scanned INTEGER,
+    exact_clusters INTEGER,
+    near_clusters INTEGER
+);
+
+-- One row per customer in a duplicate cluster. match_type is 'exact' (identical
+-- email), 'normalized' (equal after trimming, lower-casing and dropping +tags)
+-- or 'fuzzy' (one edit apart within the same blocking key)
+CREATE TABLE IF NOT EXISTS dq_duplicate_clusters (
+    run_id INTEGER,
+    cluster_id INTEGER,
+    customer_id INTEGER,
+    email TEXT,
+    normalized_email TEXT,
+    match_type TEXT,
+    cluster_size INTEGER,
+    PRIMARY KEY (run_id, cluster_id, customer_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dq_duplicate_clusters_type
+    ON dq_duplicate_clusters (run_id, match_type, cluster_size);
@@ -4,5 +4,56 @@ CREATE TABLE IF NOT EXISTS dq_audit_log_historical (
     failed_rows INTEGER,
     total_rows INTEGER,
     pct_failed REAL,
-    check_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    check_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    partition_day TEXT
+);
+
+-- Daily partition key: trend and rollup queries only touch the days they need
+CREATE INDEX IF NOT EXISTS idx_dq_audit_log_historical_partition
+    ON dq_audit_log_historical (partition_day, check_name);
+
+-- History is append-only
+CREATE TRIGGER IF NOT EXISTS dq_audit_log_historical_no_update
+BEFORE UPDATE ON dq_audit_log_historical
+BEGIN
+    SELECT RAISE(ABORT, 'dq_audit_log_historical is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS dq_audit_log_historical_no_delete
+BEFORE DELETE ON dq_audit_log_historical
+BEGIN
+    SELECT RAISE(ABORT, 'dq_audit_log_historical is append-only');
+END;
+
+-- Per-check rollups maintained on every run
+CREATE TABLE IF NOT EXISTS dq_rollup_daily (
+    period_start TEXT,
+    check_name TEXT,
+    runs INTEGER,
+    min_pct_failed REAL,
+    max_pct_failed REAL,
+    sum_pct_failed REAL,
+    mean_pct_failed REAL,
+    max_failed_rows INTEGER,
+    last_check_timestamp DATETIME,
+    PRIMARY KEY (period_start, check_name)
+);
+
+CREATE TABLE IF NOT EXISTS dq_rollup_weekly (
+    period_start TEXT,
+    check_name TEXT,
+    runs INTEGER,
+    min_pct_failed REAL,
+    max_pct_failed REAL,
+    sum_pct_failed REAL,
+    mean_pct_failed REAL,
+    max_failed_rows INTEGER,
+    last_check_timestamp DATETIME,
+    PRIMARY KEY (period_start, check_name)
+);
+
+-- High-water marks (last historical run_id processed) for exports and rollups
+CREATE TABLE IF NOT EXISTS dq_export_state (
+    export_name TEXT PRIMARY KEY,
+    last_run_id INTEGER
 );
@@ -0,0 +1,279 @@
+import argparse
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from categorical_frames import CUSTOMER_CATEGORIES, compact_frame
+from columnar_store import fresh_columnar_path, iter_chunks, read_dataset
+from db_connections import connect
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = BASE_DIR / "data" / "raw" / "customers_raw.csv"
+DB_PATH = BASE_DIR / "data" / "processed" / "customers.db"
+SQL_CUSTOMER_STORE = BASE_DIR / "src" / "create_customer_indexes.sql"
+
+DATE_COLUMNS = ["signup_date", "last_active"]
+
+# Rows staged per chunk on an incremental refresh
+CHUNK_SIZE = 200_000
+
+# Bytes at the end of the extract remembered to recognise a later append
+TAIL_BYTES = 4096
+
+# Customers count as inactive after this many days (ROUND(days) > 365)
+INACTIVE_AFTER_DAYS = 366
+
+AGGREGATE_TABLES = [
+    "customer_cohorts",
+    "customer_email_counts",
+    "customer_null_counts",
+    "customer_country_activity",
+]
+
+
+def inactive_cutoff(min_days=INACTIVE_AFTER_DAYS):
+    # ROUND(julianday('now') - julianday(last_active)) >= min_days, rewritten as
+    # a datetime('now', ?) cutoff on last_active so the comparison is against a
+    # constant and idx_customers_country_last_active can be used
+    return f"-{max(min_days, INACTIVE_AFTER_DAYS) - 0.5} days"
+
+
+def _tail_hash(csv_path, size):
+    # Hash of the last bytes before `size`; None unless they end a line
+    start = max(0, size - TAIL_BYTES)
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        tail = f.read(size - start)
+    return hashlib.sha1(tail).hexdigest() if tail.endswith(b"\n") and len(tail) == size - start else None
+
+
+def source_state(csv_path):
+    # (signature, size, tail hash), taken before the extract is read. The
+    # signature changes whenever the file is rewritten or appended to.
+    stat = Path(csv_path).stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}", stat.st_size, _tail_hash(csv_path, stat.st_size)
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _columns(conn, table="customers"):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def ensure_store_tables(conn, sql_path=SQL_CUSTOMER_STORE):
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+# --- aggregates ---
+def _add_counts(conn, table, keys, values, select_sql):
+    # Adds the grouped counts of select_sql to a small aggregate table. Keys
+    # are matched with IS, so NULL months or countries accumulate into one
+    # row the way GROUP BY puts them in one group.
+    conn.execute("DROP TABLE IF EXISTS temp.customer_store_delta")
+    conn.execute(f"CREATE TEMP TABLE customer_store_delta AS {select_sql}")
+    match = " AND ".join(f"t.{key} IS d.{key}" for key in keys)
+    assignments = ", ".join(f"{value} = t.{value} + d.{value}" for value in values)
+    conn.execute(f"""
+    UPDATE {table} AS t SET {assignments}
+    FROM customer_store_delta d
+    WHERE {match}
+    """)
+    columns = ", ".join(keys + values)
+    conn.execute(f"""
+    INSERT INTO {table} ({columns})
+    SELECT {columns} FROM customer_store_delta d
+    WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {match})
+    """)
+    conn.execute("DROP TABLE temp.customer_store_delta")
+
+
+def add_to_aggregates(conn, source):
+    # source is "customers" for a rebuild, or a table holding only the new
+    # customers: every aggregate is a sum, so new rows are simply added on
+    conn.execute(f"""
+    INSERT INTO customer_email_counts (email, freq)
+    SELECT email, COUNT(*) FROM {source}
+    WHERE email IS NOT NULL
+    GROUP BY email
+    ON CONFLICT (email) DO UPDATE SET freq = freq + excluded.freq
+    """)
+
+    columns = _columns(conn, "customers")
+    null_sums = ", ".join(f"SUM({_quote(c)} IS NULL)" for c in columns)
+    total, *nulls = conn.execute(f"SELECT COUNT(*), {null_sums} FROM {source}").fetchone()
+    conn.executemany(
+        """
+        INSERT INTO customer_null_counts (column_name, position, null_count, row_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (column_name) DO UPDATE SET
+            position = excluded.position,
+            null_count = null_count + excluded.null_count,
+            row_count = row_count + excluded.row_count
+        """,
+        [(column, position, count or 0, total) for position, (column, count) in enumerate(zip(columns, nulls))],
+    )
+
+    _add_counts(conn, "customer_cohorts", ["signup_month", "country"], ["total_customers"], f"""
+    SELECT strftime('%Y-%m', signup_date) AS signup_month, country, COUNT(*) AS total_customers
+    FROM {source}
+    GROUP BY signup_month, country
+    """)
+    _add_counts(
+        conn,
+        "customer_country_activity",
+        ["country"],
+        ["total_customers", "active_customers", "last_active_julian_sum"],
+        f"""
+        SELECT
+            country,
+            COUNT(*) AS total_customers,
+            COUNT(julianday(last_active)) AS active_customers,
+            TOTAL(julianday(last_active)) AS last_active_julian_sum
+        FROM {source}
+        GROUP BY country
+        """,
+    )
+
+
+def rebuild_aggregates(conn):
+    for table in AGGREGATE_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    add_to_aggregates(conn, "customers")
+
+
+def _set_state(conn, source, row_count, refresh_mode):
+    conn.execute("""
+    INSERT INTO customer_store_state
+        (id, source_signature, source_bytes, source_tail_hash, row_count, refresh_mode, refreshed_at)
+    VALUES (1, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        source_signature = excluded.source_signature,
+        source_bytes = excluded.source_bytes,
+        source_tail_hash = excluded.source_tail_hash,
+        row_count = excluded.row_count,
+        refresh_mode = excluded.refresh_mode,
+        refreshed_at = excluded.refreshed_at
+    """, (*source, row_count, refresh_mode, datetime.now(timezone.utc).isoformat()))
+
+
+def _finish_full_load(conn, source):
+    # Indexes, aggregates and state for a customers table that was just replaced
+    ensure_store_tables(conn)
+    rebuild_aggregates(conn)
+    # Sampled statistics: with few countries, the planner can then skip-scan
+    # idx_customers_country_last_active for a last_active cutoff alone
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute("ANALYZE customers")
+    row_count = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+    _set_state(conn, source, row_count, "full")
+    conn.commit()
+    return row_count
+
+
+# --- loading ---
+def full_load(conn, csv_path=CSV_PATH):
+    # Replaces customers with the extract (CSV or its Parquet copy) and
+    # rebuilds the store; returns the compacted frame
+    source = source_state(csv_path)
+    df = read_dataset(csv_path, parse_dates=DATE_COLUMNS)
+    df = compact_frame(df, conn, CUSTOMER_CATEGORIES)
+    df.to_sql("customers", conn, if_exists="replace", index=False)
+    _finish_full_load(conn, source)
+    return df
+
+
+def _appended_chunks(csv_path, offset, chunk_size=CHUNK_SIZE):
+    # Only the rows written after `offset`, parsed like the rest of the extract
+    columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        yield from pd.read_csv(f, names=columns, header=None, chunksize=chunk_size, parse_dates=DATE_COLUMNS)
+
+
+def _stage(conn, chunks):
+    conn.execute("DROP TABLE IF EXISTS customers_staging")
+    rows = 0
+    for chunk in chunks:
+        compact_frame(chunk, conn, CUSTOMER_CATEGORIES)
+        chunk.to_sql("customers_staging", conn, if_exists="append", index=False)
+        rows += len(chunk)
+    if not rows:
+        conn.execute("CREATE TABLE customers_staging AS SELECT * FROM customers WHERE 0")
+    conn.commit()
+    return rows
+
+
+def refresh_customer_store(conn, csv_path=CSV_PATH, full=False, chunk_size=CHUNK_SIZE):
+    # Brings customers and the aggregates up to date with the extract and
+    # returns (refresh_mode, customers added). An unchanged extract costs one
+    # stat() call. When rows were only appended since the last refresh (the
+    # remembered tail is still in place), just the new bytes are read and
+    # added to customers and the aggregates. Any other change (a regenerated
+    # extract, rows edited in place or removed) may touch stored customers,
+    # so the whole extract is staged and swapped in as a full load.
+    if full or not _table_exists(conn, "customers"):
+        return "full", len(full_load(conn, csv_path))
+
+    ensure_store_tables(conn)
+    source = source_state(csv_path)
+    state = conn.execute(
+        "SELECT source_signature, source_bytes, source_tail_hash, row_count FROM customer_store_state WHERE id = 1"
+    ).fetchone()
+    if state is not None and state[0] == source[0]:
+        return "unchanged", 0
+
+    appended = (
+        state is not None
+        and state[1] is not None
+        and state[2] is not None
+        and source[1] > state[1]
+        and fresh_columnar_path(csv_path) is None
+        and _tail_hash(csv_path, state[1]) == state[2]
+    )
+    if not appended:
+        # customers was loaded before the store existed, or the extract was rewritten
+        _stage(conn, iter_chunks(csv_path, chunk_size, parse_dates=DATE_COLUMNS))
+        conn.execute("DROP TABLE customers")
+        conn.execute("ALTER TABLE customers_staging RENAME TO customers")
+        return "full", _finish_full_load(conn, source)
+
+    added = _stage(conn, _appended_chunks(csv_path, state[1], chunk_size))
+    columns = ", ".join(_quote(c) for c in _columns(conn, "customers"))
+    conn.execute(f"INSERT INTO customers ({columns}) SELECT {columns} FROM customers_staging")
+    add_to_aggregates(conn, "customers_staging")
+    conn.execute("DROP TABLE customers_staging")
+    _set_state(conn, source, state[3] + added, "incremental")
+    conn.commit()
+    return "incremental", added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the indexed customer analytics store from the raw extract")
+    parser.add_argument("--csv", type=Path, default=CSV_PATH)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--full", action="store_true", help="Reload every customer (e.g. after regenerating the extract)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    conn = connect(args.db)
+    refresh_mode, added = refresh_customer_store(conn, args.csv, full=args.full, chunk_size=args.chunk_size)
+    total = conn.execute("SELECT row_count FROM customer_store_state WHERE id = 1").fetchone()[0]
+    conn.close()
+    print(f"Customer store refreshed ({refresh_mode}): {added} customers added, {total} in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+
+from columnar_store import read_dataset
+from customer_store import INACTIVE_AFTER_DAYS, inactive_cutoff
+from db_connections import pooled_readonly, wal_path
+from dq_thresholds import DQ_THRESHOLDS
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+CUSTOMERS_DB = PROCESSED_DIR / "customers.db"
+HISTORICAL_CSV = PROCESSED_DIR / "dq_audit_log_historical.csv"
+
+# Bound on cached results per loader; oldest entries are evicted first
+MAX_CACHE_ENTRIES = 8
+
+# Rows per page for the large customer tables
+PAGE_SIZE = 500
+
+
+# --- cache keys ---
+def source_signature(path):
+    # Changes whenever the file is rewritten; None if it does not exist yet.
+    # A database's recent commits sit in its WAL file until a checkpoint, so
+    # that file is part of the signature too.
+    path = Path(path)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    wal = wal_path(path)
+    wal_stat = wal.stat() if wal.exists() else None
+    return stat.st_mtime_ns, stat.st_size, wal_stat and (wal_stat.st_mtime_ns, wal_stat.st_size)
+
+
+def latest_audit_marker(db_path=CUSTOMERS_DB):
+    # Newest audit row id: catches new runs even when the DB file mtime has
+    # not moved yet (e.g. writes still sitting in a WAL file)
+    return pooled_readonly(db_path).execute("SELECT MAX(rowid) FROM dq_audit_log").fetchone()[0]
+
+
+# --- memoized loaders ---
+# The signature/marker arguments only key the cache: a new value means the
+# source changed and the loader runs again. They must not start with an
+# underscore, because Streamlit leaves those arguments out of the key.
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_audit_log(db_path, signature, marker):
+    audit_df = pd.read_sql_query("SELECT * FROM dq_audit_log ORDER BY check_timestamp DESC", pooled_readonly(db_path))
+    return _check_names_as_codes(audit_df)
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_customer_count(db_path, signature):
+    return pooled_readonly(db_path).execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_csv(path, signature, parse_dates=None):
+    return _check_names_as_codes(read_dataset(path, parse_dates=parse_dates))
+
+
+def _check_names_as_codes(df):
+    # A handful of check names repeated on every row: as a categorical, the
+    # SLA threshold lookup and per-check group-bys work on integer codes
+    if "check_name" in df.columns:
+        df["check_name"] = df["check_name"].astype("category")
+    return df
+
+
+def audit_log(db_path=CUSTOMERS_DB):
+    return load_audit_log(str(db_path), source_signature(db_path), latest_audit_marker(db_path))
+
+
+def customer_count(db_path=CUSTOMERS_DB):
+    return load_customer_count(str(db_path), source_signature(db_path))
+
+
+def processed_csv(name, parse_dates=None):
+    path = PROCESSED_DIR / name
+    return load_csv(str(path), source_signature(path), parse_dates=parse_dates)
+
+
+def historical_log():
+    return load_csv(str(HISTORICAL_CSV), source_signature(HISTORICAL_CSV), parse_dates=["check_timestamp"])
+
+
+# --- SLA classification ---
+def classify_sla(audit_df, total_rows, thresholds=DQ_THRESHOLDS):
+    audit_df = audit_df.copy()
+    audit_df["pct_failed"] = audit_df["failed_rows"] / total_rows
+    # On a categorical, map() looks up each check name once, not once per row
+    limits = audit_df["check_name"].map(thresholds).astype(float).fillna(0)
+    audit_df["sla_status"] = np.where(audit_df["pct_failed"] <= limits, "PASS", "FAIL")
+    return audit_df
+
+
+# --- server-side filtered queries ---
+def _in_clause(values):
+    return ", ".join("?" for _ in values)
+
+
+def _query(db_path, sql, params=()):
+    return pd.read_sql_query(sql, pooled_readonly(db_path), params=list(params))
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_countries(db_path, signature):
+    return _query(db_path, "SELECT DISTINCT country FROM customers WHERE country IS NOT NULL ORDER BY country")["country"].tolist()
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_inactivity_range(db_path, signature):
+    row = _query(db_path, f"""
+    SELECT
+        CAST(ROUND(julianday('now') - julianday(MAX(last_active))) AS INTEGER) AS min_days,
+        CAST(ROUND(julianday('now') - julianday(MIN(last_active))) AS INTEGER) AS max_days
+    FROM customers
+    WHERE last_active <= datetime('now', ?)
+    """, [inactive_cutoff(INACTIVE_AFTER_DAYS)]).iloc[0]
+    return int(row["min_days"] or INACTIVE_AFTER_DAYS), int(row["max_days"] or INACTIVE_AFTER_DAYS)
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_inactive_page(db_path, signature, countries, min_days, page, page_size=PAGE_SIZE):
+    if not countries:
+        return pd.DataFrame(columns=["customer_id", "name", "country", "last_active", "days_inactive"]), 0
+
+    where = f"country IN ({_in_clause(countries)}) AND last_active <= datetime('now', ?)"
+    params = [*countries, inactive_cutoff(min_days)]
+
+    total = int(_query(db_path, f"SELECT COUNT(*) AS n FROM customers WHERE {where}", params).iloc[0]["n"])
+    page_df = _query(db_path, f"""
+    SELECT customer_id, name, country, last_active,
+           ROUND(julianday('now') - julianday(last_active)) AS days_inactive
+    FROM customers
+    WHERE {where}
+    ORDER BY last_active ASC, customer_id
+    LIMIT ? OFFSET ?
+    """, [*params, page_size, page * page_size])
+    return page_df, total
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_inactivity_by_country(db_path, signature, countries, min_days):
+    if not countries:
+        return pd.DataFrame(columns=["country", "days_inactive"])
+    return _query(db_path, f"""
+    SELECT country, AVG(ROUND(julianday('now') - julianday(last_active))) AS days_inactive
+    FROM customers
+    WHERE country IN ({_in_clause(countries)}) AND last_active <= datetime('now', ?)
+    GROUP BY country
+    ORDER BY country
+    """, [*countries, inactive_cutoff(min_days)])
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_cohorts(db_path, signature, countries):
+    if not countries:
+        return pd.DataFrame(columns=["signup_month", "country", "total_customers"])
+
+    has_cohorts = pooled_readonly(db_path).execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customer_cohorts'"
+    ).fetchone() is not None
+
+    # Pre-aggregated by load_customers_to_db.py; aggregate on the fly for older DBs
+    source = "customer_cohorts" if has_cohorts else """(
+        SELECT strftime('%Y-%m', signup_date) AS signup_month, country, COUNT(*) AS total_customers
+        FROM customers
+        GROUP BY signup_month, country
+    )"""
+    return _query(db_path, f"""
+    SELECT signup_month, country, total_customers
+    FROM {source}
+    WHERE country IN ({_in_clause(countries)})
+    ORDER BY signup_month, country
+    """, countries)
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_recency_page(db_path, signature, countries, page, page_size=PAGE_SIZE):
+    if not countries:
+        return pd.DataFrame(columns=["customer_id", "name", "country", "last_active", "rank_recent"]), 0
+
+    where = f"country IN ({_in_clause(countries)})"
+    total = int(_query(db_path, f"SELECT COUNT(*) AS n FROM customers WHERE {where}", countries).iloc[0]["n"])
+    # Ranks are partitioned by country, so filtering countries first leaves them unchanged
+    page_df = _query(db_path, f"""
+    SELECT customer_id, name, country, last_active,
+           RANK() OVER (PARTITION BY country ORDER BY last_active DESC) AS rank_recent
+    FROM customers
+    WHERE {where}
+    ORDER BY country, rank_recent, customer_id
+    LIMIT ? OFFSET ?
+    """, [*countries, page_size, page * page_size])
+    return page_df, total
+
+
+@st.cache_data(max_entries=MAX_CACHE_ENTRIES, show_spinner=False)
+def load_duplicate_clusters(db_path, signature, page, page_size=PAGE_SIZE):
+    # Latest run of duplicate_detection.py; empty until it has been run once
+    empty = pd.DataFrame(columns=["cluster_id", "match_type", "cluster_size", "customer_id", "email"])
+    has_clusters = pooled_readonly(db_path).execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dq_duplicate_clusters'"
+    ).fetchone() is not None
+    if not has_clusters:
+        return empty, pd.DataFrame(columns=["match_type", "clusters", "customers"]), 0
+
+    latest = "(SELECT MAX(run_id) FROM dq_duplicate_runs)"
+    summary = _query(db_path, f"""
+    SELECT match_type, COUNT(DISTINCT cluster_id) AS clusters, COUNT(*) AS customers
+    FROM dq_duplicate_clusters
+    WHERE run_id = {latest}
+    GROUP BY match_type
+    ORDER BY match_type
+    """)
+    page_df = _query(db_path, f"""
+    SELECT cluster_id, match_type, cluster_size, customer_id, email
+    FROM dq_duplicate_clusters
+    WHERE run_id = {latest}
+    ORDER BY cluster_size DESC, cluster_id, customer_id
+    LIMIT ? OFFSET ?
+    """, [page_size, page * page_size])
+    return page_df, summary, int(summary["customers"].sum())
+
+
+def countries(db_path=CUSTOMERS_DB):
+    return load_countries(str(db_path), source_signature(db_path))
+
+
+def inactivity_range(db_path=CUSTOMERS_DB):
+    return load_inactivity_range(str(db_path), source_signature(db_path))
+
+
+def inactive_customers(countries, min_days, page=0, db_path=CUSTOMERS_DB):
+    return load_inactive_page(str(db_path), source_signature(db_path), tuple(countries), int(min_days), int(page))
+
+
+def inactivity_by_country(countries, min_days, db_path=CUSTOMERS_DB):
+    return load_inactivity_by_country(str(db_path), source_signature(db_path), tuple(countries), int(min_days))
+
+
+def cohorts(countries, db_path=CUSTOMERS_DB):
+    return load_cohorts(str(db_path), source_signature(db_path), tuple(countries))
+
+
+def recency_ranking(countries, page=0, db_path=CUSTOMERS_DB):
+    return load_recency_page(str(db_path), source_signature(db_path), tuple(countries), int(page))
+
+
+def duplicate_clusters(page=0, db_path=CUSTOMERS_DB):
+    return load_duplicate_clusters(str(db_path), source_signature(db_path), int(page))
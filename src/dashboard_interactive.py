@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import sqlite3
+
+import dashboard_data
 
 st.set_page_config(page_title="Customer Data Governance Dashboard", layout="wide")
 st.title("Customer Data Governance Dashboard")
@@ -10,27 +10,12 @@ st.title("Customer Data Governance Dashboard")
 # ----------------------------
 # --- Phase 2 Audit Log ------
 # ----------------------------
-DB_PATH = "data/processed/customers.db"
-conn = sqlite3.connect(DB_PATH)
-audit_df = pd.read_sql_query("SELECT * FROM dq_audit_log ORDER BY check_timestamp DESC", conn)
-conn.close()
-
-# Define thresholds (SLA)
-DQ_THRESHOLDS = {
-    "missing_email": 0.05,
-    "missing_phone": 0.1,
-    "duplicate_email": 0,
-    "invalid_email_format": 0,
-    "last_active_before_signup": 0
-}
-
-# Convert failed_rows to percentages
-total_customers = 5000  # adjust to your synthetic dataset size
-audit_df["pct_failed"] = audit_df["failed_rows"] / total_customers
-audit_df["sla_status"] = audit_df.apply(
-    lambda row: "PASS" if row["pct_failed"] <= DQ_THRESHOLDS.get(row["check_name"], 0) else "FAIL",
-    axis=1
-)
+# Loaders are memoized and only re-read when the DB/CSV changes or a new run is logged
+audit_df = dashboard_data.audit_log()
+
+# Convert failed_rows to percentages and classify against DQ_THRESHOLDS (SLA)
+total_customers = dashboard_data.customer_count()
+audit_df = dashboard_data.classify_sla(audit_df, total_customers)
 
 st.header("Data Quality Audit Log")
 st.dataframe(audit_df)
@@ -53,37 +38,30 @@ ax.legend()
 st.pyplot(fig)
 
 # ----------------------------
-# --- Phase 1 CSV-based metrics (existing dashboard) ---
+# --- Phase 1 customer metrics ---
 # ----------------------------
-missing = pd.read_csv('../data/processed/missing_values_pct.csv')
-duplicates = pd.read_csv('../data/processed/duplicate_emails.csv')
-inactive = pd.read_csv('../data/processed/inactive_customers.csv')
-cohort = pd.read_csv('../data/processed/cohort_analysis.csv')
-recency_rank = pd.read_csv('../data/processed/recency_ranking.csv')
+# Small summary outputs still come from CSV; the large customer tables are
+# queried from customers.db with the sidebar filters pushed down into SQL
+missing = dashboard_data.processed_csv('missing_values_pct.csv')
+duplicates = dashboard_data.processed_csv('duplicate_emails.csv')
 
 # --- Sidebar Filters ---
 st.sidebar.header("Filters")
+country_options = dashboard_data.countries()
 country_filter = st.sidebar.multiselect(
     "Select Country",
-    options=inactive['country'].unique(),
-    default=inactive['country'].unique()
+    options=country_options,
+    default=country_options
 )
 
+min_days, max_days = dashboard_data.inactivity_range()
 days_inactive_filter = st.sidebar.slider(
     "Minimum Days Inactive",
-    min_value=int(inactive['days_inactive'].min()),
-    max_value=int(inactive['days_inactive'].max()),
-    value=int(inactive['days_inactive'].min())
+    min_value=min_days,
+    max_value=max(max_days, min_days + 1),
+    value=min_days
 )
 
-# Apply filters
-inactive_filtered = inactive[
-    (inactive['country'].isin(country_filter)) &
-    (inactive['days_inactive'] >= days_inactive_filter)
-]
-cohort_filtered = cohort[cohort['country'].isin(country_filter)]
-recency_filtered = recency_rank[recency_rank['country'].isin(country_filter)]
-
 # --- Missing Values Section ---
 st.header("Missing Values")
 st.dataframe(missing)
@@ -102,12 +80,28 @@ ax_dup.set_ylabel('Number of Emails')
 ax_dup.set_title('Duplicate Email Frequencies')
 st.pyplot(fig_dup)
 
+# --- Duplicate Clusters Section ---
+# Exact, normalized and fuzzy email matches from duplicate_detection.py
+st.header("Duplicate Email Clusters")
+cluster_page = st.number_input("Duplicate clusters page", min_value=1, value=1, step=1) - 1
+clusters, cluster_summary, clustered_total = dashboard_data.duplicate_clusters(page=cluster_page)
+st.dataframe(cluster_summary)
+st.caption(f"{clustered_total} customers in duplicate clusters; showing page {cluster_page + 1} "
+           f"of {max(1, -(-clustered_total // dashboard_data.PAGE_SIZE))}")
+st.dataframe(clusters)
+
 # --- Inactive Customers Section ---
 st.header("Inactive Customers")
-st.dataframe(inactive_filtered.sort_values(by='days_inactive', ascending=False).reset_index(drop=True))
+inactive_page = st.number_input("Inactive customers page", min_value=1, value=1, step=1) - 1
+inactive_filtered, inactive_total = dashboard_data.inactive_customers(
+    country_filter, days_inactive_filter, page=inactive_page
+)
+st.caption(f"{inactive_total} customers match; showing page {inactive_page + 1} "
+           f"of {max(1, -(-inactive_total // dashboard_data.PAGE_SIZE))}")
+st.dataframe(inactive_filtered)
 
 fig_inact, ax_inact = plt.subplots()
-avg_inactive = inactive_filtered.groupby('country')['days_inactive'].mean().reset_index()
+avg_inactive = dashboard_data.inactivity_by_country(country_filter, days_inactive_filter)
 sns.barplot(x='country', y='days_inactive', data=avg_inactive, ax=ax_inact)
 ax_inact.set_ylabel('Average Days Inactive')
 ax_inact.set_title('Average Days Inactive by Country')
@@ -115,18 +109,22 @@ st.pyplot(fig_inact)
 
 # --- Cohort Analysis Section ---
 st.header("Cohort Analysis by Signup Month")
+cohort_filtered = dashboard_data.cohorts(country_filter)
 cohort_pivot = cohort_filtered.pivot(index='signup_month', columns='country', values='total_customers').fillna(0)
 st.line_chart(cohort_pivot)
 
 # --- Recency Ranking Section ---
 st.header("Recency Ranking by Country")
-st.dataframe(recency_filtered.sort_values(['country','rank_recent']).reset_index(drop=True))
+recency_page = st.number_input("Recency ranking page", min_value=1, value=1, step=1) - 1
+recency_filtered, recency_total = dashboard_data.recency_ranking(country_filter, page=recency_page)
+st.caption(f"{recency_total} customers match; showing page {recency_page + 1} "
+           f"of {max(1, -(-recency_total // dashboard_data.PAGE_SIZE))}")
+st.dataframe(recency_filtered)
 
 st.success("Dashboard loaded successfully! Use the sidebar filters and scroll to see governance SLAs.")
 
 # Historical view
-hist_df = pd.read_csv("data/processed/dq_audit_log_historical.csv", parse_dates=["check_timestamp"])
+hist_df = dashboard_data.historical_log()
 st.subheader("Historical SLA Trends")
-for check in hist_df["check_name"].unique():
-    df_check = hist_df[hist_df["check_name"] == check]
+for check, df_check in hist_df.groupby("check_name"):
     st.line_chart(df_check.set_index("check_timestamp")["pct_failed"])
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Page cache per connection in KiB (SQLite takes a negative cache_size as KiB)
+CACHE_SIZE_KB = int(os.environ.get("DQ_SQLITE_CACHE_KB", 64 * 1024))
+
+# Bytes of the database file read through a memory map instead of read() calls
+MMAP_SIZE = int(os.environ.get("DQ_SQLITE_MMAP_BYTES", 256 * 1024 * 1024))
+
+# Seconds a connection waits on a lock before raising "database is locked"
+BUSY_TIMEOUT = float(os.environ.get("DQ_SQLITE_BUSY_TIMEOUT", 30))
+
+# With WAL, NORMAL only syncs at checkpoints: a power loss can drop the last
+# commits but never corrupts the database
+SYNCHRONOUS = "NORMAL"
+
+
+def _tune(conn):
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+# --- connections ---
+def connect(db_path, check_same_thread=True):
+    # Read-write connection for pipeline scripts. WAL lets readers (dashboards,
+    # read-only check workers) keep reading while a run writes, and writers
+    # wait up to BUSY_TIMEOUT for each other instead of failing.
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    if str(db_path) != ":memory:":
+        # Persistent: once set, every later connection to the file uses WAL
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    return _tune(conn)
+
+
+def readonly_connection(db_path):
+    # Cannot write or take write locks, so it never blocks a running check
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    return _tune(sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT, check_same_thread=False))
+
+
+# --- pooled read-only connections (dashboards) ---
+_pool = threading.local()
+
+
+def pooled_readonly(db_path):
+    # One read-only connection per thread and database, reused across queries
+    # so the page cache survives between reruns. Each query starts a fresh
+    # read transaction, so commits from running checks are picked up.
+    connections = _pool.__dict__.setdefault("connections", {})
+    key = str(Path(db_path).resolve())
+    if key not in connections:
+        connections[key] = readonly_connection(db_path)
+    return connections[key]
+
+
+def wal_path(db_path):
+    # Where committed-but-not-checkpointed writes live in WAL mode
+    return Path(str(db_path) + "-wal")
@@ -0,0 +1,246 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from failure_cube import update_failure_cube
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQL_AUDIT_TABLES = BASE_DIR / "sql" / "dq_audit_tables.sql"
+SQL_SLA_RULES = BASE_DIR / "sql" / "dq_sla_rules.sql"
+
+# Runs whose row-level failures are kept in dq_failure_records; older runs
+# keep their audit counts but lose the drill-down rows
+FAILURE_RETENTION_RUNS = int(os.environ.get("DQ_FAILURE_RETENTION_RUNS", 10))
+
+
+# --- schema ---
+def ensure_audit_tables(conn, sql_path=SQL_AUDIT_TABLES):
+    # Audit logs written before run ids existed get the column added in place;
+    # their rows keep run_id NULL and are never picked up by run-scoped queries
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(dq_audit_log)")]
+    if columns and "run_id" not in columns:
+        conn.execute("ALTER TABLE dq_audit_log ADD COLUMN run_id INTEGER")
+
+    with open(sql_path, "r") as f:
+        conn.executescript(f.read())
+
+
+def ensure_sla_rules(conn, sql_path=SQL_SLA_RULES):
+    # Seeds the default SLA rules only into a database missing one of the
+    # rule tables, so limits and partition overrides tuned in place are kept
+    existing = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name IN ('dq_sla_rules', 'dq_partition_sla_rules')"
+        )
+    }
+    if len(existing) < 2:
+        with open(sql_path, "r") as f:
+            conn.executescript(f.read())
+
+
+def start_run(conn, run_mode):
+    timestamp = datetime.now(timezone.utc).isoformat()
+    cursor = conn.execute(
+        "INSERT INTO dq_runs (run_mode, run_timestamp) VALUES (?, ?)",
+        (run_mode, timestamp),
+    )
+    conn.commit()
+    return cursor.lastrowid, timestamp
+
+
+def latest_run_id(conn):
+    return conn.execute("SELECT MAX(run_id) FROM dq_runs").fetchone()[0]
+
+
+def run_summary(conn, run_id, run_mode, rule_count, failure_counts):
+    # An incremental run's failure_counts cover only the changed rows; the
+    # run's total comes from its audit rows
+    total = conn.execute(
+        "SELECT COALESCE(SUM(failed_rows), 0) FROM dq_audit_log WHERE run_id = ?", (run_id,)
+    ).fetchone()[0]
+    summary = f"DQ checks executed (run {run_id}, {run_mode}): {rule_count} rules, {total} failed rows"
+    if run_mode == "incremental":
+        summary += f" ({sum(failure_counts.values())} in changed rows)"
+    return summary
+
+
+# --- audit ---
+def log_run_results(conn, run_id, timestamp, check_names):
+    # Every rule gets a row, including rules with no failures, so the
+    # latest findings never keep a stale count for a check that went clean
+    conn.execute("DROP TABLE IF EXISTS temp.dq_run_checks")
+    conn.execute("CREATE TEMP TABLE dq_run_checks (position INTEGER PRIMARY KEY, check_name TEXT)")
+    conn.executemany("INSERT INTO dq_run_checks VALUES (?, ?)", list(enumerate(check_names)))
+
+    conn.execute("""
+    INSERT INTO dq_audit_log (check_name, failed_rows, check_timestamp, run_id)
+    SELECT
+        c.check_name,
+        COALESCE(f.failed_rows, 0),
+        ?,
+        ?
+    FROM dq_run_checks c
+    LEFT JOIN (
+        SELECT check_name, COUNT(*) AS failed_rows
+        FROM dq_failures
+        GROUP BY check_name
+    ) f USING (check_name)
+    ORDER BY c.position
+    """, (timestamp, run_id))
+
+    conn.execute("DROP TABLE temp.dq_run_checks")
+    archive_failures(conn, run_id)
+    update_failure_cube(conn, run_id)
+    conn.commit()
+
+
+def archive_failures(conn, run_id, retention=FAILURE_RETENTION_RUNS):
+    # dq_failures is rebuilt by every run; keep a copy per run for drill-down
+    conn.execute("""
+    INSERT OR IGNORE INTO dq_failure_records (run_id, check_name, record_id)
+    SELECT ?, check_name, record_id
+    FROM dq_failures
+    ORDER BY check_name, record_id
+    """, (run_id,))
+
+    conn.execute("""
+    DELETE FROM dq_failure_records
+    WHERE run_id <= (SELECT run_id FROM dq_runs ORDER BY run_id DESC LIMIT 1 OFFSET ?)
+    """, (retention,))
+
+
+def log_partition_results(conn, run_id, partition_key, partition_counts):
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO dq_partition_results (run_id, partition_key, partition_value, check_name, failed_rows)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (run_id, partition_key, value, check_name, failed_rows)
+            for value, counts in partition_counts.items()
+            for check_name, failed_rows in counts.items()
+        ],
+    )
+    conn.commit()
+
+
+# --- SLA evaluation (current run only) ---
+def evaluate_sla(conn, run_id):
+    conn.execute("""
+    INSERT OR REPLACE INTO dq_sla_evaluation (
+        run_id, check_name, failed_rows, max_failed_rows, severity, sla_status, check_timestamp
+    )
+    SELECT
+        a.run_id,
+        a.check_name,
+        a.failed_rows,
+        s.max_failed_rows,
+        s.severity,
+        CASE
+            WHEN a.failed_rows > s.max_failed_rows THEN 'FAIL'
+            ELSE 'PASS'
+        END AS sla_status,
+        a.check_timestamp
+    FROM dq_audit_log a
+    JOIN dq_sla_rules s USING (check_name)
+    WHERE a.run_id = ?
+    """, (run_id,))
+
+    conn.execute("""
+    INSERT INTO dq_latest_findings (
+        check_name, run_id, failed_rows, max_failed_rows, severity, sla_status, check_timestamp
+    )
+    SELECT check_name, run_id, failed_rows, max_failed_rows, severity, sla_status, check_timestamp
+    FROM dq_sla_evaluation
+    WHERE run_id = ?
+    ON CONFLICT (check_name) DO UPDATE SET
+        run_id = excluded.run_id,
+        failed_rows = excluded.failed_rows,
+        max_failed_rows = excluded.max_failed_rows,
+        severity = excluded.severity,
+        sla_status = excluded.sla_status,
+        check_timestamp = excluded.check_timestamp
+    """, (run_id,))
+    conn.commit()
+
+
+def evaluate_partition_sla(conn, run_id):
+    # Partition overrides first, then the global limit; a no-op for runs
+    # that were not partitioned
+    conn.execute("""
+    INSERT OR REPLACE INTO dq_partition_sla_evaluation (
+        run_id, partition_key, partition_value, check_name, failed_rows, max_failed_rows, severity, sla_status
+    )
+    SELECT
+        p.run_id,
+        p.partition_key,
+        p.partition_value,
+        p.check_name,
+        p.failed_rows,
+        COALESCE(o.max_failed_rows, s.max_failed_rows) AS max_failed_rows,
+        COALESCE(o.severity, s.severity) AS severity,
+        CASE
+            WHEN p.failed_rows > COALESCE(o.max_failed_rows, s.max_failed_rows) THEN 'FAIL'
+            ELSE 'PASS'
+        END AS sla_status
+    FROM dq_partition_results p
+    LEFT JOIN dq_partition_sla_rules o
+      ON o.partition_key = p.partition_key
+     AND o.partition_value = p.partition_value
+     AND o.check_name = p.check_name
+    LEFT JOIN dq_sla_rules s
+      ON s.check_name = p.check_name
+    WHERE p.run_id = ?
+      AND COALESCE(o.max_failed_rows, s.max_failed_rows) IS NOT NULL
+    """, (run_id,))
+    conn.commit()
+
+
+SLA_EXPORT_QUERY = """
+SELECT
+    check_name,
+    failed_rows,
+    max_failed_rows,
+    severity,
+    sla_status,
+    check_timestamp
+FROM dq_sla_evaluation
+WHERE run_id = ?
+ORDER BY severity DESC
+"""
+
+LATEST_FINDINGS_QUERY = """
+SELECT
+    check_name,
+    failed_rows,
+    max_failed_rows,
+    severity,
+    sla_status,
+    check_timestamp
+FROM dq_latest_findings
+ORDER BY severity DESC, check_name
+"""
+
+PARTITION_SLA_EXPORT_QUERY = """
+SELECT
+    partition_key,
+    partition_value,
+    check_name,
+    failed_rows,
+    max_failed_rows,
+    severity,
+    sla_status
+FROM dq_partition_sla_evaluation
+WHERE run_id = ?
+ORDER BY partition_value, severity DESC, check_name
+"""
+
+# Partitions summed per check; matches dq_audit_log for the same run
+PARTITION_ROLLUP_QUERY = """
+SELECT check_name, SUM(failed_rows) AS failed_rows, COUNT(*) AS partitions
+FROM dq_partition_results
+WHERE run_id = ?
+GROUP BY check_name
+"""
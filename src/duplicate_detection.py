@@ -0,0 +1,218 @@
+import argparse
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import iter_chunks
+from db_connections import connect, readonly_connection
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+CUSTOMERS_DB = BASE_DIR / "data" / "processed" / "customers.db"
+DUPLICATE_TABLES_SQL = BASE_DIR / "src" / "create_duplicate_tables.sql"
+
+CHUNK_SIZE = 250_000
+
+# Rows are spilled to this many hash partitions; each partition is
+# processed on its own, so peak memory is about rows / PARTITIONS
+PARTITIONS = 64
+
+# Characters of the local part used in the blocking key
+BLOCK_PREFIX = 3
+
+# Sorted-neighbourhood window inside a block: each distinct normalized email
+# is compared with the next WINDOW ones, so large blocks stay linear
+WINDOW = 5
+
+
+# --- normalization and blocking ---
+def normalize_emails(emails):
+    # Trim, lower-case and drop +tags from the local part
+    emails = emails.str.strip().str.lower()
+    parts = emails.str.rpartition("@")
+    has_at = parts[1] == "@"
+    local = parts[0].where(has_at, parts[2]).str.replace(r"\+.*$", "", regex=True)
+    domain = parts[2].where(has_at, "")
+    normalized = local + np.where(has_at, "@", "") + domain
+
+    # Customers with the same letters but different digits (john.smith12 vs
+    # john.smith13) are different people, so digits are part of the block
+    digits = local.str.replace(r"\D", "", regex=True)
+    prefix = local.str.replace(r"[^a-z]", "", regex=True).str[:BLOCK_PREFIX]
+    block = domain + "|" + digits + "|" + prefix
+    return normalized, block
+
+
+def _within_one_edit(a, b):
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+# --- streaming partition pass ---
+def spill_partitions(chunks, spill_dir, partitions=PARTITIONS):
+    # Hash on the blocking key: exact, normalized and fuzzy matches all share
+    # a block, so every candidate pair lands in the same partition
+    rows = 0
+    for chunk_index, chunk in enumerate(chunks):
+        chunk = chunk.loc[chunk["email"].notna(), ["customer_id", "email"]]
+        rows += len(chunk)
+        if chunk.empty:
+            continue
+
+        normalized, block = normalize_emails(chunk["email"].astype(str))
+        chunk = chunk.assign(normalized_email=normalized, block=block)
+        partition = pd.util.hash_array(block.to_numpy(dtype=object)) % np.uint64(partitions)
+        for part, piece in chunk.groupby(partition):
+            piece.to_pickle(Path(spill_dir) / f"part{int(part):04d}_{chunk_index:06d}.pkl")
+    return rows
+
+
+def read_partition(spill_dir, part):
+    pieces = [pd.read_pickle(p) for p in sorted(Path(spill_dir).glob(f"part{part:04d}_*.pkl"))]
+    return pd.concat(pieces, ignore_index=True) if pieces else None
+
+
+# --- clustering within a partition ---
+def cluster_partition(df):
+    # Rows with the same normalized email start in one group; fuzzy matches
+    # between groups of the same block are merged with union-find
+    group = df.groupby("normalized_email", sort=False).ngroup().to_numpy()
+    parent = np.arange(group.max() + 1)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    distinct = (
+        pd.DataFrame({"block": df["block"], "normalized_email": df["normalized_email"], "group": group})
+        .drop_duplicates("group")
+        .sort_values(["block", "normalized_email"])
+    )
+    multi = distinct["block"].duplicated(keep=False)
+    for _, block in distinct[multi].groupby("block", sort=False):
+        emails = block["normalized_email"].tolist()
+        groups = block["group"].tolist()
+        for i in range(len(emails)):
+            for j in range(i + 1, min(i + 1 + WINDOW, len(emails))):
+                if _within_one_edit(emails[i], emails[j]):
+                    a, b = find(groups[i]), find(groups[j])
+                    if a != b:
+                        parent[b] = a
+
+    roots = np.array([find(g) for g in range(len(parent))])
+    df = df.assign(component=roots[group])
+    sizes = df.groupby("component")["customer_id"].transform("size")
+    df = df[sizes > 1].assign(cluster_size=sizes[sizes > 1])
+    if df.empty:
+        return df.assign(match_type=pd.Series(dtype=str))
+
+    stats = df.groupby("component").agg(
+        emails=("email", "nunique"), normalized=("normalized_email", "nunique")
+    )
+    match_type = np.where(stats["normalized"] > 1, "fuzzy", np.where(stats["emails"] > 1, "normalized", "exact"))
+    return df.assign(match_type=df["component"].map(pd.Series(match_type, index=stats.index)))
+
+
+def exact_duplicate_count(df):
+    # Same definition as the duplicate_email check: distinct emails seen more than once
+    counts = df["email"].value_counts()
+    return int((counts > 1).sum())
+
+
+# --- run ---
+def detect_duplicates(chunks, conn, partitions=PARTITIONS, spill_dir=None):
+    with open(DUPLICATE_TABLES_SQL) as f:
+        conn.executescript(f.read())
+    run_id = conn.execute(
+        "INSERT INTO dq_duplicate_runs (run_timestamp) VALUES (?)",
+        (datetime.now(timezone.utc).isoformat(),),
+    ).lastrowid
+
+    spill_dir = Path(tempfile.mkdtemp(prefix="dq_dedup_", dir=spill_dir))
+    try:
+        rows = spill_partitions(chunks, spill_dir, partitions)
+
+        next_cluster = 1
+        exact_clusters = near_clusters = 0
+        for part in range(partitions):
+            df = read_partition(spill_dir, part)
+            if df is None:
+                continue
+            exact_clusters += exact_duplicate_count(df)
+
+            clusters = cluster_partition(df)
+            if clusters.empty:
+                continue
+            ids = clusters.groupby("component", sort=False).ngroup() + next_cluster
+            next_cluster = int(ids.max()) + 1
+            near_clusters += int((clusters.drop_duplicates("component")["match_type"] != "exact").sum())
+
+            conn.executemany(
+                """
+                INSERT INTO dq_duplicate_clusters
+                    (run_id, cluster_id, customer_id, email, normalized_email, match_type, cluster_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                zip(
+                    [run_id] * len(clusters), ids.tolist(), clusters["customer_id"].tolist(),
+                    clusters["email"].tolist(), clusters["normalized_email"].tolist(),
+                    clusters["match_type"].tolist(), clusters["cluster_size"].tolist(),
+                ),
+            )
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    conn.execute(
+        "UPDATE dq_duplicate_runs SET rows_scanned = ?, exact_clusters = ?, near_clusters = ? WHERE run_id = ?",
+        (rows, exact_clusters, near_clusters, run_id),
+    )
+    conn.commit()
+    return run_id, rows, exact_clusters, near_clusters
+
+
+def sqlite_chunks(db_path, chunk_size=CHUNK_SIZE):
+    conn = readonly_connection(db_path)
+    try:
+        yield from pd.read_sql_query("SELECT customer_id, email FROM customers", conn, chunksize=chunk_size)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find exact and near-duplicate customer emails")
+    parser.add_argument("--db", type=Path, default=CUSTOMERS_DB, help="Reads customers from and writes clusters to")
+    parser.add_argument("--csv", type=Path, help="Read customers from this CSV (or its Parquet copy) instead")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--partitions", type=int, default=PARTITIONS)
+    parser.add_argument("--spill-dir", type=Path, help="Directory for partition files (default: system temp)")
+    args = parser.parse_args()
+
+    if args.csv:
+        chunks = iter_chunks(args.csv, args.chunk_size, columns=["customer_id", "email"])
+    else:
+        chunks = sqlite_chunks(args.db, args.chunk_size)
+
+    conn = connect(args.db)
+    run_id, rows, exact_clusters, near_clusters = detect_duplicates(chunks, conn, args.partitions, args.spill_dir)
+    conn.close()
+
+    print(f"Duplicate run {run_id}: {rows} emails scanned, "
+          f"{exact_clusters} exact duplicate emails, {near_clusters} near-duplicate clusters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from db_connections import readonly_connection
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+WORKFORCE_DB = BASE_DIR / "data" / "processed" / "workforce.db"
+SQL_FAILURE_CUBE = BASE_DIR / "sql" / "dq_failure_cube.sql"
+
+# Cube dimension -> workforce column
+DIMENSIONS = {
+    "parent_department": "Parent Department",
+    "organisation": "Organisation",
+    "grade": "Grade",
+    "office_region": "Office Region",
+}
+
+# Names accepted by slice_cube and the CLI
+ALIASES = {
+    "check": "check_name",
+    "department": "parent_department",
+    "organisation": "organisation",
+    "grade": "grade",
+    "region": "office_region",
+}
+
+CELL_COLUMNS = ", ".join(DIMENSIONS)
+WORKFORCE_CELL = ", ".join(f"""COALESCE(w."{column}", '')""" for column in DIMENSIONS.values())
+
+# Records whose failures an incremental run re-evaluated (load_workforce_to_db.py --incremental)
+CHANGED_RECORDS = "record_id IN (SELECT record_id FROM workforce_changes)"
+
+# Run modes that only re-evaluate workforce_changes (micro_batch: watch_drops.py)
+DELTA_RUN_MODES = ("incremental", "micro_batch")
+
+
+# --- maintenance ---
+def ensure_cube_tables(conn, sql_path=SQL_FAILURE_CUBE):
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _add_members(conn, changed_only=False):
+    # Failures in dq_failures -> the cell of their workforce row
+    conn.execute(f"""
+    INSERT INTO dq_failure_cube_members (record_id, check_name, {CELL_COLUMNS})
+    SELECT f.record_id, f.check_name, {WORKFORCE_CELL}
+    FROM dq_failures f
+    JOIN workforce w ON w.rowid = f.record_id
+    {"WHERE f." + CHANGED_RECORDS if changed_only else ""}
+    """)
+
+
+def _count_members(conn, sign, changed_only=False):
+    # Adds (sign 1) or removes (sign -1) the members' per-cell counts
+    conn.execute(f"""
+    INSERT INTO dq_failure_cube (check_name, {CELL_COLUMNS}, failed_rows)
+    SELECT check_name, {CELL_COLUMNS}, {sign} * COUNT(*)
+    FROM dq_failure_cube_members
+    {"WHERE " + CHANGED_RECORDS if changed_only else ""}
+    GROUP BY check_name, {CELL_COLUMNS}
+    ON CONFLICT DO UPDATE SET failed_rows = failed_rows + excluded.failed_rows
+    """)
+
+
+def rebuild_cube(conn):
+    conn.execute("DELETE FROM dq_failure_cube_members")
+    conn.execute("DELETE FROM dq_failure_cube")
+    _add_members(conn)
+    _count_members(conn, 1)
+
+
+def apply_changes(conn):
+    # Only records in workforce_changes had their failures re-evaluated by an
+    # incremental run: take their old failures out of the cube and put their
+    # current ones in. Cost follows the change set, not the table.
+    _count_members(conn, -1, changed_only=True)
+    conn.execute(f"DELETE FROM dq_failure_cube_members WHERE {CHANGED_RECORDS}")
+    _add_members(conn, changed_only=True)
+    _count_members(conn, 1, changed_only=True)
+    conn.execute("DELETE FROM dq_failure_cube WHERE failed_rows = 0")
+
+
+def update_failure_cube(conn, run_id):
+    # Called once dq_failures holds the run's failures. Incremental runs that
+    # directly follow the run the cube reflects are applied as a delta;
+    # anything else (full reloads reassign rowids) rebuilds from dq_failures.
+    ensure_cube_tables(conn)
+    run_mode = conn.execute("SELECT run_mode FROM dq_runs WHERE run_id = ?", (run_id,)).fetchone()[0]
+    state = conn.execute("SELECT run_id FROM dq_failure_cube_state WHERE id = 1").fetchone()
+    previous_run = conn.execute("SELECT MAX(run_id) FROM dq_runs WHERE run_id < ?", (run_id,)).fetchone()[0]
+
+    if run_mode in DELTA_RUN_MODES and state and state[0] == previous_run and _table_exists(conn, "workforce_changes"):
+        apply_changes(conn)
+        update_mode = "incremental"
+    else:
+        rebuild_cube(conn)
+        update_mode = "rebuild"
+
+    conn.execute("""
+    INSERT INTO dq_failure_cube_state (id, run_id, update_mode, updated_at)
+    VALUES (1, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        run_id = excluded.run_id,
+        update_mode = excluded.update_mode,
+        updated_at = excluded.updated_at
+    """, (run_id, update_mode, datetime.now(timezone.utc).isoformat()))
+    return update_mode
+
+
+# --- slicing ---
+def slice_cube(conn, by=("check",), filters=None, checks=None, top=None):
+    # Roll the cube up to the `by` dimensions, restricted by exact-match
+    # filters ({"department": "HM Treasury"}) and check names. Reads only
+    # the cube, never workforce.
+    unknown = [name for name in list(by) + list(filters or {}) if name not in ALIASES]
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {', '.join(unknown)} (choose from {', '.join(ALIASES)})")
+
+    group = [ALIASES[name] for name in by]
+    where = []
+    params = []
+    for name, value in (filters or {}).items():
+        where.append(f"{ALIASES[name]} = ?")
+        params.append(value)
+    if checks:
+        where.append(f"check_name IN ({', '.join('?' for _ in checks)})")
+        params.extend(checks)
+
+    select = ", ".join(group + ["SUM(failed_rows) AS failed_rows"])
+    sql = f"""
+    SELECT {select}
+    FROM dq_failure_cube
+    {"WHERE " + " AND ".join(where) if where else ""}
+    {"GROUP BY " + ", ".join(group) if group else ""}
+    ORDER BY failed_rows DESC
+    {"LIMIT ?" if top else ""}
+    """
+    if top:
+        params.append(top)
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def cube_run_id(conn):
+    state = conn.execute("SELECT run_id FROM dq_failure_cube_state WHERE id = 1").fetchone()
+    return state[0] if state else None
+
+
+def _parse_filters(values):
+    filters = {}
+    for value in values or []:
+        name, _, match = value.partition("=")
+        filters[name.strip()] = match
+    return filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slice the latest run's failures by check, department, organisation, grade and region")
+    parser.add_argument("--db", type=Path, default=WORKFORCE_DB)
+    parser.add_argument("--by", nargs="*", default=["check"], metavar="DIMENSION",
+                        help=f"Dimensions to group by ({', '.join(ALIASES)}); none gives the grand total")
+    parser.add_argument("--where", action="append", metavar="DIMENSION=VALUE",
+                        help="Keep one value of a dimension, e.g. department='HM Treasury'")
+    parser.add_argument("--check", action="append", dest="checks", help="Only these checks")
+    parser.add_argument("--top", type=int, help="Largest N cells only")
+    args = parser.parse_args()
+
+    conn = readonly_connection(args.db)
+    try:
+        run_id = cube_run_id(conn) if _table_exists(conn, "dq_failure_cube_state") else None
+        if run_id is None:
+            sys.exit("No failure cube yet: run src/run_workforce_dq.py first")
+
+        try:
+            cube = slice_cube(conn, args.by, _parse_filters(args.where), args.checks, args.top)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"Failure cube (run {run_id})")
+        print(cube.to_string(index=False) if not cube.empty else "No failures")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from db_connections import readonly_connection
+from dq_runs import latest_run_id
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+WORKFORCE_DB = BASE_DIR / "data" / "processed" / "workforce.db"
+
+# Failing records per page
+PAGE_SIZE = 100
+
+
+# --- queries ---
+def workforce_columns(conn):
+    return [row[1] for row in conn.execute("PRAGMA table_info(workforce)")]
+
+
+def _select_list(conn, columns):
+    available = workforce_columns(conn)
+    columns = columns or available
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"Unknown workforce columns: {', '.join(unknown)}")
+    return ", ".join('w."' + c.replace('"', '""') + '"' for c in columns)
+
+
+def failure_summary(conn, run_id=None):
+    # Counts come from the audit log, so listing checks never scans failures
+    run_id = run_id or latest_run_id(conn)
+    summary = pd.read_sql_query("""
+    SELECT check_name, failed_rows
+    FROM dq_audit_log
+    WHERE run_id = ?
+    ORDER BY failed_rows DESC, check_name
+    """, conn, params=[run_id])
+    return run_id, summary
+
+
+def failure_page(conn, check_name, run_id=None, after=0, limit=PAGE_SIZE, columns=None):
+    # Keyset pagination on the (run_id, check_name, record_id) primary key:
+    # every page is an index range seek, however deep into the failures it is.
+    # Returns the page and the cursor for the next one (None on the last page).
+    # Records are joined to the current workforce table; a row deleted since
+    # that run comes back with empty columns.
+    run_id = run_id or latest_run_id(conn)
+    page = pd.read_sql_query(f"""
+    SELECT f.record_id, {_select_list(conn, columns)}
+    FROM dq_failure_records f
+    LEFT JOIN workforce w ON w.rowid = f.record_id
+    WHERE f.run_id = ?
+      AND f.check_name = ?
+      AND f.record_id > ?
+    ORDER BY f.record_id
+    LIMIT ?
+    """, conn, params=[run_id, check_name, after, limit + 1])
+
+    if len(page) > limit:
+        page = page.iloc[:limit]
+        return page, int(page["record_id"].iloc[-1])
+    return page, None
+
+
+def iter_failures(conn, check_name, run_id=None, page_size=10_000, columns=None):
+    # Every failing record for a check, one bounded page at a time
+    run_id = run_id or latest_run_id(conn)
+    after = 0
+    while after is not None:
+        page, after = failure_page(conn, check_name, run_id, after, page_size, columns)
+        if not page.empty:
+            yield page
+
+
+def export_failures(conn, check_name, output, run_id=None, columns=None):
+    rows = 0
+    for i, page in enumerate(iter_failures(conn, check_name, run_id, columns=columns)):
+        page.to_csv(output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(page)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse the workforce records that failed a check")
+    parser.add_argument("--db", type=Path, default=WORKFORCE_DB)
+    parser.add_argument("--check", help="Check to drill into (omit to list checks with failure counts)")
+    parser.add_argument("--run", type=int, help="Run id (default: latest run)")
+    parser.add_argument("--after", type=int, default=0, help="Cursor: return records after this record_id")
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE)
+    parser.add_argument("--columns", nargs="+", help="Workforce columns to show (default: all)")
+    parser.add_argument("--export", type=Path, help="Write every failing record for the check to this CSV")
+    args = parser.parse_args()
+
+    conn = readonly_connection(args.db)
+    try:
+        if not args.check:
+            run_id, summary = failure_summary(conn, args.run)
+            print(f"Run {run_id}")
+            print(summary.to_string(index=False))
+            return
+
+        try:
+            _select_list(conn, args.columns)
+        except ValueError as e:
+            sys.exit(str(e))
+
+        if args.export:
+            rows = export_failures(conn, args.check, args.export, args.run, args.columns)
+            print(f"{rows} failing records for {args.check} written to {args.export}")
+            return
+
+        page, cursor = failure_page(conn, args.check, args.run, args.after, args.limit, args.columns)
+        print(page.to_string(index=False) if not page.empty else "No failing records")
+        if cursor is not None:
+            print(f"\nNext page: --after {cursor}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import re
+from pathlib import Path
+
+from check_telemetry import measure, profile_statement, query_plan
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQL_CHECKS = BASE_DIR / "sql" / "dq_workforce_checks.sql"
+
+# Each rule in dq_workforce_checks.sql is an
+# INSERT INTO dq_failures ... SELECT '<check_name>', rowid FROM workforce WHERE <predicate>
+RULE_PATTERN = re.compile(
+    r"INSERT\s+INTO\s+dq_failures\s*\(\s*check_name\s*,\s*record_id\s*\)\s*"
+    r"SELECT\s*'(?P<check_name>\w+)'\s*,\s*rowid\s+"
+    r"FROM\s+workforce\s+"
+    r"WHERE\s+(?P<predicate>.+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# SQLite integers are signed 64-bit, so one mask column holds 62 rule bits
+BITS_PER_MASK = 62
+
+# Rows re-checked by an incremental run
+INCREMENTAL_FILTER = "rowid IN (SELECT record_id FROM workforce_changes WHERE change_type != 'deleted')"
+
+# Telemetry name for the single scan that evaluates every rule
+FUSED_SCAN = "fused_scan"
+
+
+# --- rule loading ---
+def load_rules(sql_path=SQL_CHECKS):
+    with open(sql_path, "r") as f:
+        sql = re.sub(r"--[^\n]*", "", f.read())
+
+    rules = []
+    for statement in sql.split(";"):
+        match = RULE_PATTERN.search(statement.strip())
+        if match:
+            rules.append((match.group("check_name"), match.group("predicate").strip()))
+
+    return rules
+
+
+def _mask_columns(rules):
+    columns = []
+    for start in range(0, len(rules), BITS_PER_MASK):
+        chunk = rules[start:start + BITS_PER_MASK]
+        flags = " | ".join(
+            f"(CASE WHEN {predicate} THEN {1 << bit} ELSE 0 END)"
+            for bit, (_, predicate) in enumerate(chunk)
+        )
+        columns.append(f"({flags}) AS mask_{start // BITS_PER_MASK}")
+    return columns
+
+
+def build_fused_query(rules, table="workforce", row_filter=None):
+    mask_columns = _mask_columns(rules)
+    mask_names = [f"mask_{i}" for i in range(len(mask_columns))]
+    where = f"WHERE {row_filter}" if row_filter else ""
+
+    # LIMIT -1 OFFSET 0 stops SQLite from flattening the subquery, so every
+    # predicate is evaluated exactly once per row in a single table scan
+    return f"""
+SELECT record_id, {", ".join(mask_names)}
+FROM (
+    SELECT rowid AS record_id, {", ".join(mask_columns)}
+    FROM {table}
+    {where}
+    LIMIT -1 OFFSET 0
+)
+WHERE {" OR ".join(f"{name} != 0" for name in mask_names)}
+"""
+
+
+# --- fused evaluation ---
+def run_fused_checks(conn, rules, table="workforce", row_filter=None, reset=True):
+    if reset:
+        conn.execute("DROP TABLE IF EXISTS dq_failures")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS dq_failures (
+        check_name TEXT,
+        record_id INTEGER
+    )
+    """)
+
+    # Single scan: failing rows only, with one bit per rule
+    conn.execute("DROP TABLE IF EXISTS temp.dq_rule_masks")
+    conn.execute(
+        "CREATE TEMP TABLE dq_rule_masks AS "
+        + build_fused_query(rules, table=table, row_filter=row_filter)
+    )
+
+    conn.execute("DROP TABLE IF EXISTS temp.dq_rule_bits")
+    conn.execute("""
+    CREATE TEMP TABLE dq_rule_bits (
+        position INTEGER PRIMARY KEY,
+        check_name TEXT,
+        mask_index INTEGER,
+        bit INTEGER
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO dq_rule_bits VALUES (?, ?, ?, ?)",
+        [
+            (position, check_name, position // BITS_PER_MASK, 1 << (position % BITS_PER_MASK))
+            for position, (check_name, _) in enumerate(rules)
+        ],
+    )
+
+    mask_count = (len(rules) + BITS_PER_MASK - 1) // BITS_PER_MASK
+    mask_lookup = " ".join(
+        f"WHEN {i} THEN m.mask_{i}" for i in range(mask_count)
+    )
+
+    # Expand the bitmasks into dq_failures in the same order the
+    # per-rule INSERT statements produce (rule order, then rowid)
+    conn.execute(f"""
+    INSERT INTO dq_failures (check_name, record_id)
+    SELECT r.check_name, m.record_id
+    FROM dq_rule_bits r
+    JOIN dq_rule_masks m
+      ON ((CASE r.mask_index {mask_lookup} END) & r.bit) != 0
+    ORDER BY r.position, m.record_id
+    """)
+
+    # Built after the bulk insert; serves per-check lookups and the run archive
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dq_failures_check ON dq_failures (check_name, record_id)")
+
+    counts = dict(conn.execute(f"""
+    SELECT r.check_name, COUNT(m.record_id)
+    FROM dq_rule_bits r
+    LEFT JOIN dq_rule_masks m
+      ON ((CASE r.mask_index {mask_lookup} END) & r.bit) != 0
+    GROUP BY r.position
+    ORDER BY r.position
+    """).fetchall())
+
+    conn.execute("DROP TABLE temp.dq_rule_masks")
+    conn.execute("DROP TABLE temp.dq_rule_bits")
+    conn.commit()
+
+    return counts
+
+
+# --- incremental evaluation ---
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def incremental_ready(conn):
+    # Needs change tracking from load_workforce_to_db.py, a previous
+    # complete dq_failures table, and no unchecked full reload
+    if not all(_table_exists(conn, t) for t in ("workforce_load_state", "workforce_changes", "dq_failures")):
+        return False
+    state = conn.execute("SELECT load_mode, checked FROM workforce_load_state WHERE id = 1").fetchone()
+    return state is not None and not (state[0] == "full" and state[1] == 0)
+
+
+def run_incremental_checks(conn, rules, table="workforce"):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dq_failures_record ON dq_failures (record_id)")
+
+    # Retire failures for deleted rows and for rows about to be re-checked
+    conn.execute("""
+    DELETE FROM dq_failures
+    WHERE record_id IN (SELECT record_id FROM workforce_changes)
+    """)
+
+    return run_fused_checks(
+        conn,
+        rules,
+        table=table,
+        row_filter=INCREMENTAL_FILTER,
+        reset=False,
+    )
+
+
+def mark_checked(conn):
+    # Called after a full or incremental run: pending changes are now reflected in dq_failures
+    if _table_exists(conn, "workforce_changes"):
+        conn.execute("DELETE FROM workforce_changes")
+    if _table_exists(conn, "workforce_load_state"):
+        conn.execute("UPDATE workforce_load_state SET checked = 1")
+    conn.commit()
+
+
+# --- telemetry ---
+def profile_rules(conn, rules, table="workforce"):
+    # The fused scan evaluates all rules at once, so per-rule cost is measured
+    # with one standalone COUNT per rule (an extra table scan each)
+    records = []
+    for check_name, predicate in rules:
+        _, record = profile_statement(conn, check_name, f"SELECT COUNT(*) FROM {table} WHERE {predicate}")
+        records.append(record)
+    return records
+
+
+def run_checks_profiled(conn, rules, incremental=False, per_rule=False, table="workforce"):
+    # Full or incremental fused run, returning (failure_counts, run_mode, telemetry records)
+    row_filter = INCREMENTAL_FILTER if incremental and incremental_ready(conn) else None
+    plan, used_index = query_plan(conn, build_fused_query(rules, table=table, row_filter=row_filter))
+
+    with measure(conn) as stats:
+        if row_filter:
+            failure_counts = run_incremental_checks(conn, rules, table=table)
+        else:
+            failure_counts = run_fused_checks(conn, rules, table=table)
+
+    records = [{"check_name": FUSED_SCAN, **stats, "used_index": used_index, "query_plan": plan}]
+    if per_rule:
+        records += profile_rules(conn, rules, table=table)
+
+    return failure_counts, "incremental" if row_filter else "full", records
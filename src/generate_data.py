@@ -1,64 +1,346 @@
-import pandas as pd
-from faker import Faker
-import random
+import argparse
+from datetime import date
 from pathlib import Path
 
-# Initialize Faker
-fake = Faker()
+import numpy as np
+import pandas as pd
 
-# Number of records
-N = 5000
+from db_connections import connect
+from load_workforce_to_db import WORKFORCE_COLUMNS, create_table
 
 # Resolve project root safely
 BASE_DIR = Path(__file__).resolve().parent.parent
 OUTPUT_DIR = BASE_DIR / "data" / "raw"
 OUTPUT_PATH = OUTPUT_DIR / "customers_raw.csv"
 
-# Prepare data list
-data = []
-
-for i in range(N):
-    customer_id = i + 1
-    name = fake.name()
-
-    # Introduce missing emails in ~5% of records
-    email = fake.email() if random.random() > 0.05 else None
-
-    # Introduce missing phone numbers in ~10% of records
-    phone_number = fake.phone_number() if random.random() > 0.1 else None
-
-    signup_date = fake.date_between(start_date="-3y", end_date="today")
-    country = random.choice(["USA", "UK", "Canada", "Germany", "India"])
-    last_active = fake.date_between(start_date=signup_date, end_date="today")
-
-    data.append([
-        customer_id,
-        name,
-        email,
-        phone_number,
-        signup_date,
-        country,
-        last_active
-    ])
-
-# Create DataFrame
-df = pd.DataFrame(
-    data,
-    columns=[
-        "customer_id",
-        "name",
-        "email",
-        "phone_number",
-        "signup_date",
-        "country",
-        "last_active"
-    ]
-)
-
-# Ensure output directory exists
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-# Save CSV
-df.to_csv(OUTPUT_PATH, index=False)
-
-print(f"Synthetic customer dataset created: {OUTPUT_PATH}")
+# Defaults reproduce the original 5,000-customer dataset shape
+N = 5000
+SEED = 42
+CHUNK_SIZE = 250_000
+
+# Injected defect rates (fraction of rows), overridable with --defect name=rate
+CUSTOMER_DEFECTS = {
+    "missing_email": 0.05,
+    "missing_phone": 0.10,
+    "duplicate_email": 0.01,
+    # Copies of another customer's email with a case, whitespace, +tag or typo change
+    "near_duplicate_email": 0.0,
+    "invalid_email_format": 0.0,
+    "last_active_before_signup": 0.0,
+}
+
+WORKFORCE_DEFECTS = {
+    "missing_parent_department": 0.0,
+    "missing_organisation": 0.0,
+    "missing_grade": 0.0,
+    "missing_job_title": 0.0,
+    "missing_office_region": 0.0,
+    "negative_fte": 0.005,
+    "unrealistic_fte": 0.01,
+    "pay_inversion": 0.005,
+    "senior_low_pay": 0.005,
+}
+
+# --- vocabularies ---
+FIRST_NAMES = np.array([
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa",
+    "Anthony", "Betty", "Mark", "Margaret", "Steven", "Sandra", "Paul", "Ashley",
+    "Andrew", "Emily", "Joshua", "Donna", "Kenneth", "Michelle", "Kevin", "Laura",
+])
+LAST_NAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young",
+    "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+])
+EMAIL_DOMAINS = np.array(["example.com", "example.org", "example.net"])
+COUNTRIES = np.array(["USA", "UK", "Canada", "Germany", "India"])
+
+DEPARTMENTS = np.array([
+    "Department for Education",
+    "Department of Health and Social Care",
+    "HM Treasury",
+    "Home Office",
+    "Ministry of Justice",
+    "Department for Transport",
+])
+UNITS = np.array([
+    "Data Science", "Financial Reporting", "Operational Excellence", "Digital Services",
+    "Policy Delivery", "Commercial", "Human Resources", "Estates", "Strategy", "Analysis",
+])
+# Grade, grade code, payscale minimum, payscale maximum
+GRADES = [
+    ("AA - National", "AA", 21000, 22500),
+    ("AO - National", "AO", 23000, 24500),
+    ("EO - National", "EO", 28500, 31500),
+    ("HEO - National", "HEO", 35000, 38500),
+    ("HEO - London", "HEO", 40000, 42700),
+    ("SEO - National", "SEO", 42000, 45500),
+    ("Grade 7 - National", "G7", 53000, 62000),
+    ("Grade 6 - National", "G6", 64000, 78000),
+    ("SCS1 - National", "SCS1", 75000, 117800),
+]
+GRADE_TITLES = {
+    "AA": "Administrative Assistant",
+    "AO": "Administrative Officer",
+    "EO": "Executive Officer",
+    "HEO": "Higher Executive Officer",
+    "SEO": "Senior Executive Officer",
+    "G7": "Manager",
+    "G6": "Head of Team",
+    "SCS1": "Director",
+}
+PROFESSIONS = np.array(["Other", "Policy", "Operational Delivery", "Finance", "Digital, Data and Technology"])
+REGIONS = np.array([
+    "London", "North East", "North West", "Yorkshire and The Humber",
+    "East Midlands", "West Midlands", "South West", "Scotland", "Wales",
+])
+
+
+# --- helpers ---
+def _pick(rng, values, size):
+    return values[rng.integers(0, len(values), size)]
+
+
+def _defect_mask(rng, rate, size):
+    return rng.random(size) < rate if rate > 0 else np.zeros(size, dtype=bool)
+
+
+def _near_variant(email, kind):
+    if email is None:
+        return None
+    local, _, domain = email.partition("@")
+    if kind == 0:
+        return email.upper()
+    if kind == 1:
+        return email + " "
+    if kind == 2:
+        return f"{local}+news@{domain}"
+    # Typo: drop the separator between first and last name
+    return local.replace(".", "", 1) + "@" + domain
+
+
+def _zfill(values, width):
+    return pd.Series(values).astype(str).str.zfill(width)
+
+
+def _chunk_rng(seed, chunk_index):
+    # Each chunk has its own stream, so output is reproducible for a given
+    # (seed, chunk size) without holding earlier chunks in memory
+    return np.random.default_rng([seed, chunk_index])
+
+
+def _chunk_bounds(rows, chunk_size):
+    for chunk_index, start in enumerate(range(0, rows, chunk_size)):
+        yield chunk_index, start, min(chunk_size, rows - start)
+
+
+# --- customers ---
+def generate_customers(rows=N, seed=SEED, chunk_size=CHUNK_SIZE, defects=None, as_of=None):
+    rates = {**CUSTOMER_DEFECTS, **(defects or {})}
+    today = np.datetime64(as_of or date.today(), "D")
+
+    for chunk_index, start, size in _chunk_bounds(rows, chunk_size):
+        rng = _chunk_rng(seed, chunk_index)
+
+        first = pd.Series(_pick(rng, FIRST_NAMES, size))
+        last = pd.Series(_pick(rng, LAST_NAMES, size))
+        customer_id = np.arange(start + 1, start + size + 1)
+
+        # Emails are unique by construction (customer_id suffix); duplicates are injected
+        email = (
+            first.str.lower() + "." + last.str.lower()
+            + pd.Series(customer_id).astype(str)
+            + "@" + pd.Series(_pick(rng, EMAIL_DOMAINS, size))
+        )
+        phone = (
+            _zfill(rng.integers(200, 1000, size), 3) + "-"
+            + _zfill(rng.integers(0, 1000, size), 3) + "-"
+            + _zfill(rng.integers(0, 10000, size), 4)
+        )
+
+        # Signup within the last three years, last activity between signup and today
+        signup = today - rng.integers(0, 3 * 365, size).astype("timedelta64[D]")
+        days_since_signup = (today - signup).astype(int)
+        last_active = signup + (rng.random(size) * (days_since_signup + 1)).astype(int).astype("timedelta64[D]")
+
+        df = pd.DataFrame({
+            "customer_id": customer_id,
+            "name": first + " " + last,
+            "email": email,
+            "phone_number": phone,
+            "signup_date": signup,
+            "country": _pick(rng, COUNTRIES, size),
+            "last_active": last_active,
+        })
+
+        # --- injected defects ---
+        dup = _defect_mask(rng, rates["duplicate_email"], size)
+        if dup.any():
+            df.loc[dup, "email"] = df["email"].to_numpy()[rng.integers(0, size, int(dup.sum()))]
+
+        near = _defect_mask(rng, rates["near_duplicate_email"], size)
+        if near.any():
+            sources = df["email"].to_numpy()[rng.integers(0, size, int(near.sum()))]
+            kinds = rng.integers(0, 4, len(sources))
+            df.loc[near, "email"] = [_near_variant(email, kind) for email, kind in zip(sources, kinds)]
+
+        invalid = _defect_mask(rng, rates["invalid_email_format"], size)
+        df.loc[invalid, "email"] = df.loc[invalid, "email"].str.replace("@", "_at_", regex=False)
+
+        before = _defect_mask(rng, rates["last_active_before_signup"], size)
+        df.loc[before, "last_active"] = (
+            df.loc[before, "signup_date"] - pd.to_timedelta(rng.integers(1, 365, int(before.sum())), unit="D")
+        )
+
+        df.loc[_defect_mask(rng, rates["missing_email"], size), "email"] = None
+        df.loc[_defect_mask(rng, rates["missing_phone"], size), "phone_number"] = None
+
+        df["signup_date"] = df["signup_date"].dt.strftime("%Y-%m-%d")
+        df["last_active"] = df["last_active"].dt.strftime("%Y-%m-%d")
+        yield df
+
+
+# --- workforce ---
+def generate_workforce(rows=N, seed=SEED, chunk_size=CHUNK_SIZE, defects=None):
+    rates = {**WORKFORCE_DEFECTS, **(defects or {})}
+    grade_names = np.array([g[0] for g in GRADES])
+    grade_codes = np.array([g[1] for g in GRADES])
+    pay_min = np.array([g[2] for g in GRADES])
+    pay_max = np.array([g[3] for g in GRADES])
+
+    for chunk_index, start, size in _chunk_bounds(rows, chunk_size):
+        rng = _chunk_rng(seed, chunk_index)
+
+        department = _pick(rng, DEPARTMENTS, size)
+        unit = _pick(rng, UNITS, size)
+        region = _pick(rng, REGIONS, size)
+        grade_index = rng.integers(0, len(GRADES), size)
+        codes = grade_codes[grade_index]
+        titles = pd.Series(codes).map(GRADE_TITLES)
+
+        # Post ids are unique per row, e.g. DFE-0000123
+        prefix = pd.Series(department).str.split().str[-1].str[:3].str.upper()
+        post = prefix + "-" + _zfill(np.arange(start + 1, start + size + 1), 7)
+
+        df = pd.DataFrame({
+            "Parent Department": department,
+            "Organisation": department,
+            "Unit": unit,
+            "Reporting Senior Post": post,
+            "Grade": grade_names[grade_index],
+            "Payscale Minimum (£)": pay_min[grade_index],
+            "Payscale Maximum (£)": pay_max[grade_index],
+            "Generic Job Title": titles + " - " + unit + " " + codes + "-" + region,
+            "Number of Posts in FTE": np.round(rng.gamma(2.0, 1.0, size).clip(0.1, 4.9), 2),
+            "Professional/Occupational Group": _pick(rng, PROFESSIONS, size),
+            "Office Region": region,
+        })
+
+        # --- injected defects ---
+        inverted = _defect_mask(rng, rates["pay_inversion"], size)
+        df.loc[inverted, ["Payscale Minimum (£)", "Payscale Maximum (£)"]] = (
+            df.loc[inverted, ["Payscale Maximum (£)", "Payscale Minimum (£)"]].to_numpy()
+        )
+
+        senior_low = _defect_mask(rng, rates["senior_low_pay"], size)
+        df.loc[senior_low, "Generic Job Title"] = "Director - " + df.loc[senior_low, "Unit"]
+        df.loc[senior_low, "Payscale Minimum (£)"] = 25000
+        df.loc[senior_low, "Payscale Maximum (£)"] = 30000
+
+        negative = _defect_mask(rng, rates["negative_fte"], size)
+        df.loc[negative, "Number of Posts in FTE"] = -np.round(rng.random(int(negative.sum())) + 0.01, 2)
+
+        unrealistic = _defect_mask(rng, rates["unrealistic_fte"], size)
+        df.loc[unrealistic, "Number of Posts in FTE"] = np.round(rng.uniform(5.01, 50, int(unrealistic.sum())), 2)
+
+        for defect, column in [
+            ("missing_parent_department", "Parent Department"),
+            ("missing_organisation", "Organisation"),
+            ("missing_grade", "Grade"),
+            ("missing_job_title", "Generic Job Title"),
+            ("missing_office_region", "Office Region"),
+        ]:
+            df.loc[_defect_mask(rng, rates[defect], size), column] = None
+
+        yield df[list(WORKFORCE_COLUMNS)]
+
+
+# --- writers ---
+def write_csv(chunks, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+def write_sqlite(chunks, db_path, table, workforce=False):
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = connect(db_path)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        if i == 0 and workforce:
+            create_table(conn, table)
+        chunk.to_sql(
+            table, conn, index=False,
+            if_exists="append" if (i > 0 or workforce) else "replace",
+            chunksize=50_000,
+        )
+        conn.commit()
+        rows += len(chunk)
+    conn.close()
+    return rows
+
+
+def _parse_defects(values):
+    defects = {}
+    for value in values or []:
+        name, rate = value.split("=", 1)
+        defects[name] = float(rate)
+    return defects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic customer or workforce data")
+    parser.add_argument("--dataset", choices=["customers", "workforce"], default="customers")
+    parser.add_argument("--rows", type=int, default=N)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", type=Path, help="CSV path (default: data/raw/<dataset> file)")
+    parser.add_argument("--db", type=Path, help="Also write to this SQLite database")
+    parser.add_argument("--table", help="Table name for --db (default: customers / workforce)")
+    parser.add_argument("--defect", action="append", metavar="NAME=RATE",
+                        help="Override an injected defect rate, e.g. missing_email=0.2")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), metavar="YYYY-MM-DD",
+                        help="Date customer signup/activity dates are generated relative to (default: today)")
+    args = parser.parse_args()
+
+    defects = _parse_defects(args.defect)
+    unknown = set(defects) - set(CUSTOMER_DEFECTS if args.dataset == "customers" else WORKFORCE_DEFECTS)
+    if unknown:
+        parser.error(f"unknown defect(s) for {args.dataset}: {', '.join(sorted(unknown))}")
+
+    def chunks():
+        if args.dataset == "customers":
+            return generate_customers(args.rows, args.seed, args.chunk_size, defects, args.as_of)
+        return generate_workforce(args.rows, args.seed, args.chunk_size, defects)
+
+    default_output = OUTPUT_PATH if args.dataset == "customers" else OUTPUT_DIR / "workforce_synthetic.csv"
+    output = args.output or default_output
+    rows = write_csv(chunks(), output)
+    print(f"Synthetic {args.dataset} dataset created: {output} ({rows} rows)")
+
+    if args.db:
+        table = args.table or args.dataset
+        write_sqlite(chunks(), args.db, table, workforce=args.dataset == "workforce")
+        print(f"Synthetic {args.dataset} dataset written to {args.db} ({table})")
+
+
+if __name__ == "__main__":
+    main()
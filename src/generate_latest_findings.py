@@ -1,14 +1,15 @@
 import pandas as pd
 
-# Load SLA evaluation results
-df = pd.read_csv("data/processed/dq_sla_evaluation.csv")
+from db_connections import connect
+from dq_runs import LATEST_FINDINGS_QUERY, ensure_audit_tables
 
-# Keep latest run per check
-latest = (
-    df.sort_values("check_timestamp")
-      .groupby("check_name", as_index=False)
-      .tail(1)
-)
+DB_PATH = "data/processed/workforce.db"
+
+# Latest run per check is maintained by run_workforce_dq.py
+conn = connect(DB_PATH)
+ensure_audit_tables(conn)
+latest = pd.read_sql_query(LATEST_FINDINGS_QUERY, conn)
+conn.close()
 
 # Save for README + BI usage
 latest.to_csv(
@@ -1,77 +1,73 @@
-import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-
-# Create outputs directory if it doesn't exist
-os.makedirs("outputs", exist_ok=True)
-
-# ----------------------------
-# 1. Audit Log Snapshot
-# ----------------------------
-conn = sqlite3.connect("data/processed/customers.db")
-audit_df = pd.read_sql_query("SELECT * FROM dq_audit_log", conn)
-conn.close()
-
-# Save a table snapshot as CSV
-audit_df.to_csv("outputs/audit_log_snapshot.csv", index=False)
-
-# Plot audit log snapshot as a horizontal bar chart (failed_rows)
-plt.figure(figsize=(8, 5))
-sns.barplot(x="failed_rows", y="check_name", data=audit_df, palette="viridis")
-plt.title("Audit Log Snapshot - Failed Rows per Check")
-plt.xlabel("Failed Rows")
-plt.ylabel("Check Name")
-plt.tight_layout()
-plt.savefig("outputs/audit_log_snapshot.png")
-plt.close()
-
-# ----------------------------
-# 2. SLA Violation Chart (% failed)
-# ----------------------------
-# Compute percentage failed per check
-audit_df['total_rows'] = 5000  # assuming dataset has 5000 rows, adjust if different
-audit_df['pct_failed'] = audit_df['failed_rows'] / audit_df['total_rows'] * 100
-
-plt.figure(figsize=(8, 5))
-sns.barplot(x="pct_failed", y="check_name", data=audit_df, palette="magma")
-plt.title("SLA Violation Chart (% Failed per Check)")
-plt.xlabel("% Failed")
-plt.ylabel("Check Name")
-plt.tight_layout()
-plt.savefig("outputs/sla_bar_chart.png")
-plt.close()
-
-# ----------------------------
-# 3. Historical Trend
-# ----------------------------
-hist_df = pd.read_csv("data/processed/dq_audit_log_historical.csv", parse_dates=["check_timestamp"])
-
-# Compute % failed
-hist_df['pct_failed'] = hist_df['failed_rows'] / 5000 * 100  # adjust total_rows as needed
-
-plt.figure(figsize=(10, 6))
-for check in hist_df["check_name"].unique():
-    df_check = hist_df[hist_df["check_name"] == check]
-    plt.plot(df_check["check_timestamp"], df_check["pct_failed"], marker='o', label=check)
-
-plt.title("Historical SLA Trends")
-plt.xlabel("Timestamp")
-plt.ylabel("% Failed")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.savefig("outputs/historical_trend.png")
-plt.close()
-
-# ----------------------------
-# 4. Streamlit Dashboard (Interactive)
-# ----------------------------
-# Optional: generate screenshot-ready static view
-# Save minimal HTML for portfolio (just a table + chart) without running full Streamlit
-
-html_content = f"""
+from pathlib import Path
+
+import charts
+from db_connections import connect, readonly_connection
+from historical_store import read_rollups
+from render_cache import render_charts, write_if_changed
+
+# Resolve project root safely; the pipeline calls main() from a worker thread,
+# so nothing here may depend on the working directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+CUSTOMERS_DB = BASE_DIR / "data" / "processed" / "customers.db"
+OUTPUT_DIR = BASE_DIR / "outputs"
+
+
+def main(customers_db=CUSTOMERS_DB, output_dir=OUTPUT_DIR):
+    # Create outputs directory if it doesn't exist
+    output_dir = Path(output_dir)
+    output_dir.mkdir(exist_ok=True)
+
+    # ----------------------------
+    # 1. Audit Log Snapshot
+    # ----------------------------
+    conn = readonly_connection(customers_db)
+    audit_df = pd.read_sql_query("SELECT * FROM dq_audit_log", conn)
+    conn.close()
+
+    # Save a table snapshot as CSV
+    audit_df.to_csv(output_dir / "audit_log_snapshot.csv", index=False)
+
+    # ----------------------------
+    # 2. SLA Violation Chart (% failed)
+    # ----------------------------
+    # Compute percentage failed per check
+    audit_df['total_rows'] = 5000  # assuming dataset has 5000 rows, adjust if different
+    audit_df['pct_failed'] = audit_df['failed_rows'] / audit_df['total_rows'] * 100
+
+    # ----------------------------
+    # 3. Historical Trend
+    # ----------------------------
+    # Daily rollups are maintained by run_data_quality_historical.py,
+    # so the trend never re-reads the raw history
+    conn = connect(customers_db)
+    hist_df = read_rollups(conn, "dq_rollup_daily")
+    conn.close()
+
+    # Compute % failed
+    hist_df['pct_failed'] = hist_df['mean_pct_failed'] * 100
+
+    # ----------------------------
+    # Render charts
+    # ----------------------------
+    # Charts whose input data is unchanged since the last render are skipped;
+    # the rest render in parallel worker processes (Agg backend)
+    rendered, skipped = render_charts([
+        (output_dir / "audit_log_snapshot.png", charts.audit_log_snapshot,
+         {"audit_df": audit_df[["check_name", "failed_rows"]]}),
+        (output_dir / "sla_bar_chart.png", charts.sla_bar_chart,
+         {"audit_df": audit_df[["check_name", "pct_failed"]]}),
+        (output_dir / "historical_trend.png", charts.historical_trend,
+         {"series": charts.trend_series(hist_df)}),
+    ])
+
+    # ----------------------------
+    # 4. Streamlit Dashboard (Interactive)
+    # ----------------------------
+    # Optional: generate screenshot-ready static view
+    # Save minimal HTML for portfolio (just a table + chart) without running full Streamlit
+
+    html_content = f"""
 <html>
 <head><title>Customer Data Quality Dashboard</title></head>
 <body>
@@ -85,7 +81,12 @@ html_content = f"""
 </html>
 """
 
-with open("outputs/dashboard_portfolio.html", "w") as f:
-    f.write(html_content)
+    write_if_changed(output_dir / "dashboard_portfolio.html", html_content)
+
+    print(f"Portfolio PNGs and dashboard HTML generated in outputs/ "
+          f"({len(rendered)} charts rendered, {len(skipped)} unchanged)")
+
 
-print("Portfolio PNGs and dashboard HTML generated in outputs/")
+# Charts render in spawned worker processes, which import this module again
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import csv
+import pandas as pd
+from datetime import datetime, timezone
+from pathlib import Path
+
+from columnar_store import HAS_ARROW, columnar_path
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+HISTORICAL_TABLE_SQL = BASE_DIR / "src" / "create_historical_audit_table.sql"
+HISTORICAL_CSV = BASE_DIR / "data" / "processed" / "dq_audit_log_historical.csv"
+# Parquet dataset of the same export: one part file per export batch
+HISTORICAL_PARQUET = columnar_path(HISTORICAL_CSV)
+
+EXPORT_COLUMNS = ["run_id", "check_name", "failed_rows", "total_rows", "pct_failed", "check_timestamp"]
+
+# Period start for each rollup table, as a SQLite date expression
+ROLLUP_PERIODS = {
+    "dq_rollup_daily": "date(check_timestamp)",
+    # Monday of the ISO week
+    "dq_rollup_weekly": "date(check_timestamp, 'weekday 0', '-6 days')",
+}
+
+
+# --- schema ---
+def ensure_historical_store(conn, sql_path=HISTORICAL_TABLE_SQL):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(dq_audit_log_historical)")]
+    if columns and "partition_day" not in columns:
+        # Tables created before partitioning: add and backfill the key
+        # before the append-only triggers exist
+        conn.execute("ALTER TABLE dq_audit_log_historical ADD COLUMN partition_day TEXT")
+        conn.execute("UPDATE dq_audit_log_historical SET partition_day = date(check_timestamp)")
+        conn.commit()
+
+    with open(sql_path) as f:
+        conn.executescript(f.read())
+
+
+def _watermark(conn, export_name):
+    row = conn.execute(
+        "SELECT last_run_id FROM dq_export_state WHERE export_name = ?", (export_name,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _set_watermark(conn, export_name, last_run_id):
+    conn.execute(
+        "INSERT OR REPLACE INTO dq_export_state (export_name, last_run_id) VALUES (?, ?)",
+        (export_name, last_run_id),
+    )
+
+
+# --- append ---
+def append_run(conn, results, total_rows):
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    partition_day = timestamp[:10]
+
+    conn.executemany(
+        """
+        INSERT INTO dq_audit_log_historical
+            (check_name, failed_rows, total_rows, pct_failed, check_timestamp, partition_day)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (check_name, failed_rows, total_rows, failed_rows / total_rows, timestamp, partition_day)
+            for check_name, failed_rows in results
+        ],
+    )
+    conn.commit()
+    return timestamp
+
+
+# --- rollups ---
+def refresh_rollups(conn):
+    since = _watermark(conn, "rollups")
+    latest = conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM dq_audit_log_historical").fetchone()[0]
+    if latest <= since:
+        return 0
+
+    for table, period in ROLLUP_PERIODS.items():
+        conn.execute(f"""
+        INSERT INTO {table} (
+            period_start, check_name, runs, min_pct_failed, max_pct_failed,
+            sum_pct_failed, mean_pct_failed, max_failed_rows, last_check_timestamp
+        )
+        SELECT
+            {period},
+            check_name,
+            COUNT(*),
+            MIN(pct_failed),
+            MAX(pct_failed),
+            SUM(pct_failed),
+            AVG(pct_failed),
+            MAX(failed_rows),
+            MAX(check_timestamp)
+        FROM dq_audit_log_historical
+        WHERE run_id > ? AND run_id <= ?
+        GROUP BY 1, 2
+        ON CONFLICT (period_start, check_name) DO UPDATE SET
+            runs = runs + excluded.runs,
+            min_pct_failed = MIN(min_pct_failed, excluded.min_pct_failed),
+            max_pct_failed = MAX(max_pct_failed, excluded.max_pct_failed),
+            sum_pct_failed = sum_pct_failed + excluded.sum_pct_failed,
+            mean_pct_failed = (sum_pct_failed + excluded.sum_pct_failed) / (runs + excluded.runs),
+            max_failed_rows = MAX(max_failed_rows, excluded.max_failed_rows),
+            last_check_timestamp = MAX(last_check_timestamp, excluded.last_check_timestamp)
+        """, (since, latest))
+
+    _set_watermark(conn, "rollups", latest)
+    conn.commit()
+    return latest - since
+
+
+# --- incremental CSV export ---
+def export_new_runs(conn, csv_path=HISTORICAL_CSV):
+    csv_path = Path(csv_path)
+    # A missing file is rebuilt from the start of history
+    since = _watermark(conn, "historical_csv") if csv_path.exists() else 0
+
+    rows = conn.execute(f"""
+    SELECT {", ".join(EXPORT_COLUMNS)}
+    FROM dq_audit_log_historical
+    WHERE run_id > ?
+    ORDER BY run_id
+    """, (since,)).fetchall()
+    if not rows and csv_path.exists():
+        return 0
+
+    write_header = since == 0
+    with open(csv_path, "w" if write_header else "a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(rows)
+
+    if rows:
+        _set_watermark(conn, "historical_csv", rows[-1][0])
+        conn.commit()
+    return len(rows)
+
+
+def export_new_runs_parquet(conn, dataset_dir=HISTORICAL_PARQUET):
+    # Parquet files cannot be appended to, so each export adds a part file
+    # holding only the new runs; readers load the directory as one table
+    if not HAS_ARROW:
+        return None
+
+    dataset_dir = Path(dataset_dir)
+    parts = sorted(dataset_dir.glob("part-*.parquet")) if dataset_dir.exists() else []
+    since = _watermark(conn, "historical_parquet") if parts else 0
+    if since == 0:
+        for part in parts:
+            part.unlink()
+
+    new_rows = pd.read_sql_query(f"""
+    SELECT {", ".join(EXPORT_COLUMNS)}
+    FROM dq_audit_log_historical
+    WHERE run_id > ?
+    ORDER BY run_id
+    """, conn, params=[since])
+    if new_rows.empty:
+        return 0
+
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    first, last = int(new_rows["run_id"].iloc[0]), int(new_rows["run_id"].iloc[-1])
+    new_rows.to_parquet(dataset_dir / f"part-{first:012d}-{last:012d}.parquet", index=False)
+
+    _set_watermark(conn, "historical_parquet", last)
+    conn.commit()
+    return len(new_rows)
+
+
+# --- trend consumers ---
+def read_rollups(conn, table="dq_rollup_daily", since=""):
+    # Brings the rollups up to date first; a no-op when no new runs were logged
+    ensure_historical_store(conn)
+    refresh_rollups(conn)
+
+    df = pd.read_sql_query(
+        f"""
+        SELECT period_start, check_name, runs, min_pct_failed, max_pct_failed, mean_pct_failed
+        FROM {table}
+        WHERE period_start >= ?
+        ORDER BY period_start, check_name
+        """,
+        conn,
+        params=[since],
+    )
+    # period_start is stored as TEXT; as datetimes the plots space periods by time
+    df["period_start"] = pd.to_datetime(df["period_start"], format="ISO8601")
+    return df
@@ -1,22 +1,23 @@
-import pandas as pd
-import sqlite3
 from pathlib import Path
 
+from categorical_frames import frame_memory_mb
+from customer_store import full_load
+from db_connections import connect
+
 DB_PATH = "data/processed/customers.db"
 CSV_PATH = "data/raw/customers_raw.csv"
 
 # Ensure processed directory exists
 Path("data/processed").mkdir(parents=True, exist_ok=True)
 
-# Load CSV
-df = pd.read_csv(CSV_PATH, parse_dates=["signup_date", "last_active"])
-
 # Connect to SQLite
-conn = sqlite3.connect(DB_PATH)
+conn = connect(DB_PATH)
 
-# Write to database
-df.to_sql("customers", conn, if_exists="replace", index=False)
+# Load CSV (or its Parquet copy) with country as stored dictionary codes, then
+# build the filter indexes and the analytics store (cohorts, email counts,
+# NULL counts, activity per country) for the dashboards
+df = full_load(conn, CSV_PATH)
 
 conn.close()
 
-print("Customers table loaded into SQLite database.")
+print(f"Customers table loaded into SQLite database (frame {frame_memory_mb(df):.1f} MB).")
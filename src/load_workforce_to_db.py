@@ -0,0 +1,412 @@
+import argparse
+import pandas as pd
+from pathlib import Path
+
+from categorical_frames import WORKFORCE_CATEGORIES, ensure_dictionary_table, refresh_dictionaries
+from db_connections import connect
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = BASE_DIR / "data" / "raw" / "workforce.csv"
+DB_PATH = BASE_DIR / "data" / "processed" / "workforce.db"
+
+# Rows parsed per chunk and rows written per transaction
+CHUNK_SIZE = 50_000
+COMMIT_EVERY = 500_000
+
+# Column order and storage types for the workforce table
+WORKFORCE_COLUMNS = {
+    "Parent Department": "TEXT",
+    "Organisation": "TEXT",
+    "Unit": "TEXT",
+    "Reporting Senior Post": "TEXT",
+    "Grade": "TEXT",
+    "Payscale Minimum (£)": "REAL",
+    "Payscale Maximum (£)": "REAL",
+    "Generic Job Title": "TEXT",
+    "Number of Posts in FTE": "REAL",
+    "Professional/Occupational Group": "TEXT",
+    "Office Region": "TEXT",
+}
+
+NUMERIC_COLUMNS = [c for c, t in WORKFORCE_COLUMNS.items() if t == "REAL"]
+
+# Columns that identify a post across extracts; everything else is content.
+# Rows sharing a key are told apart by their order within the extract.
+KEY_COLUMNS = ["Reporting Senior Post", "Unit", "Grade", "Generic Job Title"]
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def create_table(conn, table):
+    columns = ",\n    ".join(f"{_quote(c)} {t}" for c, t in WORKFORCE_COLUMNS.items())
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"CREATE TABLE {table} (\n    {columns}\n)")
+
+
+# --- chunked reading and typing ---
+def read_chunks(csv_path=CSV_PATH, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    # Everything is read as text first so every chunk gets the same types,
+    # regardless of what pandas would infer from that chunk alone
+    return pd.read_csv(
+        csv_path,
+        dtype=str,
+        usecols=list(WORKFORCE_COLUMNS),
+        keep_default_na=False,
+        na_values=[""],
+        chunksize=chunk_size,
+        encoding=encoding,
+    )
+
+
+def to_numeric(series):
+    # Always float64 (the REAL column type): pd.to_numeric alone picks int64 or
+    # float64 from whatever else is in the chunk, and the row fingerprints
+    # hash the typed values
+    cleaned = series.str.replace(r"[£,\s]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+def type_chunk(chunk):
+    chunk = chunk[list(WORKFORCE_COLUMNS)].copy()
+    for column in NUMERIC_COLUMNS:
+        chunk[column] = to_numeric(chunk[column])
+    return chunk
+
+
+def chunk_rows(chunk):
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def _hash_rows(frame):
+    # hash_pandas_object uses a fixed key, so fingerprints are stable across runs
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashes.view("int64").tolist()
+
+
+def fingerprint_rows(chunk, first_id):
+    staging_ids = range(first_id, first_id + len(chunk))
+    row_keys = _hash_rows(chunk[KEY_COLUMNS])
+    row_hashes = _hash_rows(chunk)
+    return zip(staging_ids, row_keys, row_hashes)
+
+
+# --- fingerprint and change tracking tables ---
+def create_tracking_tables(conn):
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS workforce_fingerprints (
+        row_key INTEGER,
+        ordinal INTEGER,
+        record_id INTEGER,
+        row_hash INTEGER,
+        PRIMARY KEY (row_key, ordinal)
+    );
+
+    CREATE TABLE IF NOT EXISTS workforce_changes (
+        record_id INTEGER PRIMARY KEY,
+        change_type TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS workforce_load_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        load_mode TEXT,
+        loaded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        checked INTEGER DEFAULT 0
+    );
+    """)
+
+
+def _set_load_state(conn, load_mode):
+    conn.execute("""
+    INSERT INTO workforce_load_state (id, load_mode, loaded_at, checked)
+    VALUES (1, ?, CURRENT_TIMESTAMP, 0)
+    ON CONFLICT (id) DO UPDATE SET
+        -- a full reload that has not been checked yet still needs a full run
+        load_mode = CASE
+            WHEN workforce_load_state.load_mode = 'full'
+             AND workforce_load_state.checked = 0 THEN 'full'
+            ELSE excluded.load_mode
+        END,
+        loaded_at = excluded.loaded_at,
+        checked = 0
+    """, (load_mode,))
+
+
+def _has_baseline(conn):
+    tables = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    if not {"workforce", "workforce_fingerprints"} <= tables:
+        return False
+    return conn.execute("SELECT 1 FROM workforce_fingerprints LIMIT 1").fetchone() is not None
+
+
+# --- streaming load ---
+def load_workforce(conn, csv_path=CSV_PATH, chunk_size=CHUNK_SIZE,
+                   commit_every=COMMIT_EVERY, encoding="utf-8"):
+    # Load into a staging table and swap at the end so readers never
+    # see a half-loaded workforce table
+    create_table(conn, "workforce_staging")
+    conn.execute("DROP TABLE IF EXISTS workforce_staging_fp")
+    conn.execute("CREATE TABLE workforce_staging_fp (staging_id INTEGER PRIMARY KEY, row_key INTEGER, row_hash INTEGER)")
+    ensure_dictionary_table(conn)
+    conn.commit()
+
+    placeholders = ", ".join("?" for _ in WORKFORCE_COLUMNS)
+    insert_sql = f"INSERT INTO workforce_staging VALUES ({placeholders})"
+    fingerprint_sql = "INSERT INTO workforce_staging_fp VALUES (?, ?, ?)"
+
+    total_rows = 0
+    rows_in_transaction = 0
+    unparsed = {column: 0 for column in NUMERIC_COLUMNS}
+    dictionaries = {}
+
+    for chunk in read_chunks(csv_path, chunk_size, encoding):
+        raw_numeric = chunk[NUMERIC_COLUMNS].notna()
+        chunk = type_chunk(chunk)
+        for column in NUMERIC_COLUMNS:
+            unparsed[column] += int((raw_numeric[column] & chunk[column].isna()).sum())
+        # Rows go straight to SQLite as text, so the chunk stays unencoded; new
+        # values only get their dictionary codes for the profiler and dashboards
+        refresh_dictionaries(chunk, conn, WORKFORCE_CATEGORIES, dictionaries)
+
+        # Staging rowids are assigned sequentially from 1 on a fresh table
+        conn.executemany(insert_sql, chunk_rows(chunk))
+        conn.executemany(fingerprint_sql, fingerprint_rows(chunk, total_rows + 1))
+        total_rows += len(chunk)
+        rows_in_transaction += len(chunk)
+
+        if rows_in_transaction >= commit_every:
+            conn.commit()
+            rows_in_transaction = 0
+
+    conn.commit()
+
+    return total_rows, unparsed
+
+
+def _stage_incoming_keys(conn):
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_incoming")
+    conn.execute("""
+    CREATE TEMP TABLE workforce_incoming AS
+    SELECT
+        staging_id,
+        row_key,
+        ROW_NUMBER() OVER (PARTITION BY row_key ORDER BY staging_id) AS ordinal,
+        row_hash
+    FROM workforce_staging_fp
+    """)
+    conn.execute("CREATE INDEX temp.idx_workforce_incoming ON workforce_incoming (row_key, ordinal)")
+
+
+def _drop_staging(conn):
+    conn.execute("DROP TABLE IF EXISTS workforce_staging")
+    conn.execute("DROP TABLE IF EXISTS workforce_staging_fp")
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_incoming")
+
+
+def _last_record_id(conn):
+    # New rowids continue after anything ever handed out, so a deleted
+    # record_id is never reused by a different post
+    return conn.execute("""
+    SELECT MAX(
+        COALESCE((SELECT MAX(rowid) FROM workforce), 0),
+        COALESCE((SELECT MAX(record_id) FROM workforce_fingerprints), 0)
+    )
+    """).fetchone()[0]
+
+
+def _insert_posts(conn):
+    # Rows listed in temp.workforce_inserted become new posts
+    column_list = ", ".join(_quote(c) for c in WORKFORCE_COLUMNS)
+    conn.execute(f"""
+    INSERT INTO workforce (rowid, {column_list})
+    SELECT n.record_id, {", ".join("s." + _quote(c) for c in WORKFORCE_COLUMNS)}
+    FROM workforce_inserted n
+    JOIN workforce_staging s ON s.rowid = n.staging_id
+    ORDER BY n.record_id
+    """)
+    conn.execute("""
+    INSERT INTO workforce_fingerprints (row_key, ordinal, record_id, row_hash)
+    SELECT row_key, ordinal, record_id, row_hash FROM workforce_inserted
+    """)
+    conn.execute("""
+    INSERT OR REPLACE INTO workforce_changes (record_id, change_type)
+    SELECT record_id, 'inserted' FROM workforce_inserted
+    """)
+
+
+def apply_full_load(conn):
+    _stage_incoming_keys(conn)
+
+    conn.execute("DELETE FROM workforce_fingerprints")
+    conn.execute("""
+    INSERT INTO workforce_fingerprints (row_key, ordinal, record_id, row_hash)
+    SELECT row_key, ordinal, staging_id, row_hash
+    FROM workforce_incoming
+    """)
+    conn.execute("DELETE FROM workforce_changes")
+
+    # Renaming keeps rowids, so record_id == staging_id
+    conn.execute("DROP TABLE IF EXISTS workforce")
+    conn.execute("ALTER TABLE workforce_staging RENAME TO workforce")
+    _drop_staging(conn)
+    _set_load_state(conn, "full")
+    conn.commit()
+
+    return {"inserted": conn.execute("SELECT COUNT(*) FROM workforce").fetchone()[0]}
+
+
+def apply_incremental_load(conn):
+    _stage_incoming_keys(conn)
+    next_id = _last_record_id(conn)
+
+    # --- deleted posts ---
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_deleted")
+    conn.execute("""
+    CREATE TEMP TABLE workforce_deleted AS
+    SELECT f.row_key, f.ordinal, f.record_id
+    FROM workforce_fingerprints f
+    WHERE NOT EXISTS (
+        SELECT 1 FROM workforce_incoming i
+        WHERE i.row_key = f.row_key AND i.ordinal = f.ordinal
+    )
+    """)
+    conn.execute("DELETE FROM workforce WHERE rowid IN (SELECT record_id FROM workforce_deleted)")
+    conn.execute("""
+    DELETE FROM workforce_fingerprints
+    WHERE (row_key, ordinal) IN (SELECT row_key, ordinal FROM workforce_deleted)
+    """)
+    conn.execute("""
+    INSERT OR REPLACE INTO workforce_changes (record_id, change_type)
+    SELECT record_id, 'deleted' FROM workforce_deleted
+    """)
+
+    # --- changed posts (updated in place, keeping their record_id) ---
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_changed")
+    conn.execute("""
+    CREATE TEMP TABLE workforce_changed AS
+    SELECT f.record_id, i.staging_id, i.row_hash, i.row_key, i.ordinal
+    FROM workforce_incoming i
+    JOIN workforce_fingerprints f USING (row_key, ordinal)
+    WHERE f.row_hash != i.row_hash
+    """)
+    assignments = ", ".join(f"{_quote(c)} = s.{_quote(c)}" for c in WORKFORCE_COLUMNS)
+    conn.execute(f"""
+    UPDATE workforce SET {assignments}
+    FROM workforce_changed c
+    JOIN workforce_staging s ON s.rowid = c.staging_id
+    WHERE workforce.rowid = c.record_id
+    """)
+    conn.execute("""
+    UPDATE workforce_fingerprints SET row_hash = c.row_hash
+    FROM workforce_changed c
+    WHERE workforce_fingerprints.row_key = c.row_key
+      AND workforce_fingerprints.ordinal = c.ordinal
+    """)
+    conn.execute("""
+    INSERT OR REPLACE INTO workforce_changes (record_id, change_type)
+    SELECT record_id, 'changed' FROM workforce_changed
+    """)
+
+    # --- inserted posts ---
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_inserted")
+    conn.execute("""
+    CREATE TEMP TABLE workforce_inserted AS
+    SELECT
+        ? + ROW_NUMBER() OVER (ORDER BY i.staging_id) AS record_id,
+        i.staging_id, i.row_key, i.ordinal, i.row_hash
+    FROM workforce_incoming i
+    WHERE NOT EXISTS (
+        SELECT 1 FROM workforce_fingerprints f
+        WHERE f.row_key = i.row_key AND f.ordinal = i.ordinal
+    )
+    """, (next_id,))
+    _insert_posts(conn)
+
+    summary = {
+        name: conn.execute(f"SELECT COUNT(*) FROM temp.workforce_{name}").fetchone()[0]
+        for name in ("inserted", "changed", "deleted")
+    }
+
+    for name in ("inserted", "changed", "deleted"):
+        conn.execute(f"DROP TABLE temp.workforce_{name}")
+    _drop_staging(conn)
+    _set_load_state(conn, "incremental")
+    conn.commit()
+
+    return summary
+
+
+def apply_append_load(conn):
+    # Micro-batches (watch_drops.py) only add posts: every staged row is
+    # inserted after the existing ones and nothing is changed or deleted.
+    # Ordinals continue after the posts already held under the same key.
+    _stage_incoming_keys(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.workforce_inserted")
+    conn.execute("""
+    CREATE TEMP TABLE workforce_inserted AS
+    SELECT
+        ? + ROW_NUMBER() OVER (ORDER BY i.staging_id) AS record_id,
+        i.staging_id, i.row_key,
+        i.ordinal + COALESCE((
+            SELECT MAX(f.ordinal) FROM workforce_fingerprints f WHERE f.row_key = i.row_key
+        ), 0) AS ordinal,
+        i.row_hash
+    FROM workforce_incoming i
+    """, (_last_record_id(conn),))
+    _insert_posts(conn)
+
+    summary = {"inserted": conn.execute("SELECT COUNT(*) FROM temp.workforce_inserted").fetchone()[0]}
+
+    conn.execute("DROP TABLE temp.workforce_inserted")
+    _drop_staging(conn)
+    _set_load_state(conn, "append")
+    conn.commit()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream workforce.csv into workforce.db")
+    parser.add_argument("--csv", default=CSV_PATH, type=Path)
+    parser.add_argument("--db", default=DB_PATH, type=Path)
+    parser.add_argument("--chunk-size", default=CHUNK_SIZE, type=int)
+    parser.add_argument("--commit-every", default=COMMIT_EVERY, type=int)
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Apply the extract as inserts/updates/deletes against the existing table",
+    )
+    args = parser.parse_args()
+
+    # Ensure processed directory exists
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = connect(args.db)
+    create_tracking_tables(conn)
+    incremental = args.incremental and _has_baseline(conn)
+
+    total_rows, unparsed = load_workforce(
+        conn,
+        csv_path=args.csv,
+        chunk_size=args.chunk_size,
+        commit_every=args.commit_every,
+        encoding=args.encoding,
+    )
+    summary = apply_incremental_load(conn) if incremental else apply_full_load(conn)
+    conn.close()
+
+    mode = "incremental" if incremental else "full"
+    print(f"Workforce table loaded into SQLite database ({mode}): {total_rows} rows")
+    print("  " + ", ".join(f"{name}: {count}" for name, count in summary.items()))
+    for column, count in unparsed.items():
+        if count:
+            print(f"  {column}: {count} non-numeric values stored as NULL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from check_telemetry import profile_statement
+from db_connections import readonly_connection
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHECKS_SQL = BASE_DIR / "src" / "data_quality_checks.sql"
+
+# Worker count: --workers on the calling script, then DQ_WORKERS, then CPU count
+DEFAULT_WORKERS = int(os.environ.get("DQ_WORKERS", os.cpu_count() or 4))
+
+
+# --- check loading ---
+def load_checks(sql_path=CHECKS_SQL):
+    with open(sql_path) as f:
+        queries = f.read().split(";")
+
+    checks = []
+    for query in queries:
+        query = query.strip()
+        # Skip empty and comment-only fragments
+        if not re.sub(r"--[^\n]*", "", query).strip():
+            continue
+        checks.append(query)
+
+    return checks
+
+
+# --- parallel execution ---
+def run_checks_parallel(db_path, checks, workers=DEFAULT_WORKERS, telemetry=None):
+    # Each worker thread keeps its own read-only connection; SQLite releases
+    # the GIL while a statement runs, so checks execute concurrently.
+    # Pass a list as telemetry to collect one check_telemetry record per check.
+    local = threading.local()
+    pool = []
+    pool_lock = threading.Lock()
+
+    def run_check(query):
+        if not hasattr(local, "conn"):
+            local.conn = readonly_connection(db_path)
+            with pool_lock:
+                pool.append(local.conn)
+
+        if telemetry is None:
+            check_name, failed_rows = local.conn.execute(query).fetchone()
+            return check_name, int(failed_rows), None
+
+        rows, record = profile_statement(local.conn, None, query)
+        check_name, failed_rows = rows[0]
+        record["check_name"] = check_name
+        return check_name, int(failed_rows), record
+
+    workers = max(1, min(workers, len(checks)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, so output follows the SQL file
+            outcomes = list(executor.map(run_check, checks))
+    finally:
+        for conn in pool:
+            conn.close()
+
+    if telemetry is not None:
+        telemetry.extend(record for _, _, record in outcomes)
+    return [(check_name, failed_rows) for check_name, failed_rows, _ in outcomes]
@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from check_telemetry import measure, query_plan
+from db_connections import readonly_connection
+from fused_checks import BITS_PER_MASK, build_fused_query, profile_rules
+
+# Columns a workforce run can be partitioned by (--partition-by value -> column)
+PARTITION_COLUMNS = {
+    "department": "Parent Department",
+    "organisation": "Organisation",
+}
+
+# Partitions evaluated at the same time, one process each
+DEFAULT_PARTITION_WORKERS = int(os.environ.get("DQ_PARTITION_WORKERS", os.cpu_count() or 4))
+
+# Label for rows whose partition column is NULL or empty
+BLANK_PARTITION = ""
+
+# Telemetry name for a partitioned run (all partitions, wall time of the whole run)
+PARTITIONED_SCAN = "partitioned_scan"
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _index_name(column):
+    return "idx_workforce_" + "".join(c if c.isalnum() else "_" for c in column.lower())
+
+
+# --- partitions ---
+def list_partitions(conn, column, table="workforce"):
+    # Largest first, so the longest partitions start before the short ones
+    return conn.execute(f"""
+    SELECT COALESCE({_quote(column)}, '') AS partition_value, COUNT(*) AS row_count
+    FROM {table}
+    GROUP BY 1
+    ORDER BY row_count DESC
+    """).fetchall()
+
+
+def partition_filter(column, value):
+    # (where clause, params); written so the partition column index is usable
+    if value == BLANK_PARTITION:
+        return f"({_quote(column)} IS NULL OR {_quote(column)} = '')", []
+    return f"{_quote(column)} = ?", [value]
+
+
+def evaluate_partition(db_path, rules, column, value, table="workforce"):
+    # Runs in a worker process: one fused scan of the partition on a
+    # read-only connection, decoded into failing record ids per rule
+    row_filter, params = partition_filter(column, value)
+    conn = readonly_connection(db_path)
+    try:
+        rows = conn.execute(build_fused_query(rules, table=table, row_filter=row_filter), params).fetchall()
+    finally:
+        conn.close()
+
+    masks = np.array(rows, dtype=np.int64).reshape(-1, 1 + (len(rules) + BITS_PER_MASK - 1) // BITS_PER_MASK)
+    failures = []
+    for position in range(len(rules)):
+        bit = np.int64(1 << (position % BITS_PER_MASK))
+        failures.append(masks[(masks[:, 1 + position // BITS_PER_MASK] & bit) != 0, 0])
+    return value, failures
+
+
+# --- run ---
+def run_partitioned_checks(conn, db_path, rules, column, workers=DEFAULT_PARTITION_WORKERS, table="workforce"):
+    # Rebuilds dq_failures from the partitions (same rows and order as a
+    # whole-table run) and returns (failure_counts, {partition: {check: failed_rows}})
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {_index_name(column)} ON {table} ({_quote(column)})")
+    conn.commit()
+
+    partitions = [value for value, _ in list_partitions(conn, column, table)]
+    failures = {value: None for value in partitions}
+    if workers > 1 and len(partitions) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(partitions)), mp_context=context) as executor:
+            futures = [
+                executor.submit(evaluate_partition, str(db_path), rules, column, value, table)
+                for value in partitions
+            ]
+            for future in as_completed(futures):
+                value, partition_failures = future.result()
+                failures[value] = partition_failures
+    else:
+        for value in partitions:
+            failures[value] = evaluate_partition(db_path, rules, column, value, table)[1]
+
+    conn.execute("DROP TABLE IF EXISTS dq_failures")
+    conn.execute("""
+    CREATE TABLE dq_failures (
+        check_name TEXT,
+        record_id INTEGER
+    )
+    """)
+    # One batched insert for every rule, in rule order then rowid
+    conn.executemany(
+        "INSERT INTO dq_failures (check_name, record_id) VALUES (?, ?)",
+        (
+            (check_name, int(record_id))
+            for position, (check_name, _) in enumerate(rules)
+            for record_id in np.sort(np.concatenate([failures[value][position] for value in partitions] or [[]]))
+        ),
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dq_failures_check ON dq_failures (check_name, record_id)")
+    conn.commit()
+
+    partition_counts = {
+        value: {check_name: len(failures[value][position]) for position, (check_name, _) in enumerate(rules)}
+        for value in partitions
+    }
+    failure_counts = {
+        check_name: sum(counts[check_name] for counts in partition_counts.values())
+        for check_name, _ in rules
+    }
+    return failure_counts, partition_counts
+
+
+def run_partitioned_profiled(conn, db_path, rules, column, workers=DEFAULT_PARTITION_WORKERS,
+                             per_rule=False, table="workforce"):
+    # Partitioned counterpart of fused_checks.run_checks_profiled, returning
+    # (failure_counts, partition_counts, telemetry records). VM steps only
+    # cover the calling connection; the workers' scans show up in wall time.
+    row_filter, params = partition_filter(column, "?")
+    plan, used_index = query_plan(conn, build_fused_query(rules, table=table, row_filter=row_filter), params)
+
+    with measure(conn) as stats:
+        failure_counts, partition_counts = run_partitioned_checks(conn, db_path, rules, column, workers, table)
+
+    records = [{"check_name": PARTITIONED_SCAN, **stats, "used_index": used_index, "query_plan": plan}]
+    if per_rule:
+        records += profile_rules(conn, rules, table=table)
+
+    return failure_counts, partition_counts, records
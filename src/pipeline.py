@@ -0,0 +1,544 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from check_telemetry import DEFAULT_EXPORT
+from db_connections import connect, readonly_connection
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / "src"
+SQL_DIR = BASE_DIR / "sql"
+RAW_DIR = BASE_DIR / "data" / "raw"
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+OUTPUTS_DIR = BASE_DIR / "outputs"
+
+CUSTOMERS_CSV = RAW_DIR / "customers_raw.csv"
+CUSTOMERS_DB = PROCESSED_DIR / "customers.db"
+WORKFORCE_CSV = RAW_DIR / "workforce.csv"
+WORKFORCE_DB = PROCESSED_DIR / "workforce.db"
+
+# Stage fingerprints from the last successful run of each stage
+STATE_PATH = PROCESSED_DIR / "pipeline_state.json"
+
+
+# --- shared state ---
+class PipelineContext:
+    # One connection per database for the whole run, plus whatever frames
+    # and results stages hand to each other. A stage holds the lock of the
+    # database it declares, so concurrent branches never share a connection.
+    def __init__(self, options):
+        self.options = options
+        self.frames = {}
+        self.results = {}
+        self._connections = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def lock(self, db_path):
+        with self._guard:
+            return self._locks.setdefault(str(db_path), threading.Lock())
+
+    def connection(self, db_path):
+        with self._guard:
+            if str(db_path) not in self._connections:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._connections[str(db_path)] = connect(db_path, check_same_thread=False)
+            return self._connections[str(db_path)]
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+
+# --- customer stages ---
+def generate_customers_stage(ctx):
+    from generate_data import generate_customers, write_csv
+
+    rows = write_csv(generate_customers(), CUSTOMERS_CSV)
+    print(f"Synthetic customers dataset created: {CUSTOMERS_CSV} ({rows} rows)")
+
+
+def load_customers_stage(ctx):
+    from customer_store import full_load
+
+    df = full_load(ctx.connection(CUSTOMERS_DB), CUSTOMERS_CSV)
+    ctx.frames["customers"] = df
+    print(f"Customers table loaded into SQLite database ({len(df)} rows)")
+
+
+def customer_checks_stage(ctx):
+    from check_telemetry import export_spans, next_run_id, record_telemetry
+    from parallel_checks import DEFAULT_WORKERS, load_checks, run_checks_parallel
+
+    conn = ctx.connection(CUSTOMERS_DB)
+    with open(SRC_DIR / "create_audit_table.sql") as f:
+        conn.executescript(f.read())
+
+    telemetry = []
+    results = run_checks_parallel(
+        CUSTOMERS_DB, load_checks(), workers=ctx.options.get("workers") or DEFAULT_WORKERS, telemetry=telemetry
+    )
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO dq_audit_log (check_name, failed_rows, check_timestamp) VALUES (?, ?, ?)",
+        [(check_name, failed_rows, timestamp) for check_name, failed_rows in results],
+    )
+    conn.commit()
+
+    run_id = next_run_id(conn)
+    record_telemetry(conn, run_id, timestamp, telemetry)
+    if ctx.options.get("telemetry_export"):
+        export_spans(ctx.options["telemetry_export"], "customers", run_id, telemetry)
+
+    # The historical stage logs these results instead of running the checks again
+    ctx.results["customer_checks"] = results
+    print("Data quality checks executed and logged.")
+
+
+def customer_duplicates_stage(ctx):
+    from duplicate_detection import detect_duplicates, sqlite_chunks
+
+    run_id, rows, exact_clusters, near_clusters = detect_duplicates(
+        sqlite_chunks(CUSTOMERS_DB), ctx.connection(CUSTOMERS_DB)
+    )
+    print(f"Duplicate run {run_id}: {exact_clusters} exact duplicate emails, {near_clusters} near-duplicate clusters")
+
+
+def customer_historical_stage(ctx):
+    from historical_store import (
+        append_run,
+        ensure_historical_store,
+        export_new_runs,
+        export_new_runs_parquet,
+        refresh_rollups,
+    )
+
+    conn = ctx.connection(CUSTOMERS_DB)
+    ensure_historical_store(conn)
+
+    results = ctx.results.get("customer_checks")
+    if results is None:
+        from parallel_checks import load_checks, run_checks_parallel
+
+        # Checks were skipped this run; evaluate them without logging to dq_audit_log again
+        results = run_checks_parallel(CUSTOMERS_DB, load_checks())
+    if "customers" in ctx.frames:
+        total_rows = len(ctx.frames["customers"])
+    else:
+        total_rows = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    timestamp = append_run(conn, results, total_rows)
+    refresh_rollups(conn)
+    exported = export_new_runs(conn)
+    export_new_runs_parquet(conn)
+    print(f"Historical DQ run logged at {timestamp} ({exported} new rows exported)")
+
+
+def portfolio_outputs_stage(ctx):
+    import matplotlib
+    from generate_portfolio_outputs import main as generate_portfolio_outputs
+
+    # Runs on a worker thread: absolute paths only, no chdir
+    matplotlib.use("Agg")
+    generate_portfolio_outputs()
+
+
+# --- workforce stages ---
+def load_workforce_stage(ctx):
+    from load_workforce_to_db import (
+        _has_baseline,
+        apply_full_load,
+        apply_incremental_load,
+        create_tracking_tables,
+        load_workforce,
+    )
+
+    conn = ctx.connection(WORKFORCE_DB)
+    create_tracking_tables(conn)
+    incremental = ctx.options.get("incremental") and _has_baseline(conn)
+
+    total_rows, _ = load_workforce(conn, WORKFORCE_CSV)
+    summary = apply_incremental_load(conn) if incremental else apply_full_load(conn)
+    mode = "incremental" if incremental else "full"
+    print(f"Workforce table loaded into SQLite database ({mode}): {total_rows} rows, "
+          + ", ".join(f"{name}: {count}" for name, count in summary.items()))
+
+
+def profile_workforce_stage(ctx):
+    from column_profiler import profile_chunks, save_profile, sqlite_chunks
+
+    conn = ctx.connection(WORKFORCE_DB)
+    results = profile_chunks(sqlite_chunks(conn, "workforce"), conn)
+    profile_id = save_profile(conn, str(WORKFORCE_DB), "workforce", results)
+    print(f"Workforce profile snapshot {profile_id} saved ({len(results)} columns)")
+
+
+def workforce_checks_stage(ctx):
+    from check_telemetry import export_spans, record_telemetry
+    from dq_runs import ensure_audit_tables, log_partition_results, log_run_results, run_summary, start_run
+    from fused_checks import load_rules, mark_checked, run_checks_profiled
+    from partitioned_checks import DEFAULT_PARTITION_WORKERS, PARTITION_COLUMNS, run_partitioned_profiled
+
+    conn = ctx.connection(WORKFORCE_DB)
+    ensure_audit_tables(conn)
+
+    rules = load_rules(SQL_DIR / "dq_workforce_checks.sql")
+    partition_by = ctx.options.get("partition_by")
+    if partition_by:
+        partition_key = PARTITION_COLUMNS[partition_by]
+        failure_counts, partition_counts, telemetry = run_partitioned_profiled(
+            conn, WORKFORCE_DB, rules, partition_key, ctx.options.get("partition_workers") or DEFAULT_PARTITION_WORKERS,
+            per_rule=ctx.options.get("profile_rules"),
+        )
+        run_mode = "partitioned"
+    else:
+        failure_counts, run_mode, telemetry = run_checks_profiled(
+            conn, rules, incremental=ctx.options.get("incremental"), per_rule=ctx.options.get("profile_rules")
+        )
+
+    run_id, timestamp = start_run(conn, run_mode)
+    log_run_results(conn, run_id, timestamp, [check_name for check_name, _ in rules])
+    # After logging: the failure cube applies this run's workforce_changes as a delta
+    mark_checked(conn)
+    if partition_by:
+        log_partition_results(conn, run_id, partition_key, partition_counts)
+    record_telemetry(conn, run_id, timestamp, telemetry)
+    if ctx.options.get("telemetry_export"):
+        export_spans(ctx.options["telemetry_export"], "workforce", run_id, telemetry)
+    ctx.results["workforce_run_id"] = run_id
+    print(run_summary(conn, run_id, run_mode, len(rules), failure_counts))
+
+
+def sla_evaluation_stage(ctx):
+    from dq_runs import (
+        PARTITION_SLA_EXPORT_QUERY,
+        SLA_EXPORT_QUERY,
+        ensure_sla_rules,
+        evaluate_partition_sla,
+        evaluate_sla,
+        latest_run_id,
+    )
+
+    conn = ctx.connection(WORKFORCE_DB)
+    ensure_sla_rules(conn)
+
+    # Checks may have been skipped (unchanged inputs) while the SLA rules changed
+    run_id = ctx.results.get("workforce_run_id") or latest_run_id(conn)
+    evaluate_sla(conn, run_id)
+
+    sla_df = pd.read_sql_query(SLA_EXPORT_QUERY, conn, params=[run_id])
+    sla_df.to_csv(PROCESSED_DIR / "dq_sla_evaluation.csv", index=False)
+    print(f"SLA evaluation exported (run {run_id})")
+
+    # Only partitioned runs have partition results to evaluate
+    evaluate_partition_sla(conn, run_id)
+    partition_sla_df = pd.read_sql_query(PARTITION_SLA_EXPORT_QUERY, conn, params=[run_id])
+    if not partition_sla_df.empty:
+        partition_sla_df.to_csv(PROCESSED_DIR / "dq_partition_sla_evaluation.csv", index=False)
+        print(f"Partition SLA evaluation exported ({partition_sla_df['partition_value'].nunique()} partitions)")
+
+
+def sla_rule_params(options):
+    # The rules live in the database once seeded, so edited limits and
+    # partition overrides are part of the stage fingerprint
+    if not WORKFORCE_DB.exists():
+        return {}
+    conn = readonly_connection(WORKFORCE_DB)
+    try:
+        return {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall()
+            for table in ("dq_sla_rules", "dq_partition_sla_rules")
+        }
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def latest_findings_stage(ctx):
+    from dq_runs import LATEST_FINDINGS_QUERY
+
+    latest = pd.read_sql_query(LATEST_FINDINGS_QUERY, ctx.connection(WORKFORCE_DB))
+    latest.to_csv(PROCESSED_DIR / "dq_latest_findings.csv", index=False)
+    print(f"Latest findings exported ({len(latest)} checks)")
+
+
+# --- graph ---
+# inputs: files whose contents decide whether a stage must run again
+# outputs: files that must exist for the stage to be skipped
+# db: database the stage writes, held exclusively while it runs
+STAGES = {
+    "generate_customers": {
+        "run": generate_customers_stage,
+        "deps": [],
+        "inputs": [SRC_DIR / "generate_data.py"],
+        # Dates are generated relative to today
+        "params": lambda options: {"as_of": date.today().isoformat()},
+        "outputs": [CUSTOMERS_CSV],
+    },
+    "load_customers": {
+        "run": load_customers_stage,
+        "deps": ["generate_customers"],
+        "inputs": [CUSTOMERS_CSV, SRC_DIR / "create_customer_indexes.sql", SRC_DIR / "customer_store.py"],
+        "outputs": [CUSTOMERS_DB],
+        "db": CUSTOMERS_DB,
+    },
+    "customer_checks": {
+        "run": customer_checks_stage,
+        "deps": ["load_customers"],
+        "inputs": [SRC_DIR / "data_quality_checks.sql", SRC_DIR / "create_audit_table.sql", SQL_DIR / "dq_telemetry.sql"],
+        "db": CUSTOMERS_DB,
+    },
+    "customer_duplicates": {
+        "run": customer_duplicates_stage,
+        "deps": ["load_customers"],
+        "inputs": [SRC_DIR / "create_duplicate_tables.sql"],
+        "db": CUSTOMERS_DB,
+    },
+    "customer_historical": {
+        "run": customer_historical_stage,
+        "deps": ["customer_checks"],
+        "inputs": [SRC_DIR / "create_historical_audit_table.sql"],
+        "outputs": [PROCESSED_DIR / "dq_audit_log_historical.csv"],
+        "db": CUSTOMERS_DB,
+    },
+    "portfolio_outputs": {
+        "run": portfolio_outputs_stage,
+        "deps": ["customer_checks", "customer_historical"],
+        "inputs": [SRC_DIR / "generate_portfolio_outputs.py"],
+        "outputs": [OUTPUTS_DIR / "dashboard_portfolio.html"],
+        "db": CUSTOMERS_DB,
+    },
+    "load_workforce": {
+        "run": load_workforce_stage,
+        "deps": [],
+        "inputs": [WORKFORCE_CSV],
+        "params": lambda options: {"incremental": bool(options.get("incremental"))},
+        "outputs": [WORKFORCE_DB],
+        "db": WORKFORCE_DB,
+    },
+    "profile_workforce": {
+        "run": profile_workforce_stage,
+        "deps": ["load_workforce"],
+        "inputs": [SQL_DIR / "dq_profiles.sql"],
+        "db": WORKFORCE_DB,
+    },
+    "workforce_checks": {
+        "run": workforce_checks_stage,
+        "deps": ["load_workforce"],
+        "inputs": [
+            SQL_DIR / "dq_workforce_checks.sql", SQL_DIR / "dq_audit_tables.sql", SQL_DIR / "dq_telemetry.sql",
+            SQL_DIR / "dq_failure_cube.sql",
+        ],
+        "params": lambda options: {"partition_by": options.get("partition_by")},
+        "db": WORKFORCE_DB,
+    },
+    "sla_evaluation": {
+        "run": sla_evaluation_stage,
+        "deps": ["workforce_checks"],
+        "inputs": [SQL_DIR / "dq_sla_rules.sql"],
+        "params": sla_rule_params,
+        "outputs": [PROCESSED_DIR / "dq_sla_evaluation.csv"],
+        "db": WORKFORCE_DB,
+    },
+    "latest_findings": {
+        "run": latest_findings_stage,
+        "deps": ["sla_evaluation"],
+        "inputs": [],
+        "outputs": [PROCESSED_DIR / "dq_latest_findings.csv"],
+        "db": WORKFORCE_DB,
+    },
+}
+
+
+def topological_order(stages=STAGES):
+    order, seen = [], set()
+
+    def visit(name, path=()):
+        if name in path:
+            raise ValueError(f"pipeline cycle: {' -> '.join(path + (name,))}")
+        if name in seen:
+            return
+        for dep in stages[name]["deps"]:
+            visit(dep, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+# --- change detection ---
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_fingerprint(name, stage, dep_fingerprints, options):
+    # Covers the stage's own inputs and, through its dependencies, everything
+    # upstream: a changed CSV re-runs every stage that depends on it
+    digest = hashlib.sha256(name.encode())
+    for path in stage["inputs"]:
+        digest.update(str(Path(path).relative_to(BASE_DIR)).encode())
+        digest.update(file_hash(path).encode() if Path(path).exists() else b"missing")
+    if "params" in stage:
+        digest.update(json.dumps(stage["params"](options), sort_keys=True).encode())
+    for dep in stage["deps"]:
+        digest.update(dep_fingerprints[dep].encode())
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_PATH):
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# --- runner ---
+def run_pipeline(stages=STAGES, targets=None, force=False, workers=4, options=None, state_path=STATE_PATH):
+    options = options or {}
+    order = topological_order(stages)
+
+    # Restrict to the requested stages and everything they depend on
+    if targets:
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(stages[name]["deps"])
+        order = [name for name in order if name in needed]
+
+    state = load_state(state_path)
+    ctx = PipelineContext(options)
+    status = {}
+    fingerprints = {}
+    state_lock = threading.Lock()
+
+    def execute(name):
+        stage = stages[name]
+        fingerprint = stage_fingerprint(name, stage, fingerprints, options)
+        fingerprints[name] = fingerprint
+
+        ran_upstream = any(status[dep] == "ok" for dep in stage["deps"])
+        outputs_present = all(Path(p).exists() for p in stage.get("outputs", []))
+        if not force and not ran_upstream and outputs_present and state.get(name) == fingerprint:
+            return "skipped", 0.0
+
+        start = time.perf_counter()
+        db = stage.get("db")
+        if db:
+            with ctx.lock(db):
+                stage["run"](ctx)
+        else:
+            stage["run"](ctx)
+
+        with state_lock:
+            state[name] = fingerprint
+            save_state(state, state_path)
+        return "ok", time.perf_counter() - start
+
+    timings = {}
+    remaining = list(order)
+    running = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while remaining or running:
+                for name in list(remaining):
+                    deps = [status.get(dep) for dep in stages[name]["deps"]]
+                    if any(s in ("failed", "blocked") for s in deps):
+                        status[name] = "blocked"
+                        remaining.remove(name)
+                    elif all(s in ("ok", "skipped") for s in deps):
+                        running[executor.submit(execute, name)] = name
+                        remaining.remove(name)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status[name], timings[name] = future.result()
+                    except Exception as exc:
+                        status[name] = "failed"
+                        print(f"Stage {name} failed: {exc!r}", file=sys.stderr)
+    finally:
+        ctx.close()
+
+    return [(name, status[name], timings.get(name, 0.0)) for name in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data quality pipeline in one process")
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help="Run only these stages and their dependencies (default: all)")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=4, help="Stages that may run at the same time")
+    parser.add_argument("--check-workers", type=int, help="Concurrent connections for the customer checks")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Load and check only changed workforce rows (see load_workforce_to_db.py)")
+    parser.add_argument("--profile-rules", action="store_true",
+                        help="Time every workforce rule on its own for per-check telemetry")
+    parser.add_argument("--telemetry-export", default=DEFAULT_EXPORT,
+                        help="Append per-check trace spans to this JSONL file")
+    parser.add_argument("--partition-by", choices=["department", "organisation"],
+                        help="Check each workforce department (or organisation) in its own process")
+    parser.add_argument("--partition-workers", type=int, help="Partitions checked at the same time")
+    args = parser.parse_args()
+    if args.partition_by and args.incremental:
+        parser.error("--partition-by runs every partition in full; it cannot be combined with --incremental")
+
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))} (choose from {', '.join(STAGES)})")
+
+    summary = run_pipeline(
+        targets=args.stages,
+        force=args.force,
+        workers=args.workers,
+        options={
+            "workers": args.check_workers,
+            "incremental": args.incremental,
+            "profile_rules": args.profile_rules,
+            "telemetry_export": args.telemetry_export,
+            "partition_by": args.partition_by,
+            "partition_workers": args.partition_workers,
+        },
+    )
+
+    print("\nPipeline summary:")
+    for name, result, seconds in summary:
+        print(f"  {name:<20} {result:<8} {seconds:6.2f}s")
+
+    if any(result in ("failed", "blocked") for _, result, _ in summary):
+        sys.exit(1)
+    print("All phases executed successfully.")
+
+
+if __name__ == "__main__":
+    main()
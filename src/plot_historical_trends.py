@@ -1,17 +1,23 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("data/processed/dq_audit_log_historical.csv", parse_dates=["check_timestamp"])
+from db_connections import connect
+from historical_store import read_rollups
 
-# Plot pct_failed over time for each rule
-for check in df["check_name"].unique():
-    df_check = df[df["check_name"] == check]
-    plt.plot(df_check["check_timestamp"], df_check["pct_failed"], label=check)
+DB_PATH = "data/processed/customers.db"
+
+# Daily rollups are maintained by run_data_quality_historical.py
+conn = connect(DB_PATH)
+df = read_rollups(conn, "dq_rollup_daily")
+conn.close()
+
+# Plot mean pct_failed per day for each rule
+for check, df_check in df.groupby("check_name"):
+    plt.plot(df_check["period_start"], df_check["mean_pct_failed"], label=check)
 
 plt.axhline(0.05, color='red', linestyle='--', label='SLA Threshold (5%)')
 plt.legend()
 plt.xticks(rotation=45)
-plt.ylabel("Pct Failed")
+plt.ylabel("Pct Failed (daily mean)")
 plt.title("Data Quality Trend Over Time")
 plt.tight_layout()
 plt.show()
@@ -1,15 +1,30 @@
 import pandas as pd
+from pathlib import Path
 
-df = pd.read_csv("data/raw/uk_gov_workforce_raw.csv", encoding="latin1")
+from column_profiler import profile_chunks
+from columnar_store import iter_chunks
+from db_connections import connect
 
-print("Shape:", df.shape)
+# Resolve project root safely; the same extract load_workforce_to_db.py loads
+BASE_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = BASE_DIR / "data" / "raw" / "workforce.csv"
+DB_PATH = BASE_DIR / "data" / "processed" / "workforce.db"
+
+# One streaming pass (Parquet copy when one exists); memory stays bounded
+# by the column sketches instead of the extract size. Department, grade and
+# the other categorical columns are counted on workforce.db's dictionary codes.
+conn = connect(DB_PATH)
+profile = pd.DataFrame(profile_chunks(iter_chunks(CSV_PATH, encoding="utf-8"), conn))
+conn.close()
+
+print("Shape:", (int(profile["row_count"].iloc[0]) if len(profile) else 0, len(profile)))
 
 print("\nColumns:")
-for c in df.columns:
+for c in profile["column_name"]:
     print(c)
 
 print("\nNull percentages:")
-print((df.isnull().mean() * 100).round(2))
+print((profile.set_index("column_name")["null_count"] / profile["row_count"].iloc[0] * 100).round(2))
 
 print("\nSample rows:")
-print(df.head(10))
+print(next(iter_chunks(CSV_PATH, chunk_size=10, encoding="utf-8")))
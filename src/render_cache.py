@@ -0,0 +1,100 @@
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+# Renders run in worker processes; matplotlib must not need a display there
+RENDER_BACKEND = "Agg"
+
+# Charts rendered at the same time (one process each); 1 renders in-process
+DEFAULT_WORKERS = int(os.environ.get("DQ_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+MANIFEST_NAME = ".render_cache.json"
+
+
+# --- hashing ---
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, value.columns)), list(map(str, value.dtypes))]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(str(value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def chart_hash(render, data):
+    # Covers the input data and the renderer's source, so editing a chart
+    # function re-renders it even when the data did not change
+    digest = hashlib.sha256(inspect.getsource(render).encode())
+    for name in sorted(data):
+        digest.update(name.encode())
+        _update(digest, data[name])
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- rendering ---
+def _render(render, output, data):
+    import matplotlib
+
+    matplotlib.use(RENDER_BACKEND)
+    render(output, **data)
+    return output
+
+
+def render_charts(jobs, workers=DEFAULT_WORKERS):
+    # jobs: [(output_path, render_function, data_kwargs)]. Charts whose hash
+    # matches the manifest next to the output and whose file still exists are
+    # skipped; the rest render in a process pool. Returns (rendered, skipped).
+    manifests = {}
+    pending = []
+    skipped = []
+    for output, render, data in jobs:
+        output = Path(output)
+        manifest_path = output.parent / MANIFEST_NAME
+        manifest = manifests.setdefault(manifest_path, _load_manifest(manifest_path))
+        key = chart_hash(render, data)
+        if output.exists() and manifest.get(output.name) == key:
+            skipped.append(str(output))
+        else:
+            pending.append((output, render, data, key))
+
+    if workers > 1 and len(pending) > 1:
+        # spawn: safe even when the caller has other threads running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as executor:
+            list(executor.map(_render, *zip(*[(str(o), r, d) for o, r, d, _ in pending])))
+    else:
+        for output, render, data, _ in pending:
+            _render(render, str(output), data)
+
+    for output, _, _, key in pending:
+        manifests[output.parent / MANIFEST_NAME][output.name] = key
+    for manifest_path, manifest in manifests.items():
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return [str(o) for o, _, _, _ in pending], skipped
+
+
+def write_if_changed(path, text):
+    # Leaves the file (and its mtime) alone when the content is identical
+    path = Path(path)
+    if path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    return True
@@ -1,38 +1,49 @@
-import sqlite3
-import pandas as pd
+import argparse
+from datetime import datetime, timezone
+
+from check_telemetry import DEFAULT_EXPORT, export_spans, next_run_id, record_telemetry
+from db_connections import connect
+from parallel_checks import DEFAULT_WORKERS, load_checks, run_checks_parallel
 
 DB_PATH = "data/processed/customers.db"
 
-conn = sqlite3.connect(DB_PATH)
+parser = argparse.ArgumentParser(description="Run customer data quality checks")
+parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent read-only connections")
+parser.add_argument("--telemetry-export", default=DEFAULT_EXPORT, help="Append per-check trace spans to this JSONL file")
+args = parser.parse_args()
+
+conn = connect(DB_PATH)
 cursor = conn.cursor()
 
 # Create audit table
 with open("src/create_audit_table.sql") as f:
     cursor.executescript(f.read())
 
-# Run quality checks
-with open("src/data_quality_checks.sql") as f:
-    queries = f.read().split(";")
+# Run quality checks concurrently on read-only connections
+checks = load_checks("src/data_quality_checks.sql")
+telemetry = []
+results = run_checks_parallel(DB_PATH, checks, workers=args.workers, telemetry=telemetry)
 
-for query in queries:
-    query = query.strip()
-    if not query:
-        continue
+# Same format as CURRENT_TIMESTAMP; shared by the audit rows and telemetry of this run
+timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-    df = pd.read_sql_query(query, conn)
+# Write all results in one transaction
+cursor.executemany(
+    """
+    INSERT INTO dq_audit_log (check_name, failed_rows, check_timestamp)
+    VALUES (?, ?, ?)
+    """,
+    [(check_name, failed_rows, timestamp) for check_name, failed_rows in results]
+)
 
-    check_name = df.iloc[0]["check_name"]
-    failed_rows = int(df.iloc[0]["failed_rows"])
+conn.commit()
 
-    cursor.execute(
-        """
-        INSERT INTO dq_audit_log (check_name, failed_rows)
-        VALUES (?, ?)
-        """,
-        (check_name, failed_rows)
-    )
+# Per-check wall time, VM steps, memory delta and index use
+run_id = next_run_id(conn)
+record_telemetry(conn, run_id, timestamp, telemetry)
+if args.telemetry_export:
+    export_spans(args.telemetry_export, "customers", run_id, telemetry)
 
-conn.commit()
 conn.close()
 
 print("Data quality checks executed and logged.")
@@ -1,51 +1,50 @@
-import sqlite3
-import pandas as pd
-from datetime import datetime
+import argparse
+
+from db_connections import connect
+from historical_store import (
+    append_run,
+    ensure_historical_store,
+    export_new_runs,
+    export_new_runs_parquet,
+    refresh_rollups,
+)
+from parallel_checks import DEFAULT_WORKERS, load_checks, run_checks_parallel
 
 # Paths
 DB_PATH = "data/processed/customers.db"
 CHECKS_SQL = "src/data_quality_checks.sql"
+HISTORICAL_CSV = "data/processed/dq_audit_log_historical.csv"
 
 # Total number of customers for pct calculation
 TOTAL_CUSTOMERS = 5000  # Adjust if dataset changes
 
+parser = argparse.ArgumentParser(description="Run customer data quality checks with historical logging")
+parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent read-only connections")
+args = parser.parse_args()
+
 # Connect
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-# Ensure historical table exists
-with open("src/create_historical_audit_table.sql") as f:
-    cursor.executescript(f.read())
-
-# Run each data quality check
-with open(CHECKS_SQL) as f:
-    queries = f.read().split(";")
-
-for query in queries:
-    query = query.strip()
-    if not query:
-        continue
-
-    df = pd.read_sql_query(query, conn)
-    check_name = df.iloc[0]["check_name"]
-    failed_rows = int(df.iloc[0]["failed_rows"])
-    pct_failed = failed_rows / TOTAL_CUSTOMERS
-
-    cursor.execute(
-        """
-        INSERT INTO dq_audit_log_historical (check_name, failed_rows, total_rows, pct_failed)
-        VALUES (?, ?, ?, ?)
-        """,
-        (check_name, failed_rows, TOTAL_CUSTOMERS, pct_failed)
-    )
-
-conn.commit()
-conn.close()
-print(f"Historical DQ run logged at {datetime.now()}")
+conn = connect(DB_PATH)
+
+# Ensure historical store (partitioned table, rollups, export state) exists
+ensure_historical_store(conn)
+
+# Run data quality checks concurrently on read-only connections
+checks = load_checks(CHECKS_SQL)
+results = run_checks_parallel(DB_PATH, checks, workers=args.workers)
+
+# Append this run in one transaction
+timestamp = append_run(conn, results, TOTAL_CUSTOMERS)
+print(f"Historical DQ run logged at {timestamp}")
+
+# Fold the new rows into the daily/weekly rollups
+refresh_rollups(conn)
 
+# Append only the new rows to the CSV export
+exported = export_new_runs(conn, HISTORICAL_CSV)
+print(f"Historical CSV updated ({exported} new rows): {HISTORICAL_CSV}")
 
-conn = sqlite3.connect(DB_PATH)
-df_hist = pd.read_sql_query("SELECT * FROM dq_audit_log_historical ORDER BY check_timestamp", conn)
-df_hist.to_csv("data/processed/dq_audit_log_historical.csv", index=False)
+# Columnar copy for dashboards, when pyarrow is installed
+exported = export_new_runs_parquet(conn)
+if exported is not None:
+    print(f"Historical Parquet dataset updated ({exported} new rows)")
 conn.close()
-print("Historical CSV exported: data/processed/dq_audit_log_historical.csv")
\ No newline at end of file
@@ -1,59 +1,106 @@
-import sqlite3
+import argparse
 import pandas as pd
-from datetime import datetime, timezone
 from pathlib import Path
 
+from check_telemetry import DEFAULT_EXPORT, export_spans, record_telemetry
+from db_connections import connect
+from dq_runs import (
+    PARTITION_SLA_EXPORT_QUERY,
+    SLA_EXPORT_QUERY,
+    ensure_audit_tables,
+    ensure_sla_rules,
+    evaluate_partition_sla,
+    evaluate_sla,
+    log_partition_results,
+    log_run_results,
+    run_summary,
+    start_run,
+)
+from fused_checks import load_rules, mark_checked, run_checks_profiled
+from partitioned_checks import DEFAULT_PARTITION_WORKERS, PARTITION_COLUMNS, run_partitioned_profiled
+
 DB_PATH = Path("data/processed/workforce.db")
 SQL_CHECKS = Path("sql/dq_workforce_checks.sql")
-SQL_SLA = Path("sql/dq_sla_rules.sql")
-
-# --- connect ---
-conn = sqlite3.connect(DB_PATH)
-
-# --- run data quality checks ---
-with open(SQL_CHECKS, "r") as f:
-    conn.executescript(f.read())
-
-timestamp = datetime.now(timezone.utc).isoformat()
-
-dq_df = pd.read_sql_query("""
-SELECT
-    check_name,
-    COUNT(*) AS failed_rows,
-    ? AS check_timestamp
-FROM dq_failures
-GROUP BY check_name
-""", conn, params=[timestamp])
-
-dq_df.to_sql("dq_audit_log", conn, if_exists="append", index=False)
-
-print("DQ checks executed")
-
-# --- load SLA rules ---
-with open(SQL_SLA, "r") as f:
-    conn.executescript(f.read())
-
-print("SLA rules loaded")
-
-# --- evaluate SLA ---
-sla_df = pd.read_sql_query("""
-SELECT 
-    a.check_name,
-    a.failed_rows,
-    s.max_failed_rows,
-    s.severity,
-    CASE 
-        WHEN a.failed_rows > s.max_failed_rows THEN 'FAIL'
-        ELSE 'PASS'
-    END AS sla_status,
-    a.check_timestamp
-FROM dq_audit_log a
-JOIN dq_sla_rules s USING (check_name)
-ORDER BY s.severity DESC
-""", conn)
-
-sla_df.to_csv("data/processed/dq_sla_evaluation.csv", index=False)
-
-print("SLA evaluation exported")
-
-conn.close()
+
+
+# Partition workers are spawned processes, which re-import this module
+def main():
+    parser = argparse.ArgumentParser(description="Run workforce data quality checks")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-check rows changed since the last run (see load_workforce_to_db.py --incremental)",
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="Also time every rule on its own (one extra scan per rule) for per-check telemetry",
+    )
+    parser.add_argument("--telemetry-export", default=DEFAULT_EXPORT, help="Append per-check trace spans to this JSONL file")
+    parser.add_argument(
+        "--partition-by",
+        choices=list(PARTITION_COLUMNS),
+        help="Evaluate each department (or organisation) in its own worker process, with per-partition results and SLAs",
+    )
+    parser.add_argument("--partition-workers", type=int, default=DEFAULT_PARTITION_WORKERS)
+    args = parser.parse_args()
+    if args.partition_by and args.incremental:
+        parser.error("--partition-by runs every partition in full; it cannot be combined with --incremental")
+
+    # --- connect ---
+    conn = connect(DB_PATH)
+    ensure_audit_tables(conn)
+
+    # --- run data quality checks (single fused scan of workforce, or one per partition) ---
+    rules = load_rules(SQL_CHECKS)
+    if args.partition_by:
+        partition_key = PARTITION_COLUMNS[args.partition_by]
+        failure_counts, partition_counts, telemetry = run_partitioned_profiled(
+            conn, DB_PATH, rules, partition_key, args.partition_workers, per_rule=args.profile_rules
+        )
+        run_mode = "partitioned"
+    else:
+        failure_counts, run_mode, telemetry = run_checks_profiled(
+            conn, rules, incremental=args.incremental, per_rule=args.profile_rules
+        )
+
+    run_id, timestamp = start_run(conn, run_mode)
+    log_run_results(conn, run_id, timestamp, [check_name for check_name, _ in rules])
+    # After logging: the failure cube applies this run's workforce_changes as a delta
+    mark_checked(conn)
+    if args.partition_by:
+        log_partition_results(conn, run_id, partition_key, partition_counts)
+
+    # Wall time, VM steps, memory delta and index use, next to the audit rows
+    record_telemetry(conn, run_id, timestamp, telemetry)
+    if args.telemetry_export:
+        export_spans(args.telemetry_export, "workforce", run_id, telemetry)
+
+    print(run_summary(conn, run_id, run_mode, len(rules), failure_counts))
+
+    # --- SLA rules (seeded only into a new database) ---
+    ensure_sla_rules(conn)
+    rule_count = conn.execute("SELECT COUNT(*) FROM dq_sla_rules").fetchone()[0]
+    print(f"SLA rules: {rule_count} limits from dq_sla_rules")
+
+    # --- evaluate SLA for this run only ---
+    evaluate_sla(conn, run_id)
+
+    sla_df = pd.read_sql_query(SLA_EXPORT_QUERY, conn, params=[run_id])
+    sla_df.to_csv("data/processed/dq_sla_evaluation.csv", index=False)
+
+    print("SLA evaluation exported")
+
+    # --- per-partition SLA (partitioned runs) ---
+    if args.partition_by:
+        evaluate_partition_sla(conn, run_id)
+        partition_sla_df = pd.read_sql_query(PARTITION_SLA_EXPORT_QUERY, conn, params=[run_id])
+        partition_sla_df.to_csv("data/processed/dq_partition_sla_evaluation.csv", index=False)
+        failing = partition_sla_df[partition_sla_df["sla_status"] == "FAIL"]["partition_value"].nunique()
+        print(f"Partition SLA evaluation exported ({len(partition_counts)} partitions, {failing} with failures)")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,46 @@
-import sqlite3
-import pandas as pd
+from customer_store import refresh_customer_store
+from db_connections import connect
 
-# Connect to SQLite (in-memory DB)
-conn = sqlite3.connect(':memory:')
+# Connect to the persistent customer store and take in any new customers
+conn = connect('../data/processed/customers.db')
+refresh_customer_store(conn, '../data/raw/customers_raw.csv')
 cur = conn.cursor()
 
-# Load CSV into SQLite
-df = pd.read_csv('../data/raw/customers_raw.csv')
-df.to_sql('customers', conn, index=False, if_exists='replace')
-
-# 1. Count missing values per column
+# 1. Count missing values per column (maintained by the store)
 print("Missing values per column:")
-for col in df.columns:
-    cur.execute(f"SELECT COUNT(*) FROM customers WHERE {col} IS NULL")
-    count = cur.fetchone()[0]
-    print(f"{col}: {count}")
+cur.execute("SELECT column_name, null_count FROM customer_null_counts ORDER BY position")
+for col, count in cur.fetchall():
+    print(f"{col}: {count or 0}")
 
 # 2. Detect duplicate emails
 cur.execute("""
-SELECT email, COUNT(*) AS cnt
-FROM customers
-WHERE email IS NOT NULL
-GROUP BY email
-HAVING cnt > 1
+SELECT email, freq AS cnt
+FROM customer_email_counts
+WHERE freq > 1
+ORDER BY email
+LIMIT 5
 """)
 duplicates = cur.fetchall()
 print("\nDuplicate emails:")
-print(duplicates[:5])  # Show first 5 duplicates
+print(duplicates)  # Show first 5 duplicates
 
-# 3. Invalid emails
+# 3. Invalid emails (the scan stops at the fifth match)
 cur.execute("""
 SELECT email
 FROM customers
 WHERE email NOT LIKE '%_@_%._%'
+LIMIT 5
 """)
 invalid_emails = cur.fetchall()
 print("\nInvalid emails:")
-print(invalid_emails[:5])
+print(invalid_emails)
 
 # 4. Recent activity by country
 cur.execute("""
-SELECT country, COUNT(*) AS total_customers,
-       AVG(julianday('now') - julianday(last_active)) AS avg_days_since_active
-FROM customers
-GROUP BY country
+SELECT country, total_customers,
+       julianday('now') - last_active_julian_sum / NULLIF(active_customers, 0) AS avg_days_since_active
+FROM customer_country_activity
+ORDER BY country
 """)
 recent_activity = cur.fetchall()
 print("\nAverage days since last active by country:")
@@ -0,0 +1,129 @@
+import argparse
+import re
+import sqlite3
+import sys
+import pandas as pd
+from pathlib import Path
+
+from columnar_store import read_dataset
+from db_connections import connect
+from parallel_checks import CHECKS_SQL, load_checks
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+CSV_PATH = BASE_DIR / "data" / "raw" / "customers_raw.csv"
+AUDIT_TABLE_SQL = BASE_DIR / "src" / "create_audit_table.sql"
+
+# Only the columns the checks touch are read
+CHECK_COLUMNS = ["email", "phone_number", "signup_date", "last_active"]
+
+# Same names and order as src/data_quality_checks.sql
+CHECK_NAMES = [
+    "missing_email",
+    "missing_phone",
+    "duplicate_email",
+    "invalid_email_format",
+    "last_active_before_signup",
+]
+
+
+# --- vectorized rule masks ---
+def _as_text(series):
+    # SQLite compares and pattern-matches the stored text value
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    return series.astype(str)
+
+
+def row_masks(df):
+    email = df["email"]
+    has_email = email.notna()
+
+    # email NOT LIKE '%@%.%' -> no '.' anywhere after an '@'
+    email_text = _as_text(email[has_email])
+    bad_format = pd.Series(False, index=df.index)
+    bad_format[has_email] = ~email_text.str.contains(r"@.*\.", regex=True, flags=re.DOTALL)
+
+    # last_active < signup_date, NULL on either side never fails
+    both_dates = df["last_active"].notna() & df["signup_date"].notna()
+    if (pd.api.types.is_datetime64_any_dtype(df["last_active"])
+            and pd.api.types.is_datetime64_any_dtype(df["signup_date"])):
+        before_signup = both_dates & (df["last_active"] < df["signup_date"])
+    else:
+        before_signup = pd.Series(False, index=df.index)
+        before_signup[both_dates] = (
+            _as_text(df.loc[both_dates, "last_active"]) < _as_text(df.loc[both_dates, "signup_date"])
+        )
+
+    return {
+        "missing_email": ~has_email,
+        "missing_phone": df["phone_number"].isna(),
+        "invalid_email_format": bad_format,
+        "last_active_before_signup": before_signup,
+    }
+
+
+def duplicate_email_count(df):
+    # Number of distinct non-null emails that appear more than once
+    counts = df["email"].dropna().value_counts()
+    return int((counts > 1).sum())
+
+
+def run_vectorized_checks(df):
+    masks = row_masks(df)
+    failed = {name: int(mask.sum()) for name, mask in masks.items()}
+    failed["duplicate_email"] = duplicate_email_count(df)
+
+    # Same (check_name, failed_rows) shape as parallel_checks.run_checks_parallel
+    return [(name, failed[name]) for name in CHECK_NAMES]
+
+
+# --- SQLite parity ---
+def run_sqlite_checks(df, sql_path=CHECKS_SQL):
+    conn = sqlite3.connect(":memory:")
+    df.to_sql("customers", conn, index=False)
+    results = [tuple(conn.execute(query).fetchone()) for query in load_checks(sql_path)]
+    conn.close()
+    return [(name, int(failed_rows)) for name, failed_rows in results]
+
+
+def parity_report(df):
+    vectorized = run_vectorized_checks(df)
+    sqlite = run_sqlite_checks(df)
+    report = pd.DataFrame(vectorized, columns=["check_name", "vectorized"]).merge(
+        pd.DataFrame(sqlite, columns=["check_name", "sqlite"]), on="check_name", how="outer"
+    )
+    report["match"] = report["vectorized"] == report["sqlite"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run customer checks on an in-memory frame")
+    parser.add_argument("--csv", default=CSV_PATH, type=Path)
+    parser.add_argument("--db", type=Path, help="Append results to dq_audit_log in this database")
+    parser.add_argument("--parity", action="store_true", help="Compare against the SQLite backend")
+    args = parser.parse_args()
+
+    df = read_dataset(args.csv, columns=CHECK_COLUMNS)
+
+    if args.parity:
+        report = parity_report(df)
+        print(report.to_string(index=False))
+        if not report["match"].all():
+            sys.exit("Vectorized and SQLite backends disagree")
+        return
+
+    results = run_vectorized_checks(df)
+    print(pd.DataFrame(results, columns=["check_name", "failed_rows"]).to_string(index=False))
+
+    if args.db:
+        conn = connect(args.db)
+        with open(AUDIT_TABLE_SQL) as f:
+            conn.executescript(f.read())
+        conn.executemany("INSERT INTO dq_audit_log (check_name, failed_rows) VALUES (?, ?)", results)
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import os
+import queue
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from check_telemetry import record_telemetry
+from db_connections import connect
+from dq_runs import (
+    SLA_EXPORT_QUERY,
+    ensure_audit_tables,
+    ensure_sla_rules,
+    evaluate_sla,
+    log_run_results,
+    start_run,
+)
+from fused_checks import load_rules, mark_checked, run_checks_profiled
+from load_workforce_to_db import (
+    _has_baseline,
+    apply_append_load,
+    apply_full_load,
+    create_tracking_tables,
+    load_workforce,
+)
+
+# Resolve project root safely
+BASE_DIR = Path(__file__).resolve().parent.parent
+DROP_DIR = BASE_DIR / "data" / "raw" / "incoming"
+DB_PATH = BASE_DIR / "data" / "processed" / "workforce.db"
+SQL_CHECKS = BASE_DIR / "sql" / "dq_workforce_checks.sql"
+SLA_CSV = BASE_DIR / "data" / "processed" / "dq_sla_evaluation.csv"
+
+# Seconds between scans of the drop directory; a file must look the same on
+# two consecutive scans (size and mtime) before it is picked up
+POLL_INTERVAL = float(os.environ.get("DQ_WATCH_POLL_SECONDS", 5))
+
+# Batches waiting for the worker. When the queue is full the poller stops
+# queueing and new files simply wait on disk.
+MAX_QUEUED_BATCHES = 2
+
+# Files coalesced into one micro-batch (one check run) when the worker is behind
+MAX_BATCH_FILES = 20
+
+# Warn when a file takes longer than this from detection to SLA verdict
+LATENCY_TARGET_SECONDS = 300
+
+# Subdirectories of the drop directory that ingested / rejected files move to
+PROCESSED_SUBDIR = "processed"
+FAILED_SUBDIR = "failed"
+
+
+# --- drop directory polling ---
+def scan_drops(drop_dir, pattern, previous):
+    # Returns (ready files oldest first, this scan's snapshot). Files still
+    # being written change size or mtime between scans and are left alone.
+    snapshot = {}
+    for path in drop_dir.glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    ready = [path for path, signature in snapshot.items() if previous.get(path) == signature]
+    return sorted(ready, key=lambda path: snapshot[path][1]), snapshot
+
+
+def poll_drops(drop_dir, pattern, batches, stop, poll_interval=POLL_INTERVAL, max_batch_files=MAX_BATCH_FILES):
+    # Runs in its own thread and feeds (files, detected_at) batches to the
+    # worker. A full queue is the backpressure signal: nothing more is queued,
+    # and files that arrived meanwhile are coalesced into larger batches once
+    # the worker frees a slot.
+    snapshot = {}
+    queued = set()
+    detected = {}
+    while not stop.is_set():
+        ready, snapshot = scan_drops(drop_dir, pattern, snapshot)
+        # Files the worker has moved away can be forgotten
+        queued &= snapshot.keys()
+        detected = {path: at for path, at in detected.items() if path in snapshot}
+
+        waiting = [path for path in ready if path not in queued]
+        for path in waiting:
+            detected.setdefault(path, time.time())
+
+        while waiting and not stop.is_set():
+            batch = waiting[:max_batch_files]
+            try:
+                batches.put([(path, detected[path]) for path in batch], timeout=poll_interval)
+            except queue.Full:
+                break
+            queued.update(batch)
+            waiting = waiting[len(batch):]
+
+        stop.wait(poll_interval)
+
+
+def _move(path, subdir):
+    target_dir = path.parent / subdir
+    target_dir.mkdir(exist_ok=True)
+    target = target_dir / path.name
+    if target.exists():
+        target = target_dir / f"{datetime.now():%Y%m%d%H%M%S}_{path.name}"
+    path.replace(target)
+
+
+# --- micro-batch processing ---
+def _untracked_workforce(conn):
+    # True when workforce holds rows that have no fingerprints yet (a table
+    # loaded before change tracking existed). Appending needs the fingerprints
+    # and a bootstrap load would replace those rows, so neither is safe.
+    if _has_baseline(conn):
+        return False
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workforce'"
+    ).fetchone()
+    return exists is not None and conn.execute("SELECT 1 FROM workforce LIMIT 1").fetchone() is not None
+
+
+def ingest_file(conn, path, encoding="utf-8"):
+    # Appends one file's rows as new posts (the first file into an empty
+    # database becomes the baseline). Returns the row count.
+    create_tracking_tables(conn)
+    if _untracked_workforce(conn):
+        raise RuntimeError("workforce has no fingerprints; run src/load_workforce_to_db.py first")
+    append = _has_baseline(conn)
+    total_rows, _ = load_workforce(conn, csv_path=path, encoding=encoding)
+    if append:
+        apply_append_load(conn)
+    else:
+        apply_full_load(conn)
+    return total_rows
+
+
+def log_batch(conn, run_id, files, failure_counts):
+    completed = time.time()
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO dq_batch_files (run_id, source_file, row_count, detected_at, completed_at, latency_seconds)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                run_id,
+                path.name,
+                rows,
+                datetime.fromtimestamp(detected_at, timezone.utc).isoformat(),
+                datetime.fromtimestamp(completed, timezone.utc).isoformat(),
+                round(completed - detected_at, 3),
+            )
+            for path, rows, detected_at in files
+        ],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO dq_batch_results (run_id, check_name, failed_rows) VALUES (?, ?, ?)",
+        [(run_id, check_name, failed_rows) for check_name, failed_rows in failure_counts.items()],
+    )
+    conn.commit()
+    return max(completed - detected_at for _, _, detected_at in files)
+
+
+def process_batch(conn, batch, rules, encoding="utf-8", sla_csv=SLA_CSV):
+    # Load every file, then one check run over just the rows they added:
+    # the appended rows are the pending workforce_changes, so the incremental
+    # fused scan (and the failure cube delta) only touch this batch.
+    ingested = []
+    for path, detected_at in batch:
+        try:
+            rows = ingest_file(conn, path, encoding)
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError, sqlite3.Error) as e:
+            conn.rollback()
+            _move(path, FAILED_SUBDIR)
+            print(f"Rejected {path.name}: {e}")
+            continue
+        ingested.append((path, rows, detected_at))
+
+    if not ingested:
+        return None
+
+    try:
+        failure_counts, run_mode, telemetry = run_checks_profiled(conn, rules, incremental=True)
+        # A full run only happens for the first batch or after an unchecked full reload
+        run_mode = "micro_batch" if run_mode == "incremental" else run_mode
+
+        run_id, timestamp = start_run(conn, run_mode)
+        log_run_results(conn, run_id, timestamp, [check_name for check_name, _ in rules])
+        mark_checked(conn)
+        record_telemetry(conn, run_id, timestamp, telemetry)
+
+        evaluate_sla(conn, run_id)
+        sla_df = pd.read_sql_query(SLA_EXPORT_QUERY, conn, params=[run_id])
+        sla_df.to_csv(sla_csv, index=False)
+
+        latency = log_batch(conn, run_id, ingested, failure_counts)
+    except sqlite3.Error as e:
+        # The rows are loaded but still pending in workforce_changes, so the
+        # next batch's incremental run checks them; the files are not retried
+        conn.rollback()
+        for path, _, _ in ingested:
+            _move(path, PROCESSED_SUBDIR)
+        print(f"Check run failed for {len(ingested)} file(s); their rows stay loaded and unchecked rows go to the next batch: {e}")
+        return None
+
+    for path, _, _ in ingested:
+        _move(path, PROCESSED_SUBDIR)
+
+    failing = (sla_df["sla_status"] == "FAIL").sum()
+    print(
+        f"Run {run_id} ({run_mode}): {len(ingested)} file(s), {sum(rows for _, rows, _ in ingested)} rows, "
+        f"{sum(failure_counts.values())} failed rows in batch, {failing} SLA failure(s), latency {latency:.1f}s"
+    )
+    return run_id, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a drop directory and check each new workforce CSV as a micro-batch")
+    parser.add_argument("--drop-dir", type=Path, default=DROP_DIR)
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUED_BATCHES,
+                        help="Batches waiting for the worker before new files are left on disk")
+    parser.add_argument("--max-batch-files", type=int, default=MAX_BATCH_FILES,
+                        help="Files coalesced into one check run when the worker is behind")
+    parser.add_argument("--latency-target", type=float, default=LATENCY_TARGET_SECONDS,
+                        help="Warn when a file takes longer than this many seconds to reach an SLA verdict")
+    parser.add_argument("--once", action="store_true", help="Process the files already in the drop directory and exit")
+    args = parser.parse_args()
+
+    args.drop_dir.mkdir(parents=True, exist_ok=True)
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+
+    # --- connect ---
+    conn = connect(args.db)
+    if _untracked_workforce(conn):
+        sys.exit(
+            "workforce was loaded without change tracking; run src/load_workforce_to_db.py "
+            "once before watching, so drops are appended instead of replacing it"
+        )
+    ensure_audit_tables(conn)
+    ensure_sla_rules(conn)
+    rules = load_rules(SQL_CHECKS)
+
+    # --- one pass over what is already there ---
+    if args.once:
+        drops = sorted(args.drop_dir.glob(args.pattern), key=lambda path: path.stat().st_mtime_ns)
+        detected_at = time.time()
+        for start in range(0, len(drops), args.max_batch_files):
+            batch = [(path, detected_at) for path in drops[start:start + args.max_batch_files]]
+            process_batch(conn, batch, rules, args.encoding)
+        conn.close()
+        return
+
+    # --- watch ---
+    # SIGINT/SIGTERM let the batch in progress finish before exiting
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    batches = queue.Queue(maxsize=args.max_queue)
+    poller = threading.Thread(
+        target=poll_drops,
+        args=(args.drop_dir, args.pattern, batches, stop, args.poll_interval, args.max_batch_files),
+        daemon=True,
+    )
+    poller.start()
+    print(f"Watching {args.drop_dir} for {args.pattern} (poll every {args.poll_interval}s, queue {args.max_queue})")
+
+    while not stop.is_set():
+        try:
+            batch = batches.get(timeout=args.poll_interval)
+        except queue.Empty:
+            continue
+        result = process_batch(conn, batch, rules, args.encoding)
+        if result and result[1] > args.latency_target:
+            print(f"WARNING: run {result[0]} exceeded the {args.latency_target:.0f}s latency target; "
+                  f"raise --max-batch-files to catch up faster")
+        batches.task_done()
+
+    poller.join()
+    conn.close()
+    print("Watch stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from db_connections import connect
+from load_workforce_to_db import (
+    CSV_PATH,
+    apply_full_load,
+    apply_incremental_load,
+    create_tracking_tables,
+    load_workforce,
+)
+
+
+def _load(conn, csv_path, incremental, chunk_size=500):
+    create_tracking_tables(conn)
+    load_workforce(conn, csv_path=csv_path, chunk_size=chunk_size)
+    return apply_incremental_load(conn) if incremental else apply_full_load(conn)
+
+
+def test_one_edited_cell_is_one_changed_row(tmp_path):
+    extract = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False)
+    csv_path = tmp_path / "workforce.csv"
+    extract.to_csv(csv_path, index=False)
+
+    conn = connect(tmp_path / "workforce.db")
+    _load(conn, csv_path, incremental=False)
+
+    # A blank payscale in one chunk used to retype that chunk's numbers
+    # (int64 -> float64) and change every fingerprint in it
+    extract.loc[10, "Payscale Minimum (£)"] = ""
+    extract.to_csv(csv_path, index=False)
+    summary = _load(conn, csv_path, incremental=True)
+    conn.close()
+
+    assert summary == {"inserted": 0, "changed": 1, "deleted": 0}
+
+
+def test_fingerprints_do_not_depend_on_chunk_size(tmp_path):
+    conn = connect(tmp_path / "workforce.db")
+    _load(conn, CSV_PATH, incremental=False, chunk_size=500)
+    summary = _load(conn, CSV_PATH, incremental=True, chunk_size=7)
+    conn.close()
+
+    assert summary == {"inserted": 0, "changed": 0, "deleted": 0}